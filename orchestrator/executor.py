@@ -521,29 +521,32 @@ class PhaseExecutor:
                     error=result.error_message or "Unknown error",
                 )
 
-            # Register artifacts
+            # Register output and prompt artifacts in one transaction
+            artifacts = []
             if result.output_path:
-                await self.state_manager.register_artifact(
-                    run_id=phase.run_id,
-                    phase_id=phase_id,
-                    artifact_type="copilot_output",
-                    file_path=result.output_path,
-                    metadata={
+                artifacts.append({
+                    "run_id": phase.run_id,
+                    "phase_id": phase_id,
+                    "artifact_type": "copilot_output",
+                    "file_path": result.output_path,
+                    "metadata": {
                         "pass_number": pass_number,
                         "execution_time": result.execution_time,
                     },
-                )
+                })
 
-            # Register prompt artifact
             prompt_file = artifact_dir / "copilot_prompt.md"
             if prompt_file.exists():
-                await self.state_manager.register_artifact(
-                    run_id=phase.run_id,
-                    phase_id=phase_id,
-                    artifact_type="copilot_prompt",
-                    file_path=str(prompt_file),
-                    metadata={"pass_number": pass_number},
-                )
+                artifacts.append({
+                    "run_id": phase.run_id,
+                    "phase_id": phase_id,
+                    "artifact_type": "copilot_prompt",
+                    "file_path": str(prompt_file),
+                    "metadata": {"pass_number": pass_number},
+                })
+
+            if artifacts:
+                await self.state_manager.register_artifacts(artifacts)
 
             # Apply patches if successful
             if result.success and result.patches:
@@ -890,11 +893,7 @@ class PhaseExecutor:
             new_branch.checkout()
 
             # Update phase with branch information
-            await self.state_manager.db.execute(
-                "UPDATE phases SET branch_name = ? WHERE phase_id = ?",
-                (branch_name, phase.id)
-            )
-            await self.state_manager.db.commit()
+            await self.state_manager.set_phase_branch(phase.phase_id, branch_name)
 
             logger.info(f"Created and checked out branch: {branch_name}")
             return branch_name
@@ -1269,30 +1268,31 @@ class PhaseExecutor:
             output_dir=artifact_dir
         )
 
-        # Register findings report artifacts
-        await self.state_manager.register_artifact(
-            run_id=phase.run_id,
-            phase_id=phase.phase_id,
-            artifact_type="findings_report_md",
-            file_path=str(md_path),
-            metadata={
-                "pass_number": pass_number,
-                "passed": verification_result.passed,
-                "findings_summary": verification_result.findings_summary
-            }
-        )
-        
-        await self.state_manager.register_artifact(
-            run_id=phase.run_id,
-            phase_id=phase.phase_id,
-            artifact_type="findings_report_json",
-            file_path=str(json_path),
-            metadata={
-                "pass_number": pass_number,
-                "passed": verification_result.passed,
-                "findings_count": len(verification_result.findings)
-            }
-        )
+        # Register both findings reports in one transaction
+        await self.state_manager.register_artifacts([
+            {
+                "run_id": phase.run_id,
+                "phase_id": phase.phase_id,
+                "artifact_type": "findings_report_md",
+                "file_path": str(md_path),
+                "metadata": {
+                    "pass_number": pass_number,
+                    "passed": verification_result.passed,
+                    "findings_summary": verification_result.findings_summary
+                }
+            },
+            {
+                "run_id": phase.run_id,
+                "phase_id": phase.phase_id,
+                "artifact_type": "findings_report_json",
+                "file_path": str(json_path),
+                "metadata": {
+                    "pass_number": pass_number,
+                    "passed": verification_result.passed,
+                    "findings_count": len(verification_result.findings)
+                }
+            },
+        ])
 
         logger.info(
             f"Verification completed: passed={verification_result.passed}, "
@@ -1,12 +1,49 @@
-"""Pydantic models for Agent Orchestrator state objects."""
+"""Pydantic models for Agent Orchestrator state objects.
+
+State objects are immutable snapshots of database rows; re-fetch from
+StateManager to observe updates.
+"""
 
 from datetime import datetime
-from typing import Optional, List, Dict, Any
+from functools import cached_property
+from typing import Optional, List, Dict, Any, Sequence, TypeVar
 from uuid import UUID
 from pydantic import BaseModel, Field, field_validator, ConfigDict
 import json
 
 
+_RowModelT = TypeVar('_RowModelT', bound='_RowModel')
+
+
+class _RowModel(BaseModel):
+    """Base for models built from ``sqlite3.Row`` results.
+    
+    ``dict(row)`` looks each column up by name, which ``sqlite3.Row`` does
+    with a linear scan; zipping the row against its column names is a
+    single pass, and the names only need reading once per result set.
+    """
+    
+    @classmethod
+    def from_row(
+        cls: type[_RowModelT], row: Any, columns: Optional[Sequence[str]] = None
+    ) -> _RowModelT:
+        """Create from a database row.
+        
+        Args:
+            row: ``sqlite3.Row`` (or any sequence) of column values
+            columns: Column names in row order; read from the row if omitted
+        """
+        return cls.model_validate(dict(zip(columns or row.keys(), row)))
+    
+    @classmethod
+    def from_rows(cls: type[_RowModelT], rows: Sequence[Any]) -> List[_RowModelT]:
+        """Create one instance per row, reading the column names once."""
+        if not rows:
+            return []
+        columns = rows[0].keys()
+        return [cls.from_row(row, columns) for row in rows]
+
+
 class PhasePlan(BaseModel):
     """Structured plan for a phase."""
     files: List[str] = Field(default_factory=list)
@@ -14,10 +51,10 @@ class PhasePlan(BaseModel):
     dependencies: List[str] = Field(default_factory=list)
     risks: List[str] = Field(default_factory=list)
     
-    model_config = ConfigDict(from_attributes=True)
+    model_config = ConfigDict(from_attributes=True, frozen=True)
 
 
-class RunState(BaseModel):
+class RunState(_RowModel):
     """State of an orchestration run."""
     run_id: str
     created_at: datetime
@@ -32,7 +69,7 @@ class RunState(BaseModel):
     current_phase_id: Optional[str] = None
     error_message: Optional[str] = None
     
-    model_config = ConfigDict(from_attributes=True)
+    model_config = ConfigDict(from_attributes=True, frozen=True)
     
     @field_validator('status')
     @classmethod
@@ -42,12 +79,32 @@ class RunState(BaseModel):
             raise ValueError(f"Status must be one of {allowed}")
         return v
     
+    @cached_property
+    def created_at_iso(self) -> str:
+        """ISO-8601 ``created_at``, formatted once per instance."""
+        return self.created_at.isoformat()
+    
+    @cached_property
+    def updated_at_iso(self) -> str:
+        """ISO-8601 ``updated_at``, formatted once per instance."""
+        return self.updated_at.isoformat()
+    
     def to_dict(self) -> Dict[str, Any]:
         """Convert to dictionary."""
-        data = self.model_dump()
-        data['created_at'] = self.created_at.isoformat()
-        data['updated_at'] = self.updated_at.isoformat()
-        return data
+        return {
+            'run_id': self.run_id,
+            'created_at': self.created_at_iso,
+            'updated_at': self.updated_at_iso,
+            'status': self.status,
+            'repo_path': self.repo_path,
+            'branch': self.branch,
+            'documentation_path': self.documentation_path,
+            'config_snapshot': self.config_snapshot,
+            'total_phases': self.total_phases,
+            'completed_phases': self.completed_phases,
+            'current_phase_id': self.current_phase_id,
+            'error_message': self.error_message,
+        }
     
     def to_json(self) -> str:
         """Convert to JSON string."""
@@ -63,7 +120,7 @@ class RunState(BaseModel):
         return cls(**data)
 
 
-class PhaseState(BaseModel):
+class PhaseState(_RowModel):
     """State of an execution phase."""
     phase_id: str
     run_id: str
@@ -81,7 +138,7 @@ class PhaseState(BaseModel):
     retry_count: int = 0
     max_retries: int
     
-    model_config = ConfigDict(from_attributes=True)
+    model_config = ConfigDict(from_attributes=True, frozen=True)
     
     @field_validator('phase_number')
     @classmethod
@@ -106,26 +163,55 @@ class PhaseState(BaseModel):
             raise ValueError(f"Status must be one of {allowed}")
         return v
     
+    @cached_property
+    def plan_data(self) -> Dict[str, Any]:
+        """``plan_json`` decoded once per instance; treat as read-only."""
+        return json.loads(self.plan_json)
+    
     def get_plan(self) -> PhasePlan:
         """Parse plan_json into PhasePlan object."""
         try:
-            data = json.loads(self.plan_json)
-            return PhasePlan(**data)
+            return PhasePlan(**self.plan_data)
         except Exception:
             return PhasePlan()
     
+    @cached_property
+    def created_at_iso(self) -> str:
+        """ISO-8601 ``created_at``, formatted once per instance."""
+        return self.created_at.isoformat()
+    
+    @cached_property
+    def started_at_iso(self) -> Optional[str]:
+        """ISO-8601 ``started_at``, formatted once per instance."""
+        return self.started_at.isoformat() if self.started_at else None
+    
+    @cached_property
+    def completed_at_iso(self) -> Optional[str]:
+        """ISO-8601 ``completed_at``, formatted once per instance."""
+        return self.completed_at.isoformat() if self.completed_at else None
+    
     def to_dict(self) -> Dict[str, Any]:
         """Convert to dictionary."""
-        data = self.model_dump()
-        data['created_at'] = self.created_at.isoformat()
-        if self.started_at:
-            data['started_at'] = self.started_at.isoformat()
-        if self.completed_at:
-            data['completed_at'] = self.completed_at.isoformat()
-        return data
+        return {
+            'phase_id': self.phase_id,
+            'run_id': self.run_id,
+            'phase_number': self.phase_number,
+            'title': self.title,
+            'intent': self.intent,
+            'size': self.size,
+            'status': self.status,
+            'created_at': self.created_at_iso,
+            'started_at': self.started_at_iso,
+            'completed_at': self.completed_at_iso,
+            'spec_path': self.spec_path,
+            'plan_json': self.plan_json,
+            'branch_name': self.branch_name,
+            'retry_count': self.retry_count,
+            'max_retries': self.max_retries,
+        }
 
 
-class ExecutionState(BaseModel):
+class ExecutionState(_RowModel):
     """State of an execution attempt."""
     execution_id: str
     phase_id: str
@@ -139,7 +225,7 @@ class ExecutionState(BaseModel):
     execution_mode: str
     error_message: Optional[str] = None
     
-    model_config = ConfigDict(from_attributes=True)
+    model_config = ConfigDict(from_attributes=True, frozen=True)
     
     @field_validator('pass_number')
     @classmethod
@@ -164,16 +250,34 @@ class ExecutionState(BaseModel):
             raise ValueError(f"Execution mode must be one of {allowed}")
         return v
     
+    @cached_property
+    def started_at_iso(self) -> str:
+        """ISO-8601 ``started_at``, formatted once per instance."""
+        return self.started_at.isoformat()
+    
+    @cached_property
+    def completed_at_iso(self) -> Optional[str]:
+        """ISO-8601 ``completed_at``, formatted once per instance."""
+        return self.completed_at.isoformat() if self.completed_at else None
+    
     def to_dict(self) -> Dict[str, Any]:
         """Convert to dictionary."""
-        data = self.model_dump()
-        data['started_at'] = self.started_at.isoformat()
-        if self.completed_at:
-            data['completed_at'] = self.completed_at.isoformat()
-        return data
+        return {
+            'execution_id': self.execution_id,
+            'phase_id': self.phase_id,
+            'pass_number': self.pass_number,
+            'started_at': self.started_at_iso,
+            'completed_at': self.completed_at_iso,
+            'status': self.status,
+            'copilot_input_path': self.copilot_input_path,
+            'copilot_output_path': self.copilot_output_path,
+            'copilot_summary': self.copilot_summary,
+            'execution_mode': self.execution_mode,
+            'error_message': self.error_message,
+        }
 
 
-class Finding(BaseModel):
+class Finding(_RowModel):
     """Verification finding."""
     finding_id: str
     execution_id: str
@@ -186,7 +290,7 @@ class Finding(BaseModel):
     resolved: bool = False
     created_at: datetime
     
-    model_config = ConfigDict(from_attributes=True)
+    model_config = ConfigDict(from_attributes=True, frozen=True)
     
     @field_validator('severity')
     @classmethod
@@ -204,14 +308,28 @@ class Finding(BaseModel):
             raise ValueError(f"Category must be one of {allowed}")
         return v
     
+    @cached_property
+    def created_at_iso(self) -> str:
+        """ISO-8601 ``created_at``, formatted once per instance."""
+        return self.created_at.isoformat()
+    
     def to_dict(self) -> Dict[str, Any]:
         """Convert to dictionary."""
-        data = self.model_dump()
-        data['created_at'] = self.created_at.isoformat()
-        return data
+        return {
+            'finding_id': self.finding_id,
+            'execution_id': self.execution_id,
+            'severity': self.severity,
+            'category': self.category,
+            'title': self.title,
+            'description': self.description,
+            'evidence': self.evidence,
+            'suggested_fix': self.suggested_fix,
+            'resolved': self.resolved,
+            'created_at': self.created_at_iso,
+        }
 
 
-class Artifact(BaseModel):
+class Artifact(_RowModel):
     """Artifact produced during orchestration."""
     artifact_id: str
     run_id: str
@@ -222,19 +340,20 @@ class Artifact(BaseModel):
     created_at: datetime
     metadata: Optional[str] = None
     
-    model_config = ConfigDict(from_attributes=True)
+    model_config = ConfigDict(from_attributes=True, frozen=True)
     
     @field_validator('artifact_type')
     @classmethod
     def validate_artifact_type(cls, v: str) -> str:
-        allowed = {'phase_plan', 'spec', 'copilot_output', 'copilot_prompt', 'findings_report', 
+        allowed = {'phase_plan', 'phase_detail', 'spec', 'copilot_output', 'copilot_prompt', 'findings_report', 
                    'findings_report_md', 'findings_report_json', 'verification_log', 'feedback_spec'}
         if v not in allowed:
             raise ValueError(f"Artifact type must be one of {allowed}")
         return v
     
-    def get_metadata(self) -> Dict[str, Any]:
-        """Parse metadata JSON."""
+    @cached_property
+    def metadata_data(self) -> Dict[str, Any]:
+        """``metadata`` decoded once per instance; treat as read-only."""
         if self.metadata:
             try:
                 return json.loads(self.metadata)
@@ -242,14 +361,30 @@ class Artifact(BaseModel):
                 return {}
         return {}
     
+    def get_metadata(self) -> Dict[str, Any]:
+        """Parse metadata JSON."""
+        return dict(self.metadata_data)
+    
+    @cached_property
+    def created_at_iso(self) -> str:
+        """ISO-8601 ``created_at``, formatted once per instance."""
+        return self.created_at.isoformat()
+    
     def to_dict(self) -> Dict[str, Any]:
         """Convert to dictionary."""
-        data = self.model_dump()
-        data['created_at'] = self.created_at.isoformat()
-        return data
+        return {
+            'artifact_id': self.artifact_id,
+            'run_id': self.run_id,
+            'phase_id': self.phase_id,
+            'execution_id': self.execution_id,
+            'artifact_type': self.artifact_type,
+            'file_path': self.file_path,
+            'created_at': self.created_at_iso,
+            'metadata': self.metadata,
+        }
 
 
-class ManualIntervention(BaseModel):
+class ManualIntervention(_RowModel):
     """Manual intervention record."""
     intervention_id: str
     phase_id: str
@@ -259,7 +394,7 @@ class ManualIntervention(BaseModel):
     notes: Optional[str] = None
     resolved_at: Optional[datetime] = None
     
-    model_config = ConfigDict(from_attributes=True)
+    model_config = ConfigDict(from_attributes=True, frozen=True)
     
     @field_validator('reason')
     @classmethod
@@ -278,13 +413,27 @@ class ManualIntervention(BaseModel):
                 raise ValueError(f"Action taken must be one of {allowed}")
         return v
     
+    @cached_property
+    def created_at_iso(self) -> str:
+        """ISO-8601 ``created_at``, formatted once per instance."""
+        return self.created_at.isoformat()
+    
+    @cached_property
+    def resolved_at_iso(self) -> Optional[str]:
+        """ISO-8601 ``resolved_at``, formatted once per instance."""
+        return self.resolved_at.isoformat() if self.resolved_at else None
+    
     def to_dict(self) -> Dict[str, Any]:
         """Convert to dictionary."""
-        data = self.model_dump()
-        data['created_at'] = self.created_at.isoformat()
-        if self.resolved_at:
-            data['resolved_at'] = self.resolved_at.isoformat()
-        return data
+        return {
+            'intervention_id': self.intervention_id,
+            'phase_id': self.phase_id,
+            'created_at': self.created_at_iso,
+            'reason': self.reason,
+            'action_taken': self.action_taken,
+            'notes': self.notes,
+            'resolved_at': self.resolved_at_iso,
+        }
 
 
 class RunSummary(BaseModel):
@@ -295,7 +444,7 @@ class RunSummary(BaseModel):
     findings_summary: Dict[str, int]
     artifacts_count: int
     
-    model_config = ConfigDict(from_attributes=True)
+    model_config = ConfigDict(from_attributes=True, frozen=True)
     
     @property
     def total_phases(self) -> int:
@@ -351,11 +500,16 @@ class RunSummary(BaseModel):
                 return (latest - earliest).total_seconds()
         return None
     
+    @cached_property
+    def _phases_payload(self) -> List[Dict[str, Any]]:
+        """Phase dictionaries built once and shared by to_dict and to_markdown."""
+        return [p.to_dict() for p in self.phases]
+    
     def to_dict(self) -> Dict[str, Any]:
         """Convert to dictionary."""
         return {
             'run': self.run.to_dict(),
-            'phases': [p.to_dict() for p in self.phases],
+            'phases': [dict(p) for p in self._phases_payload],
             'execution_count': self.execution_count,
             'findings_summary': self.findings_summary,
             'artifacts_count': self.artifacts_count
@@ -373,7 +527,7 @@ class RunSummary(BaseModel):
             f"**Status**: {self.run.status}",
             f"**Repository**: {self.run.repo_path}",
             f"**Branch**: {self.run.branch}",
-            f"**Created**: {self.run.created_at.isoformat()}",
+            f"**Created**: {self.run.created_at_iso}",
             f"**Total Phases**: {self.run.total_phases}",
             f"**Completed Phases**: {self.run.completed_phases}",
             "",
@@ -381,11 +535,11 @@ class RunSummary(BaseModel):
             ""
         ]
         
-        for phase in self.phases:
-            lines.append(f"### Phase {phase.phase_number}: {phase.title}")
-            lines.append(f"- **Status**: {phase.status}")
-            lines.append(f"- **Size**: {phase.size}")
-            lines.append(f"- **Retries**: {phase.retry_count}/{phase.max_retries}")
+        for phase in self._phases_payload:
+            lines.append(f"### Phase {phase['phase_number']}: {phase['title']}")
+            lines.append(f"- **Status**: {phase['status']}")
+            lines.append(f"- **Size**: {phase['size']}")
+            lines.append(f"- **Retries**: {phase['retry_count']}/{phase['max_retries']}")
             lines.append("")
         
         lines.extend([
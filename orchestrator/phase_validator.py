@@ -1,8 +1,11 @@
 """Validation and parsing for phase plan structures."""
 
 import json
-import re
-from typing import List, Dict, Any, Tuple, Optional
+from functools import lru_cache
+from typing import List, Dict, Any, Tuple, Optional, Literal, Annotated
+
+from pydantic import BaseModel, ConfigDict, Field, TypeAdapter
+from pydantic import ValidationError as PydanticValidationError
 
 
 class ValidationError(Exception):
@@ -10,11 +13,46 @@ class ValidationError(Exception):
     pass
 
 
+class _PhaseDecl(BaseModel):
+    """Typed phase declaration used to decode and validate LLM output in one pass."""
+    phase_number: int = Field(gt=0)
+    title: str = Field(pattern=r'\S')
+    intent: str = Field(pattern=r'\S')
+    size: Literal['small', 'medium', 'large']
+    files: List[str]
+    acceptance_criteria: List[str] = Field(min_length=1)
+    dependencies: List[int] = Field(default_factory=list)
+    risks: List[str] = Field(default_factory=list)
+
+    model_config = ConfigDict(strict=True, extra='allow', frozen=True)
+
+
+_PHASE_LIST_ADAPTER = TypeAdapter(Annotated[List[_PhaseDecl], Field(min_length=1)])
+
+
+@lru_cache(maxsize=64)
+def _decode_phase_decls(json_text: str) -> Optional[Tuple[_PhaseDecl, ...]]:
+    """Decode and validate a phase list, memoized on the JSON text.
+
+    Retries, resumes, and UI refreshes often re-parse the same payload.
+    Declarations are frozen and callers receive fresh dicts via
+    ``model_dump``, so cached entries are never mutated.
+
+    Returns:
+        Tuple of validated declarations, or None if the fast path rejects the text
+    """
+    try:
+        return tuple(_PHASE_LIST_ADAPTER.validate_json(json_text))
+    except PydanticValidationError:
+        return None
+
+
 class PhaseValidator:
     """Validates phase structure and dependencies."""
 
     REQUIRED_FIELDS = ['phase_number', 'title', 'intent', 'size', 'files', 'acceptance_criteria']
     VALID_SIZES = ['small', 'medium', 'large']
+    _REQUIRED_FIELD_SET = frozenset(REQUIRED_FIELDS)
 
     @staticmethod
     def validate_phase_structure(phase_dict: Dict[str, Any]) -> Tuple[bool, List[str]]:
@@ -28,12 +66,13 @@ class PhaseValidator:
         """
         errors = []
 
-        # Check required fields
-        for field in PhaseValidator.REQUIRED_FIELDS:
-            if field not in phase_dict:
-                errors.append(f"Missing required field: {field}")
-
-        if errors:
+        # Check required fields (reported in declaration order)
+        missing = PhaseValidator._REQUIRED_FIELD_SET.difference(phase_dict)
+        if missing:
+            errors.extend(
+                f"Missing required field: {field}"
+                for field in PhaseValidator.REQUIRED_FIELDS if field in missing
+            )
             return False, errors
 
         # Validate phase_number
@@ -81,6 +120,29 @@ class PhaseValidator:
 
         return len(errors) == 0, errors
 
+    @staticmethod
+    def validate_all(phases: List[Dict[str, Any]]) -> None:
+        """Validate a list of phase dictionaries in a single compiled pass.
+
+        Falls back to per-phase validation only to report what is wrong.
+
+        Args:
+            phases: List of phase dictionaries
+
+        Raises:
+            ValidationError: If any phase has an invalid structure
+        """
+        try:
+            _PHASE_LIST_ADAPTER.validate_python(phases)
+            return
+        except PydanticValidationError:
+            pass
+
+        for phase in phases:
+            is_valid, errors = PhaseValidator.validate_phase_structure(phase)
+            if not is_valid:
+                raise ValidationError(f"Invalid phase structure: {'; '.join(errors)}")
+
     @staticmethod
     def parse_llm_response(response_text: str) -> List[Dict[str, Any]]:
         """Parse LLM response and extract JSON phase list.
@@ -96,24 +158,18 @@ class PhaseValidator:
         Raises:
             ValidationError: If JSON cannot be parsed or is invalid
         """
-        # Try to extract JSON from markdown code blocks
-        json_match = re.search(r'```json\s*(.*?)\s*```', response_text, re.DOTALL)
-        if json_match:
-            json_text = json_match.group(1)
-        else:
-            # Try to extract JSON from generic code blocks
-            code_match = re.search(r'```\s*(.*?)\s*```', response_text, re.DOTALL)
-            if code_match:
-                json_text = code_match.group(1)
-            else:
-                # No code blocks, try to find JSON array directly
-                json_match = re.search(r'\[\s*\{.*?\}\s*\]', response_text, re.DOTALL)
-                if json_match:
-                    json_text = json_match.group(0)
-                else:
-                    json_text = response_text.strip()
-
-        # Parse JSON
+        # Well-behaved models return a bare JSON array: decode it directly
+        # before scanning the text for fences or brackets
+        json_text = response_text.strip()
+        if not json_text.startswith('[') or _decode_phase_decls(json_text) is None:
+            json_text = PhaseValidator._extract_json_text(response_text)
+
+        # Fast path: decode and validate in a single (memoized) pass
+        decls = _decode_phase_decls(json_text)
+        if decls is not None:
+            return [decl.model_dump(exclude_unset=True) for decl in decls]
+
+        # Slow path: re-validate field by field to report detailed errors
         try:
             phases = json.loads(json_text)
         except json.JSONDecodeError as e:
@@ -135,6 +191,61 @@ class PhaseValidator:
 
         return phases
 
+    @staticmethod
+    def _extract_json_text(response_text: str) -> str:
+        """Locate the JSON payload in an LLM response with a single linear scan.
+
+        Prefers a ```json fenced block, then any fenced block, then the first
+        balanced top-level ``[{ ... }]`` array, and finally the whole text.
+
+        Args:
+            response_text: Raw LLM response text
+
+        Returns:
+            Candidate JSON text
+        """
+        # Fenced code blocks
+        start = response_text.find('```json')
+        if start != -1:
+            start += len('```json')
+        else:
+            start = response_text.find('```')
+            if start != -1:
+                start += len('```')
+        if start != -1:
+            end = response_text.find('```', start)
+            if end != -1:
+                return response_text[start:end].strip()
+
+        # Bare JSON array of objects: match brackets, skipping string contents
+        start = response_text.find('[')
+        while start != -1:
+            if response_text[start + 1:].lstrip().startswith('{'):
+                depth = 0
+                in_string = False
+                escaped = False
+                for i in range(start, len(response_text)):
+                    ch = response_text[i]
+                    if in_string:
+                        if escaped:
+                            escaped = False
+                        elif ch == '\\':
+                            escaped = True
+                        elif ch == '"':
+                            in_string = False
+                    elif ch == '"':
+                        in_string = True
+                    elif ch == '[':
+                        depth += 1
+                    elif ch == ']':
+                        depth -= 1
+                        if depth == 0:
+                            return response_text[start:i + 1]
+                break
+            start = response_text.find('[', start + 1)
+
+        return response_text.strip()
+
     @staticmethod
     def check_phase_dependencies(phases: List[Dict[str, Any]]) -> Tuple[bool, List[str]]:
         """Validate phase dependencies for consistency.
@@ -146,15 +257,17 @@ class PhaseValidator:
             Tuple of (is_valid, error_messages)
         """
         errors = []
-        phase_numbers = {p['phase_number'] for p in phases}
 
-        # Build dependency graph
+        # Build dependency graph, catching duplicate phase numbers
         dependencies = {}
         for phase in phases:
             phase_num = phase['phase_number']
-            deps = phase.get('dependencies', [])
-            dependencies[phase_num] = deps
+            if phase_num in dependencies:
+                errors.append(f"Duplicate phase number {phase_num}")
+            dependencies[phase_num] = phase.get('dependencies', [])
+        phase_numbers = dependencies.keys()
 
+        for phase_num, deps in dependencies.items():
             # Check that all dependencies reference valid phases
             for dep in deps:
                 if dep not in phase_numbers:
@@ -164,25 +277,28 @@ class PhaseValidator:
                 if dep >= phase_num:
                     errors.append(f"Phase {phase_num} cannot depend on phase {dep} (must depend on earlier phases)")
 
-        # Check for circular dependencies using DFS
-        def has_cycle(node: int, visited: set, rec_stack: set) -> bool:
-            visited.add(node)
-            rec_stack.add(node)
-
-            for dep in dependencies.get(node, []):
-                if dep not in visited:
-                    if has_cycle(dep, visited, rec_stack):
-                        return True
-                elif dep in rec_stack:
-                    return True
-
-            rec_stack.remove(node)
-            return False
-
-        visited = set()
-        for phase_num in phase_numbers:
-            if phase_num not in visited:
-                if has_cycle(phase_num, visited, set()):
-                    errors.append(f"Circular dependency detected involving phase {phase_num}")
+        # Check for circular dependencies with an iterative topological sort
+        # (Kahn's algorithm): phases never released are on or behind a cycle
+        indegree = {phase_num: 0 for phase_num in phase_numbers}
+        dependents: Dict[int, List[int]] = {phase_num: [] for phase_num in phase_numbers}
+        for phase_num, deps in dependencies.items():
+            for dep in deps:
+                if dep in dependents:
+                    dependents[dep].append(phase_num)
+                    indegree[phase_num] += 1
+
+        ready = [phase_num for phase_num, degree in indegree.items() if degree == 0]
+        released = 0
+        while ready:
+            phase_num = ready.pop()
+            released += 1
+            for dependent in dependents[phase_num]:
+                indegree[dependent] -= 1
+                if indegree[dependent] == 0:
+                    ready.append(dependent)
+
+        if released < len(indegree):
+            blocked = min(phase_num for phase_num, degree in indegree.items() if degree > 0)
+            errors.append(f"Circular dependency detected involving phase {blocked}")
 
         return len(errors) == 0, errors
@@ -1,11 +1,17 @@
 """Phase planner orchestrator for breaking down tasks into executable phases."""
 
+import asyncio
+import copy
+import hashlib
 import json
 import logging
+import time
+from collections import Counter, OrderedDict
 from pathlib import Path
 from datetime import datetime
 from typing import List, Dict, Any, Optional
-from jinja2 import Environment, FileSystemLoader, TemplateNotFound
+from jinja2 import Environment, FileSystemBytecodeCache, FileSystemLoader, Template, TemplateNotFound
+from jinja2.environment import TemplateStream
 
 from orchestrator.config import OrchestratorConfig
 from orchestrator.llm_client import OllamaClient, OllamaConnectionError, OllamaGenerationError
@@ -26,6 +32,8 @@ class PlannerError(Exception):
 class PhasePlanner:
     """Orchestrates phase planning with LLM generation and interactive approval."""
 
+    PHASE_CACHE_SIZE = 32
+
     def __init__(
         self,
         config: OrchestratorConfig,
@@ -46,6 +54,10 @@ class PhasePlanner:
         self.rag_system = rag_system
         self.state_manager = state_manager
         self.ui = PlannerUI()
+        self._phase_cache: OrderedDict[str, List[Dict[str, Any]]] = OrderedDict()
+        self._repo_context_cache: Dict[str, Dict[str, Any]] = {}
+        self._artifacts_root = Path(config.base_path) / "data" / "artifacts"
+        self._max_retries = getattr(getattr(config, 'execution', None), 'max_retries', 3)
 
         # Load prompt templates
         prompts_path = Path(config.base_path) / "config" / "prompts.yaml"
@@ -57,7 +69,16 @@ class PhasePlanner:
         templates_dir = Path(config.base_path) / "templates"
         if not templates_dir.exists():
             raise PlannerError(f"Templates directory not found: {templates_dir}")
-        self.jinja_env = Environment(loader=FileSystemLoader(str(templates_dir)))
+        bytecode_cache_dir = Path(config.base_path) / "data" / ".jinja_cache"
+        bytecode_cache_dir.mkdir(parents=True, exist_ok=True)
+        self.jinja_env = Environment(
+            loader=FileSystemLoader(str(templates_dir)),
+            bytecode_cache=FileSystemBytecodeCache(str(bytecode_cache_dir)),
+            auto_reload=False,
+            cache_size=-1
+        )
+        self._phase_plan_template = self._load_template('phase_plan.md.j2')
+        self._phase_detail_template = self._load_template('phase_detail.md.j2')
 
         # Validate configuration
         self.validate_planner_config(config)
@@ -68,6 +89,20 @@ class PhasePlanner:
             "templates_dir": str(templates_dir)
         })
 
+    def _load_template(self, name: str) -> Optional[Template]:
+        """Load a Jinja2 template once so renders skip the loader lookup.
+
+        Args:
+            name: Template file name
+
+        Returns:
+            Compiled template, or None if it does not exist
+        """
+        try:
+            return self.jinja_env.get_template(name)
+        except TemplateNotFound:
+            return None
+
     def validate_planner_config(self, config: OrchestratorConfig) -> None:
         """Validate planner configuration.
 
@@ -128,16 +163,23 @@ class PhasePlanner:
         })
 
         try:
-            # Initialize RAG system
+            # Initialize RAG system while loading issue documentation
             self.ui.show_info("Initializing repository analysis...", "Setup")
             with self.ui.show_progress("Indexing repository...") as progress:
                 task = progress.add_task("Analyzing codebase...", total=None)
-                await self.rag_system.initialize()
+                # Let both finish before surfacing an error so neither is
+                # left running unobserved
+                results = await asyncio.gather(
+                    self._load_issue_documentation(issue_doc_path),
+                    self.rag_system.initialize(),
+                    return_exceptions=True
+                )
+                for result in results:
+                    if isinstance(result, BaseException):
+                        raise result
+                issue_doc = results[0]
                 progress.update(task, completed=True)
 
-            # Load issue documentation
-            issue_doc = self._load_issue_documentation(issue_doc_path)
-
             # Generate initial phase breakdown
             self.ui.show_info("Generating phase breakdown...", "Planning")
             phases = await self.generate_phase_breakdown(issue_doc, repo_path)
@@ -146,38 +188,46 @@ class PhasePlanner:
             conversation_history = []
             approved = False
             last_generated_phases = phases  # Track for regeneration
-
-            while not approved:
-                # Display phase summary
-                self.ui.display_phase_summary(phases)
-
-                # Prompt for action
-                action = self.ui.prompt_approval_action()
-
-                if action == 'approve':
-                    approved = True
-                elif action == 'detail':
-                    phase_num = self.ui.prompt_phase_number(len(phases))
-                    phase = next(p for p in phases if p['phase_number'] == phase_num)
-                    self.ui.display_phase_detail(phase)
-                elif action == 'question':
-                    question = self.ui.prompt_follow_up_question()
-                    if question:
-                        conversation_history.append({'question': question, 'answer': ''})
-                        self.ui.show_info("Regenerating phases based on your feedback...", "Planning")
+            phase_by_number = {p['phase_number']: p for p in phases}
+
+            # Batch each redraw (detail view, summary, menu) into one screen update
+            with self.ui.frame():
+                while not approved:
+                    # Display phase summary
+                    self.ui.display_phase_summary(phases)
+
+                    # Prompt for action
+                    action = self.ui.prompt_approval_action()
+
+                    if action == 'approve':
+                        approved = True
+                    elif action == 'detail':
+                        phase_num = self.ui.prompt_phase_number(len(phases))
+                        self.ui.display_phase_detail(phase_by_number[phase_num])
+                    elif action == 'question':
+                        question = self.ui.prompt_follow_up_question()
+                        if question:
+                            conversation_history.append({'question': question, 'answer': ''})
+                            self.ui.show_info("Regenerating phases based on your feedback...", "Planning")
+                            phases = await self.generate_phase_breakdown(
+                                issue_doc,
+                                repo_path,
+                                conversation_history,
+                                last_generated_phases
+                            )
+                            last_generated_phases = phases
+                            phase_by_number = {p['phase_number']: p for p in phases}
+                    elif action == 'regenerate':
+                        self.ui.show_info("Regenerating phase breakdown...", "Planning")
                         phases = await self.generate_phase_breakdown(
                             issue_doc,
                             repo_path,
-                            conversation_history,
-                            last_generated_phases
+                            use_cache=False
                         )
                         last_generated_phases = phases
-                elif action == 'regenerate':
-                    self.ui.show_info("Regenerating phase breakdown...", "Planning")
-                    phases = await self.generate_phase_breakdown(issue_doc, repo_path)
-                    last_generated_phases = phases
-                elif action == 'abort':
-                    raise PlannerError("Planning aborted by user")
+                        phase_by_number = {p['phase_number']: p for p in phases}
+                    elif action == 'abort':
+                        raise PlannerError("Planning aborted by user")
 
             # Save approved phases
             self.ui.show_info("Saving phase plan...", "Finalizing")
@@ -185,7 +235,7 @@ class PhasePlanner:
 
             self.ui.show_success(f"Phase plan created successfully with {len(phases)} phases")
             self.ui.show_info(
-                f"Artifacts saved:\n" + "\n".join(f"  • {p}" for p in artifact_paths),
+                f"Artifacts saved:\n" + "\n".join([f"  • {p}" for p in artifact_paths]),
                 "Artifacts"
             )
 
@@ -204,21 +254,29 @@ class PhasePlanner:
             }, exc_info=True)
             self.ui.show_error(str(e), "Check logs for details")
             raise PlannerError(f"Planning session failed: {e}") from e
+        finally:
+            self._repo_context_cache.clear()
 
     async def generate_phase_breakdown(
         self,
         issue_doc: str,
         repo_path: str,
         conversation_history: Optional[List[Dict[str, str]]] = None,
-        previous_phases: Optional[List[Dict[str, Any]]] = None
+        previous_phases: Optional[List[Dict[str, Any]]] = None,
+        use_cache: bool = True
     ) -> List[Dict[str, Any]]:
         """Generate phase breakdown using LLM.
 
+        Results are cached per planner keyed by the issue, repository context,
+        conversation history, and previous phases, so identical requests skip
+        the LLM call.
+
         Args:
             issue_doc: Issue documentation text
             repo_path: Repository path
             conversation_history: Optional conversation history for regeneration
             previous_phases: Previously generated phases for context
+            use_cache: If False, always call the LLM and refresh the cached entry
 
         Returns:
             List of phase dictionaries
@@ -230,23 +288,22 @@ class PhasePlanner:
         previous_phases = previous_phases or []
 
         try:
-            # Get repository context from RAG
-            with self.ui.show_progress("Retrieving repository context...") as progress:
-                task = progress.add_task("Analyzing codebase...", total=None)
-                repo_context = await self.rag_system.get_phase_planning_context(issue_doc)
-                progress.update(task, completed=True)
+            repo_context = await self._get_repo_context(issue_doc)
 
-            logger.info("RAG context retrieved", extra={
-                "hot_files_count": len(repo_context.get('hot_files', [])),
-                "code_chunks_count": len(repo_context.get('code_chunks', [])),
-                "docs_count": len(repo_context.get('documentation', []))
-            })
+            cache_key = self._phase_cache_key(
+                issue_doc, repo_context, conversation_history, previous_phases
+            )
+            if use_cache and cache_key in self._phase_cache:
+                self._phase_cache.move_to_end(cache_key)
+                logger.info("Phase breakdown served from cache")
+                return copy.deepcopy(self._phase_cache[cache_key])
 
-            # Build prompt
+            # Build prompt off the event loop so UI updates keep flowing
             if conversation_history:
                 # This is a regeneration with follow-up
                 last_question = conversation_history[-1]['question']
-                prompt = self.prompt_builder.build_follow_up_prompt(
+                prompt = await asyncio.to_thread(
+                    self.prompt_builder.build_follow_up_prompt,
                     issue_doc,
                     repo_context,
                     conversation_history[:-1],
@@ -254,7 +311,8 @@ class PhasePlanner:
                     previous_phases
                 )
             else:
-                prompt = self.prompt_builder.build_phase_planning_prompt(
+                prompt = await asyncio.to_thread(
+                    self.prompt_builder.build_phase_planning_prompt,
                     issue_doc,
                     repo_context
                 )
@@ -263,13 +321,13 @@ class PhasePlanner:
             with self.ui.show_progress("Generating phase plan with LLM...") as progress:
                 task = progress.add_task("Thinking...", total=None)
                 
-                start_time = datetime.now()
+                start_time = time.perf_counter()
                 response = await self.llm_client.generate(
                     model="qwen2.5-coder:7b",
                     prompt=prompt,
                     temperature=0.3
                 )
-                latency = (datetime.now() - start_time).total_seconds()
+                latency = time.perf_counter() - start_time
                 
                 progress.update(task, completed=True)
 
@@ -291,11 +349,17 @@ class PhasePlanner:
                 })
                 raise ValidationError(f"Dependency validation failed: {'; '.join(errors)}")
 
-            logger.info("Phase breakdown generated", extra={
-                "phase_count": len(phases),
-                "sizes": {size: sum(1 for p in phases if p['size'] == size) 
-                         for size in ['small', 'medium', 'large']}
-            })
+            self._phase_cache[cache_key] = copy.deepcopy(phases)
+            self._phase_cache.move_to_end(cache_key)
+            if len(self._phase_cache) > self.PHASE_CACHE_SIZE:
+                self._phase_cache.popitem(last=False)
+
+            if logger.isEnabledFor(logging.INFO):
+                size_counts = Counter(p['size'] for p in phases)
+                logger.info("Phase breakdown generated", extra={
+                    "phase_count": len(phases),
+                    "sizes": {size: size_counts[size] for size in PhaseValidator.VALID_SIZES}
+                })
 
             return phases
 
@@ -309,6 +373,108 @@ class PhasePlanner:
             logger.error("Unexpected error in phase generation", exc_info=True)
             raise PlannerError(f"Phase generation failed: {e}") from e
 
+    async def _get_repo_context(self, issue_doc: str) -> Dict[str, Any]:
+        """Retrieve repository context from RAG, once per issue document.
+
+        Follow-ups and regenerations within a session reuse the same
+        retrieval instead of querying the index again.
+
+        Args:
+            issue_doc: Issue documentation text
+
+        Returns:
+            Repository context dictionary
+        """
+        key = hashlib.sha1(issue_doc.encode('utf-8')).hexdigest()
+        repo_context = self._repo_context_cache.get(key)
+        if repo_context is not None:
+            return repo_context
+
+        with self.ui.show_progress("Retrieving repository context...") as progress:
+            task = progress.add_task("Analyzing codebase...", total=None)
+            repo_context = await self.rag_system.get_phase_planning_context(issue_doc)
+            progress.update(task, completed=True)
+
+        repo_context = self._dedupe_repo_context(repo_context)
+
+        if logger.isEnabledFor(logging.INFO):
+            logger.info("RAG context retrieved", extra={
+                "hot_files_count": len(repo_context.get('hot_files', [])),
+                "code_chunks_count": len(repo_context.get('code_chunks', [])),
+                "docs_count": len(repo_context.get('documentation', []))
+            })
+
+        self._repo_context_cache[key] = repo_context
+        return repo_context
+
+    @staticmethod
+    def _dedupe_repo_context(repo_context: Dict[str, Any]) -> Dict[str, Any]:
+        """Drop duplicate hot files and overlapping code chunks from RAG context.
+
+        Code chunks are keyed by (file_path, start_line) and hot files by path,
+        using the same fallbacks as ``PromptBuilder.format_repo_context``. The
+        input dictionary is left untouched; first occurrences win.
+
+        Args:
+            repo_context: Repository context from RAG
+
+        Returns:
+            Repository context without duplicate entries
+        """
+        def chunk_key(chunk: Any) -> Any:
+            if isinstance(chunk, dict):
+                return (
+                    chunk.get('file_path', chunk.get('path')),
+                    chunk.get('start_line', chunk.get('line'))
+                )
+            return chunk
+
+        def hot_file_key(file_info: Any) -> Any:
+            if isinstance(file_info, dict):
+                return file_info.get('path', file_info.get('file'))
+            return file_info
+
+        deduped = dict(repo_context)
+        for field, key_func in (('code_chunks', chunk_key), ('hot_files', hot_file_key)):
+            items = repo_context.get(field)
+            if not items:
+                continue
+            seen = set()
+            unique = []
+            for item in items:
+                key = key_func(item)
+                if key in seen:
+                    continue
+                seen.add(key)
+                unique.append(item)
+            deduped[field] = unique
+        return deduped
+
+    @staticmethod
+    def _phase_cache_key(
+        issue_doc: str,
+        repo_context: Dict[str, Any],
+        conversation_history: List[Dict[str, str]],
+        previous_phases: List[Dict[str, Any]]
+    ) -> str:
+        """Build a stable cache key from every input that shapes the LLM prompt.
+
+        Args:
+            issue_doc: Issue documentation text
+            repo_context: Repository context from RAG
+            conversation_history: Conversation history
+            previous_phases: Previously generated phases
+
+        Returns:
+            Hex digest identifying the generation inputs
+        """
+        payload = json.dumps(
+            [issue_doc, repo_context, conversation_history, previous_phases],
+            sort_keys=True,
+            default=str
+        )
+        return hashlib.sha256(payload.encode('utf-8')).hexdigest()
+
     async def save_phases(
         self,
         run_id: str,
@@ -331,74 +497,73 @@ class PhasePlanner:
             PlannerError: If saving fails
         """
         try:
-            artifact_paths = []
-
             # Create artifact directory
-            artifacts_dir = Path(self.config.base_path) / "data" / "artifacts" / run_id / "planning"
+            artifacts_dir = self._artifacts_root / run_id / "planning"
             artifacts_dir.mkdir(parents=True, exist_ok=True)
 
-            # Save each phase to state manager
-            for phase in phases:
-                phase_id = await self.state_manager.create_phase(
+            # Save all phases to state manager concurrently
+            phase_ids = await asyncio.gather(*(
+                self.state_manager.create_phase(
                     run_id=run_id,
                     phase_number=phase['phase_number'],
                     title=phase['title'],
                     intent=phase['intent'],
-                    plan=json.dumps(phase),
-                    max_retries=self.config.execution.max_retries if hasattr(self.config, 'execution') else 3,
+                    plan=phase,
+                    max_retries=self._max_retries,
                     size=phase['size']
                 )
-                logger.debug("Phase saved to state manager", extra={
-                    "run_id": run_id,
-                    "phase_id": phase_id,
-                    "phase_number": phase['phase_number']
-                })
-
-            # Generate and save PhasePlan.json
+                for phase in phases
+            ))
+            if logger.isEnabledFor(logging.DEBUG):
+                for phase, phase_id in zip(phases, phase_ids):
+                    logger.debug("Phase saved to state manager", extra={
+                        "run_id": run_id,
+                        "phase_id": phase_id,
+                        "phase_number": phase['phase_number']
+                    })
+
+            artifacts = []
+            writes = []
+
+            # Generate PhasePlan.json
             plan_json_path = artifacts_dir / "PhasePlan.json"
-            with open(plan_json_path, 'w', encoding='utf-8') as f:
-                json.dump(phases, f, indent=2)
-            artifact_paths.append(str(plan_json_path))
-
-            await self.state_manager.register_artifact(
-                run_id=run_id,
-                phase_id=None,
-                artifact_type='phase_plan',
-                file_path=str(plan_json_path),
-                description='Complete phase plan in JSON format'
-            )
+            writes.append(self._write_artifact(plan_json_path, json.dumps(phases, indent=2)))
+            artifacts.append(('phase_plan', plan_json_path, 'Complete phase plan in JSON format'))
 
-            # Generate and save PhasePlan.md
+            # Generate PhasePlan.md
             plan_md_path = artifacts_dir / "PhasePlan.md"
-            markdown = self.render_phase_plan_markdown(phases, run_id, repo_path, branch)
-            with open(plan_md_path, 'w', encoding='utf-8') as f:
-                f.write(markdown)
-            artifact_paths.append(str(plan_md_path))
-
-            await self.state_manager.register_artifact(
-                run_id=run_id,
-                phase_id=None,
-                artifact_type='phase_plan',
-                file_path=str(plan_md_path),
-                description='Human-readable phase plan in Markdown format'
-            )
+            markdown_stream = self.stream_phase_plan_markdown(phases, run_id, repo_path, branch)
+            markdown_stream.enable_buffering(size=16)
+            writes.append(asyncio.to_thread(markdown_stream.dump, str(plan_md_path), encoding='utf-8'))
+            artifacts.append(('phase_plan', plan_md_path, 'Human-readable phase plan in Markdown format'))
 
             # Generate individual phase detail files
             for phase in phases:
                 detail_markdown = self.render_phase_detail_markdown(phase, len(phases))
                 if detail_markdown is not None:
                     phase_detail_path = artifacts_dir / f"Phase_{phase['phase_number']}_Detail.md"
-                    with open(phase_detail_path, 'w', encoding='utf-8') as f:
-                        f.write(detail_markdown)
-                    artifact_paths.append(str(phase_detail_path))
-
-                    await self.state_manager.register_artifact(
-                        run_id=run_id,
-                        phase_id=None,
-                        artifact_type='phase_detail',
-                        file_path=str(phase_detail_path),
-                        description=f'Detailed specification for Phase {phase["phase_number"]}'
-                    )
+                    writes.append(self._write_artifact(phase_detail_path, detail_markdown))
+                    artifacts.append((
+                        'phase_detail',
+                        phase_detail_path,
+                        f'Detailed specification for Phase {phase["phase_number"]}'
+                    ))
+
+            # Write all artifact files concurrently
+            await asyncio.gather(*writes)
+
+            # Register all artifacts in one bulk insert
+            await self.state_manager.register_artifacts([
+                {
+                    'run_id': run_id,
+                    'phase_id': None,
+                    'artifact_type': artifact_type,
+                    'file_path': str(path),
+                    'metadata': {'description': description}
+                }
+                for artifact_type, path, description in artifacts
+            ])
+            artifact_paths = [str(path) for _, path, _ in artifacts]
 
             # Update run status to executing
             await self.state_manager.update_run_status(run_id, 'executing')
@@ -436,21 +601,47 @@ class PhasePlanner:
         Returns:
             Rendered markdown string
         """
+        stream = self.stream_phase_plan_markdown(phases, run_id, repo_path, branch)
         try:
-            template = self.jinja_env.get_template('phase_plan.md.j2')
-            markdown = template.render(
-                phases=phases,
-                run_id=run_id,
-                repo_path=repo_path,
-                branch=branch,
-                timestamp=datetime.now().isoformat()
-            )
-            return markdown
-        except TemplateNotFound as e:
-            raise PlannerError(f"Template not found: {e}")
+            return "".join(stream)
         except Exception as e:
             raise PlannerError(f"Template rendering failed: {e}")
 
+    def stream_phase_plan_markdown(
+        self,
+        phases: List[Dict[str, Any]],
+        run_id: str,
+        repo_path: str,
+        branch: str
+    ) -> TemplateStream:
+        """Render phase plan markdown lazily, chunk by chunk.
+
+        Lets large plans be written to disk without holding the whole
+        document in memory.
+
+        Args:
+            phases: List of phase dictionaries
+            run_id: Run identifier
+            repo_path: Repository path
+            branch: Git branch
+
+        Returns:
+            Template stream yielding markdown chunks
+
+        Raises:
+            PlannerError: If the template is not available
+        """
+        if self._phase_plan_template is None:
+            raise PlannerError("Template not found: phase_plan.md.j2")
+
+        return self._phase_plan_template.stream(
+            phases=phases,
+            run_id=run_id,
+            repo_path=repo_path,
+            branch=branch,
+            timestamp=datetime.now().isoformat()
+        )
+
     def render_phase_detail_markdown(
         self,
         phase: Dict[str, Any],
@@ -465,20 +656,29 @@ class PhasePlanner:
         Returns:
             Rendered markdown string, or None if template is not found
         """
+        if self._phase_detail_template is None:
+            logger.warning("Phase detail template not found, skipping: phase_detail.md.j2")
+            return None
+
         try:
-            template = self.jinja_env.get_template('phase_detail.md.j2')
-            markdown = template.render(
+            markdown = self._phase_detail_template.render(
                 phase=phase,
                 total_phases=total_phases
             )
             return markdown
-        except TemplateNotFound as e:
-            logger.warning(f"Phase detail template not found, skipping: {e}")
-            return None
         except Exception as e:
             raise PlannerError(f"Template rendering failed: {e}")
 
-    def _load_issue_documentation(self, issue_doc_path: str) -> str:
+    async def _write_artifact(self, path: Path, content: str) -> None:
+        """Write an artifact file off the event loop.
+
+        Args:
+            path: Destination file path
+            content: Text content to write
+        """
+        await asyncio.to_thread(path.write_text, content, encoding='utf-8')
+
+    async def _load_issue_documentation(self, issue_doc_path: str) -> str:
         """Load issue documentation from file.
 
         Args:
@@ -495,8 +695,7 @@ class PhasePlanner:
             if not path.exists():
                 raise PlannerError(f"Issue documentation not found: {issue_doc_path}")
 
-            with open(path, 'r', encoding='utf-8') as f:
-                content = f.read()
+            content = await asyncio.to_thread(path.read_text, encoding='utf-8')
 
             # If it's a JSON file, extract relevant fields
             if path.suffix.lower() == '.json':
@@ -538,19 +737,15 @@ class PhasePlanner:
             PlannerError: If plan cannot be loaded
         """
         try:
-            plan_path = Path(self.config.base_path) / "data" / "artifacts" / run_id / "planning" / "PhasePlan.json"
+            plan_path = self._artifacts_root / run_id / "planning" / "PhasePlan.json"
             
             if not plan_path.exists():
                 raise PlannerError(f"Phase plan not found for run: {run_id}")
 
-            with open(plan_path, 'r', encoding='utf-8') as f:
-                phases = json.load(f)
+            phases = json.loads(await asyncio.to_thread(plan_path.read_bytes))
 
             # Validate loaded phases
-            for phase in phases:
-                is_valid, errors = PhaseValidator.validate_phase_structure(phase)
-                if not is_valid:
-                    raise ValidationError(f"Invalid phase structure: {'; '.join(errors)}")
+            PhaseValidator.validate_all(phases)
 
             logger.info("Phase plan loaded", extra={
                 "run_id": run_id,
@@ -1,29 +1,177 @@
 """Interactive terminal UI for phase planner using rich library."""
 
-from typing import List, Dict, Any, Optional
-from rich.console import Console
+from contextlib import contextmanager
+from dataclasses import dataclass
+from itertools import takewhile
+from typing import TYPE_CHECKING, List, Dict, Any, Iterator, Optional, Tuple
+from rich.console import Console, Group, RenderableType
+from rich.segment import Segments
 from rich.table import Table
+from rich.text import Text
 from rich.panel import Panel
 from rich.prompt import Prompt, Confirm
-from rich.progress import Progress, SpinnerColumn, TextColumn
-from rich.syntax import Syntax
-from rich.markdown import Markdown
 from rich import box
 
+if TYPE_CHECKING:
+    from rich.progress import Progress
+
+try:
+    # Gives input() line editing and history for multi-line feedback
+    import readline  # noqa: F401
+except ImportError:
+    pass
+
+
+_SIZE_MARKUP = {
+    'small': "[green]🟢 Small[/green]",
+    'medium': "[yellow]🟡 Medium[/yellow]",
+    'large': "[red]🔴 Large[/red]",
+}
+
+# Prebuilt styled cells for the summary table; no markup parsing per row
+_SIZE_TEXT = {
+    'small': Text.assemble(("🟢 Small", "green")),
+    'medium': Text.assemble(("🟡 Medium", "yellow")),
+    'large': Text.assemble(("🔴 Large", "red")),
+}
+
+_APPROVAL_MENU = (
+    "[bold]What would you like to do?[/bold]\n"
+    "  [A] Approve and save phases\n"
+    "  [Q] Ask a question / provide feedback\n"
+    "  [R] Regenerate phase plan\n"
+    "  [D] View phase details\n"
+    "  [X] Abort planning\n"
+)
+
+
+@dataclass(frozen=True, slots=True)
+class _PhaseTable:
+    """Column-wise view of the phase fields shown in the summary table.
+
+    Built once per display so the cache key and the table rows read
+    prepared columns instead of looking fields up in each phase dict.
+    """
+    numbers: Tuple[str, ...]
+    titles: Tuple[str, ...]
+    sizes: Tuple[str, ...]
+    file_counts: Tuple[str, ...]
+    deps: Tuple[Tuple[int, ...], ...]
+    deps_strs: Tuple[str, ...]
+    size_cells: Tuple[Text, ...]
+
+    @classmethod
+    def from_phases(cls, phases: List[Dict[str, Any]]) -> "_PhaseTable":
+        """Split a list of phase dictionaries into columns.
+
+        Args:
+            phases: List of phase dictionaries
+
+        Returns:
+            Column-wise phase table
+        """
+        deps = tuple(tuple(phase.get('dependencies', [])) for phase in phases)
+        sizes = tuple(phase['size'] for phase in phases)
+        return cls(
+            numbers=tuple(str(phase['phase_number']) for phase in phases),
+            titles=tuple(phase['title'] for phase in phases),
+            sizes=sizes,
+            file_counts=tuple(str(len(phase.get('files', []))) for phase in phases),
+            deps=deps,
+            deps_strs=tuple(", ".join(map(str, d_list)) if d_list else "-" for d_list in deps),
+            size_cells=tuple(_SIZE_TEXT.get(size, _SIZE_TEXT['large']) for size in sizes)
+        )
+
+    def key(self) -> Tuple:
+        """Return a hashable key covering every displayed column."""
+        return (self.numbers, self.titles, self.sizes, self.file_counts, self.deps)
+
 
 class PlannerUI:
     """Interactive terminal UI for phase planning."""
 
+    SUMMARY_CACHE_SIZE = 8
+
     def __init__(self):
         """Initialize the UI with a rich console."""
         self.console = Console()
+        self._frame_buffer: Optional[List[RenderableType]] = None
+        self._summary_cache: Dict[Tuple, Segments] = {}
+        self._progress: Optional["Progress"] = None
+
+    @contextmanager
+    def frame(self) -> Iterator[None]:
+        """Collect everything displayed inside the block into one screen update.
+
+        Renderables are buffered and written with a single console print when
+        the next prompt or progress spinner needs the terminal, or when the
+        block exits. Nested frames join the outermost one.
+        """
+        if self._frame_buffer is not None:
+            yield
+            return
+
+        self._frame_buffer = []
+        try:
+            yield
+        finally:
+            self._flush_frame()
+            self._frame_buffer = None
+
+    def _emit(self, *renderables: RenderableType) -> None:
+        """Display renderables, deferring them if a frame is open.
+
+        Args:
+            renderables: Panels, tables, or markup strings to display
+        """
+        if self._frame_buffer is not None:
+            self._frame_buffer.extend(renderables)
+        else:
+            self.console.print(Group(*renderables))
+
+    def _flush_frame(self) -> None:
+        """Write any buffered renderables of the open frame to the console."""
+        if self._frame_buffer:
+            self.console.print(Group(*self._frame_buffer))
+            self._frame_buffer.clear()
+
+    def _print_block(self, renderable: RenderableType) -> None:
+        """Print a renderable surrounded by blank lines in a single console write.
+
+        Args:
+            renderable: Panel, table, or markup string to display
+        """
+        self._emit("", renderable, "")
 
     def display_phase_summary(self, phases: List[Dict[str, Any]]) -> None:
         """Display a summary table of all phases.
 
+        The rendered table is cached per phase content and console width, so
+        returning to an unchanged plan skips Rich's layout pass.
+
         Args:
             phases: List of phase dictionaries
         """
+        columns = _PhaseTable.from_phases(phases)
+        key = (self.console.width, columns.key())
+        rendered = self._summary_cache.get(key)
+        if rendered is None:
+            rendered = Segments(list(self.console.render(self._build_summary_table(columns))))
+            if len(self._summary_cache) >= self.SUMMARY_CACHE_SIZE:
+                self._summary_cache.pop(next(iter(self._summary_cache)))
+            self._summary_cache[key] = rendered
+
+        self._print_block(rendered)
+
+    def _build_summary_table(self, columns: "_PhaseTable") -> Table:
+        """Build the phase summary table.
+
+        Args:
+            columns: Column-wise view of the phases to display
+
+        Returns:
+            Rich table with one row per phase
+        """
         table = Table(title="Phase Plan Summary", box=box.ROUNDED)
 
         table.add_column("#", justify="right", style="cyan", no_wrap=True)
@@ -32,27 +180,16 @@ class PlannerUI:
         table.add_column("Files", justify="right", style="blue")
         table.add_column("Dependencies", justify="center", style="magenta")
 
-        for phase in phases:
-            phase_num = str(phase['phase_number'])
-            title = phase['title']
-            size = phase['size']
-            files_count = str(len(phase.get('files', [])))
-            deps = phase.get('dependencies', [])
-            deps_str = ", ".join(str(d) for d in deps) if deps else "-"
-
-            # Color code size
-            if size == 'small':
-                size_display = "[green]🟢 Small[/green]"
-            elif size == 'medium':
-                size_display = "[yellow]🟡 Medium[/yellow]"
-            else:
-                size_display = "[red]🔴 Large[/red]"
+        for row in zip(
+            columns.numbers,
+            columns.titles,
+            columns.size_cells,
+            columns.file_counts,
+            columns.deps_strs
+        ):
+            table.add_row(*row)
 
-            table.add_row(phase_num, title, size_display, files_count, deps_str)
-
-        self.console.print()
-        self.console.print(table)
-        self.console.print()
+        return table
 
     def display_phase_detail(self, phase: Dict[str, Any]) -> None:
         """Display detailed view of a single phase.
@@ -69,13 +206,7 @@ class PlannerUI:
         content_lines.append(f"[bold]Intent:[/bold] {phase['intent']}")
         content_lines.append("")
 
-        size = phase['size']
-        if size == 'small':
-            size_display = "[green]🟢 Small[/green]"
-        elif size == 'medium':
-            size_display = "[yellow]🟡 Medium[/yellow]"
-        else:
-            size_display = "[red]🔴 Large[/red]"
+        size_display = _SIZE_MARKUP.get(phase['size'], _SIZE_MARKUP['large'])
         content_lines.append(f"[bold]Size:[/bold] {size_display}")
         content_lines.append("")
 
@@ -120,9 +251,7 @@ class PlannerUI:
             box=box.ROUNDED
         )
 
-        self.console.print()
-        self.console.print(panel)
-        self.console.print()
+        self._print_block(panel)
 
     def prompt_approval_action(self) -> str:
         """Prompt user for action on the phase plan.
@@ -130,13 +259,8 @@ class PlannerUI:
         Returns:
             User choice: 'approve', 'question', 'regenerate', 'detail', or 'abort'
         """
-        self.console.print("[bold]What would you like to do?[/bold]")
-        self.console.print("  [A] Approve and save phases")
-        self.console.print("  [Q] Ask a question / provide feedback")
-        self.console.print("  [R] Regenerate phase plan")
-        self.console.print("  [D] View phase details")
-        self.console.print("  [X] Abort planning")
-        self.console.print()
+        self._emit(_APPROVAL_MENU)
+        self._flush_frame()
 
         while True:
             choice = Prompt.ask(
@@ -164,6 +288,7 @@ class PlannerUI:
         Returns:
             Selected phase number
         """
+        self._flush_frame()
         while True:
             try:
                 phase_num = Prompt.ask(
@@ -184,41 +309,44 @@ class PlannerUI:
         Returns:
             User's question text
         """
-        self.console.print()
-        self.console.print("[bold]Enter your question or feedback:[/bold]")
-        self.console.print("[dim](Press Enter twice when done)[/dim]")
-        self.console.print()
-
-        lines = []
-        empty_count = 0
-
-        while empty_count < 1:
-            line = input()
-            if not line.strip():
-                empty_count += 1
-            else:
-                empty_count = 0
-                lines.append(line)
-
-        question = "\n".join(lines).strip()
+        self._emit(
+            "\n[bold]Enter your question or feedback:[/bold]\n"
+            "[dim](Press Enter twice when done)[/dim]\n"
+        )
+        self._flush_frame()
+
+        # Read lines until the first blank one
+        question = "\n".join(takewhile(str.strip, iter(input, None))).strip()
         return question
 
-    def show_progress(self, message: str) -> Progress:
+    def show_progress(self, message: str) -> "Progress":
         """Show a progress spinner with a message.
 
+        A single Progress instance is created on first use and reused by
+        later calls, with tasks from the previous use cleared. Spinners are
+        therefore sequential: do not nest ``show_progress`` blocks.
+
         Args:
             message: Progress message to display
 
         Returns:
             Progress object (caller should use as context manager)
         """
-        progress = Progress(
-            SpinnerColumn(),
-            TextColumn("[progress.description]{task.description}"),
-            console=self.console,
-            transient=True
-        )
-        return progress
+        self._flush_frame()
+        if self._progress is None:
+            # Imported on first use: sessions that never show a spinner skip it
+            from rich.progress import Progress, SpinnerColumn, TextColumn
+
+            self._progress = Progress(
+                SpinnerColumn(),
+                TextColumn("[progress.description]{task.description}"),
+                console=self.console,
+                transient=True
+            )
+        else:
+            for task_id in self._progress.task_ids:
+                self._progress.remove_task(task_id)
+        return self._progress
 
     def show_error(self, error_message: str, suggestion: Optional[str] = None) -> None:
         """Display an error message.
@@ -238,9 +366,7 @@ class PlannerUI:
             box=box.ROUNDED
         )
 
-        self.console.print()
-        self.console.print(panel)
-        self.console.print()
+        self._print_block(panel)
 
     def show_success(self, message: str) -> None:
         """Display a success message.
@@ -254,9 +380,7 @@ class PlannerUI:
             box=box.ROUNDED
         )
 
-        self.console.print()
-        self.console.print(panel)
-        self.console.print()
+        self._print_block(panel)
 
     def show_info(self, message: str, title: Optional[str] = None) -> None:
         """Display an informational message.
@@ -272,9 +396,7 @@ class PlannerUI:
             box=box.ROUNDED
         )
 
-        self.console.print()
-        self.console.print(panel)
-        self.console.print()
+        self._print_block(panel)
 
     def confirm(self, message: str, default: bool = False) -> bool:
         """Prompt user for yes/no confirmation.
@@ -286,4 +408,5 @@ class PlannerUI:
         Returns:
             True if confirmed, False otherwise
         """
+        self._flush_frame()
         return Confirm.ask(message, default=default)
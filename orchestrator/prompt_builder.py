@@ -1,8 +1,104 @@
 """Utility for building prompts from templates and context."""
 
-import yaml
+import io
+import json
+import os
+from functools import lru_cache
+from string import Formatter
 from pathlib import Path
-from typing import Dict, List, Any, Optional
+from typing import Callable, Dict, List, Any, Optional, Tuple
+
+import yaml
+
+try:
+    from yaml import CSafeLoader as _YamlLoader
+except ImportError:
+    from yaml import SafeLoader as _YamlLoader
+
+
+# json.dumps builds a fresh encoder whenever non-default options are passed
+_PHASES_ENCODER = json.JSONEncoder(indent=2)
+
+
+@lru_cache(maxsize=4)
+def _load_prompts(path: str, mtime: float) -> Dict[str, Any]:
+    """Parse a prompts.yaml file, memoized on its path and modification time.
+
+    The returned dictionary is shared between PromptBuilder instances and
+    must be treated as read-only.
+
+    Args:
+        path: Path to prompts.yaml configuration file
+        mtime: File modification time, so edits invalidate the cache
+
+    Returns:
+        Parsed prompts configuration
+    """
+    with open(path, 'r', encoding='utf-8') as f:
+        return yaml.load(f, Loader=_YamlLoader)
+
+
+@lru_cache(maxsize=16)
+def _compile_template(template: str) -> Callable[..., str]:
+    """Pre-parse a ``str.format`` template into a reusable render function.
+
+    The template is split into literal text and named fields once; rendering
+    then only looks up and formats field values. Templates using positional,
+    attribute, or index fields, or nested format specs, fall back to
+    ``template.format``.
+
+    Args:
+        template: Prompt template with ``{name}`` placeholders
+
+    Returns:
+        Function taking the field values as keyword arguments and
+        returning the rendered text
+    """
+    conversions = {None: None, 's': str, 'r': repr, 'a': ascii}
+    parts = []
+    for literal, field_name, format_spec, conversion in Formatter().parse(template):
+        if literal:
+            parts.append((literal, None, None, None))
+        if field_name is None:
+            continue
+        if (
+            not field_name.isidentifier()
+            or (format_spec and '{' in format_spec)
+            or conversion not in conversions
+        ):
+            return template.format
+        parts.append((None, field_name, format_spec, conversions[conversion]))
+
+    def render(**fields: Any) -> str:
+        out = []
+        for literal, field_name, format_spec, convert in parts:
+            if literal is not None:
+                out.append(literal)
+                continue
+            value = fields[field_name]
+            if convert is not None:
+                value = convert(value)
+            out.append(value if type(value) is str and not format_spec else format(value, format_spec))
+        return "".join(out)
+
+    return render
+
+
+def _get_any(d: Dict[str, Any], *keys: str, default: Any = None) -> Any:
+    """Return the value of the first key present in a dictionary.
+
+    Args:
+        d: Dictionary to look up
+        keys: Candidate keys, in order of preference
+        default: Value returned when none of the keys is present
+
+    Returns:
+        Value of the first present key, or default
+    """
+    for key in keys:
+        if key in d:
+            return d[key]
+    return default
 
 
 class PromptBuilder:
@@ -14,8 +110,11 @@ class PromptBuilder:
         Args:
             prompts_config_path: Path to prompts.yaml configuration file
         """
-        with open(prompts_config_path, 'r', encoding='utf-8') as f:
-            self.config = yaml.safe_load(f)
+        self.config = _load_prompts(
+            prompts_config_path, os.path.getmtime(prompts_config_path)
+        )
+        # Last formatted context, held with the context object it came from
+        self._formatted_context: Optional[Tuple[Dict[str, Any], Dict[str, str]]] = None
 
     def build_phase_planning_prompt(
         self,
@@ -39,8 +138,8 @@ class PromptBuilder:
         formatted_context = self.format_repo_context(repo_context)
 
         # Build the prompt
-        prompt_template = config['phase_planning_prompt']
-        prompt = prompt_template.format(
+        prompt_template = _compile_template(config['phase_planning_prompt'])
+        prompt = prompt_template(
             issue_documentation=issue_doc,
             hot_files=formatted_context['hot_files'],
             relevant_code=formatted_context['relevant_code'],
@@ -88,12 +187,11 @@ class PromptBuilder:
             ])
 
         # Format previous phases
-        import json
-        phases_json = json.dumps(previous_phases, indent=2)
+        phases_json = _PHASES_ENCODER.encode(previous_phases)
 
         # Build follow-up prompt
-        follow_up_template = self.config['follow_up_prompt']
-        follow_up = follow_up_template.format(
+        follow_up_template = _compile_template(self.config['follow_up_prompt'])
+        follow_up = follow_up_template(
             issue_documentation=issue_doc,
             hot_files=formatted_context['hot_files'],
             relevant_code=formatted_context['relevant_code'],
@@ -115,64 +213,78 @@ class PromptBuilder:
     def format_repo_context(self, context_dict: Dict[str, Any]) -> Dict[str, str]:
         """Convert RAG context dictionary to formatted markdown sections.
 
+        Each section is written straight into a single buffer rather than
+        collected as a list of fragments and joined. Follow-up turns pass the
+        same context object again, so the result for the most recent context
+        is reused; contexts are treated as immutable once formatted.
+
         Args:
             context_dict: Context dictionary from RAG system
 
         Returns:
             Dictionary with formatted sections: hot_files, relevant_code, documentation
         """
-        formatted = {
-            'hot_files': '',
-            'relevant_code': '',
-            'documentation': ''
-        }
+        cached = self._formatted_context
+        if cached is not None and cached[0] is context_dict:
+            return dict(cached[1])
+
+        formatted = {}
 
         # Format hot files
-        if 'hot_files' in context_dict and context_dict['hot_files']:
-            hot_files_list = []
-            for file_info in context_dict['hot_files']:
+        hot_files = context_dict.get('hot_files')
+        if hot_files:
+            buf = io.StringIO()
+            for i, file_info in enumerate(hot_files):
+                if i:
+                    buf.write("\n")
                 if isinstance(file_info, dict):
-                    path = file_info.get('path', file_info.get('file', 'unknown'))
-                    commit_count = file_info.get('commit_count', file_info.get('commits', 0))
-                    hot_files_list.append(f"- `{path}` ({commit_count} commits)")
+                    path = _get_any(file_info, 'path', 'file', default='unknown')
+                    commit_count = _get_any(file_info, 'commit_count', 'commits', default=0)
+                    buf.write(f"- `{path}` ({commit_count} commits)")
                 else:
-                    hot_files_list.append(f"- `{file_info}`")
-            formatted['hot_files'] = "\n".join(hot_files_list) if hot_files_list else "No hot files identified"
+                    buf.write(f"- `{file_info}`")
+            formatted['hot_files'] = buf.getvalue()
         else:
             formatted['hot_files'] = "No hot files identified"
 
         # Format relevant code chunks
-        if 'code_chunks' in context_dict and context_dict['code_chunks']:
-            code_chunks_list = []
-            for chunk in context_dict['code_chunks']:
+        code_chunks = context_dict.get('code_chunks')
+        if code_chunks:
+            buf = io.StringIO()
+            for i, chunk in enumerate(code_chunks):
+                if i:
+                    buf.write("\n")
                 if isinstance(chunk, dict):
-                    file_path = chunk.get('file_path', chunk.get('path', 'unknown'))
-                    content = chunk.get('content', chunk.get('text', ''))
-                    start_line = chunk.get('start_line', chunk.get('line', ''))
-                    
-                    chunk_text = f"\n**{file_path}**"
+                    file_path = _get_any(chunk, 'file_path', 'path', default='unknown')
+                    content = _get_any(chunk, 'content', 'text', default='')
+                    start_line = _get_any(chunk, 'start_line', 'line', default='')
+
+                    buf.write(f"\n**{file_path}**")
                     if start_line:
-                        chunk_text += f" (line {start_line})"
-                    chunk_text += f"\n```\n{content}\n```"
-                    code_chunks_list.append(chunk_text)
+                        buf.write(f" (line {start_line})")
+                    buf.write(f"\n```\n{content}\n```")
                 else:
-                    code_chunks_list.append(f"\n```\n{chunk}\n```")
-            formatted['relevant_code'] = "\n".join(code_chunks_list) if code_chunks_list else "No relevant code found"
+                    buf.write(f"\n```\n{chunk}\n```")
+            formatted['relevant_code'] = buf.getvalue()
         else:
             formatted['relevant_code'] = "No relevant code found"
 
         # Format documentation
-        if 'documentation' in context_dict and context_dict['documentation']:
-            doc_list = []
-            for doc in context_dict['documentation']:
+        documentation = context_dict.get('documentation')
+        if documentation:
+            buf = io.StringIO()
+            for i, doc in enumerate(documentation):
+                if i:
+                    buf.write("\n")
                 if isinstance(doc, dict):
-                    title = doc.get('title', doc.get('path', 'Documentation'))
-                    content = doc.get('content', doc.get('text', ''))
-                    doc_list.append(f"\n**{title}**\n{content}")
+                    title = _get_any(doc, 'title', 'path', default='Documentation')
+                    content = _get_any(doc, 'content', 'text', default='')
+                    buf.write(f"\n**{title}**\n{content}")
                 else:
-                    doc_list.append(f"\n{doc}")
-            formatted['documentation'] = "\n".join(doc_list) if doc_list else "No documentation found"
+                    buf.write(f"\n{doc}")
+            formatted['documentation'] = buf.getvalue()
         else:
             formatted['documentation'] = "No documentation found"
 
-        return formatted
+        self._formatted_context = (context_dict, formatted)
+        return dict(formatted)
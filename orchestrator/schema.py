@@ -6,9 +6,18 @@ import aiosqlite
 
 logger = logging.getLogger(__name__)
 
-SCHEMA_VERSION = 1
+SCHEMA_VERSION = 5
 
 CREATE_TABLES_SQL = """
+-- Storage notes:
+-- * INTEGER PRIMARY KEY columns alias the rowid, so tables keyed that way
+--   (schema_version) are already a single b-tree; WITHOUT ROWID would not
+--   save anything.
+-- * TIMESTAMP columns hold ISO-8601 text written by the sqlite3 datetime
+--   adapter. That format sorts and range-compares correctly as text and
+--   round-trips to datetime in the state models, so it is kept over epoch
+--   integers.
+
 -- Schema version tracking
 CREATE TABLE IF NOT EXISTS schema_version (
     version INTEGER PRIMARY KEY,
@@ -88,7 +97,11 @@ CREATE TABLE IF NOT EXISTS artifacts (
     run_id TEXT NOT NULL,
     phase_id TEXT,
     execution_id TEXT,
-    artifact_type TEXT NOT NULL CHECK(artifact_type IN ('phase_plan', 'spec', 'copilot_output', 'findings_report', 'verification_log')),
+    artifact_type TEXT NOT NULL CHECK(artifact_type IN (
+        'phase_plan', 'phase_detail', 'spec', 'copilot_output', 'copilot_prompt',
+        'findings_report', 'findings_report_md', 'findings_report_json',
+        'verification_log', 'feedback_spec'
+    )),
     file_path TEXT NOT NULL,
     created_at TIMESTAMP NOT NULL,
     metadata TEXT,
@@ -110,33 +123,129 @@ CREATE TABLE IF NOT EXISTS manual_interventions (
 );
 
 -- Indexes for common queries
-CREATE INDEX IF NOT EXISTS idx_runs_status ON runs(status);
-CREATE INDEX IF NOT EXISTS idx_phases_run_id ON phases(run_id);
-CREATE INDEX IF NOT EXISTS idx_phases_status ON phases(status);
-CREATE INDEX IF NOT EXISTS idx_executions_phase_id ON executions(phase_id);
-CREATE INDEX IF NOT EXISTS idx_findings_execution_id ON findings(execution_id);
+CREATE INDEX IF NOT EXISTS idx_runs_status_created ON runs(status, created_at DESC);
+CREATE INDEX IF NOT EXISTS idx_runs_created ON runs(created_at);
+CREATE INDEX IF NOT EXISTS idx_phases_run_phase ON phases(run_id, phase_number);
+CREATE INDEX IF NOT EXISTS idx_phases_run_status_num ON phases(run_id, status, phase_number);
+CREATE INDEX IF NOT EXISTS idx_executions_phase_pass ON executions(phase_id, pass_number DESC);
 CREATE INDEX IF NOT EXISTS idx_findings_severity ON findings(severity);
-CREATE INDEX IF NOT EXISTS idx_artifacts_run_id ON artifacts(run_id);
-CREATE INDEX IF NOT EXISTS idx_interventions_phase_id ON manual_interventions(phase_id);
+CREATE INDEX IF NOT EXISTS idx_findings_exec_sev_resolved ON findings(execution_id, severity, resolved);
+CREATE INDEX IF NOT EXISTS idx_artifacts_run_created ON artifacts(run_id, created_at);
+CREATE INDEX IF NOT EXISTS idx_artifacts_run_type_created ON artifacts(run_id, artifact_type, created_at);
+CREATE INDEX IF NOT EXISTS idx_artifacts_phase_created ON artifacts(phase_id, created_at);
+CREATE INDEX IF NOT EXISTS idx_interventions_phase_resolved ON manual_interventions(phase_id, resolved_at);
+
+-- Keep run progress in step with phase status changes
+CREATE TRIGGER IF NOT EXISTS trg_phase_in_progress
+AFTER UPDATE OF status ON phases
+WHEN NEW.status = 'in_progress'
+BEGIN
+    UPDATE runs SET current_phase_id = NEW.phase_id WHERE run_id = NEW.run_id;
+END;
+
+CREATE TRIGGER IF NOT EXISTS trg_phase_completed
+AFTER UPDATE OF status ON phases
+WHEN NEW.status = 'completed' AND OLD.status <> 'completed'
+BEGIN
+    UPDATE runs SET completed_phases = completed_phases + 1 WHERE run_id = NEW.run_id;
+END;
 """
 
+# Column order shared by single and bulk findings inserts
+INSERT_FINDING_SQL = """INSERT INTO findings (
+    finding_id, execution_id, severity, category, title,
+    description, evidence, suggested_fix, created_at
+) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)"""
+
+# Upgrade steps keyed by the schema version they bring a database to.
+# New tables and indexes come from CREATE_TABLES_SQL; migrations only hold
+# changes it cannot express, such as dropping superseded objects.
+MIGRATIONS = {
+    2: """
+-- Superseded by idx_phases_run_status_num
+DROP INDEX IF EXISTS idx_phases_status;
+""",
+    3: """
+-- Superseded by indexes that also cover each lookup's ORDER BY/filter column
+DROP INDEX IF EXISTS idx_runs_status;
+DROP INDEX IF EXISTS idx_phases_run_id;
+DROP INDEX IF EXISTS idx_artifacts_run_id;
+DROP INDEX IF EXISTS idx_artifacts_run_type;
+DROP INDEX IF EXISTS idx_interventions_phase_id;
+""",
+    4: """
+-- Prefixes of idx_executions_phase_pass and idx_findings_exec_sev_resolved
+DROP INDEX IF EXISTS idx_executions_phase_id;
+DROP INDEX IF EXISTS idx_findings_execution_id;
+-- Refresh planner statistics for the new index set
+ANALYZE;
+""",
+    5: """
+-- Widen artifact_type to every type the Artifact model accepts. SQLite
+-- cannot alter a CHECK constraint, so the table is rebuilt.
+CREATE TABLE artifacts_v5 (
+    artifact_id TEXT PRIMARY KEY,
+    run_id TEXT NOT NULL,
+    phase_id TEXT,
+    execution_id TEXT,
+    artifact_type TEXT NOT NULL CHECK(artifact_type IN (
+        'phase_plan', 'phase_detail', 'spec', 'copilot_output', 'copilot_prompt',
+        'findings_report', 'findings_report_md', 'findings_report_json',
+        'verification_log', 'feedback_spec'
+    )),
+    file_path TEXT NOT NULL,
+    created_at TIMESTAMP NOT NULL,
+    metadata TEXT,
+    FOREIGN KEY (run_id) REFERENCES runs(run_id),
+    FOREIGN KEY (phase_id) REFERENCES phases(phase_id),
+    FOREIGN KEY (execution_id) REFERENCES executions(execution_id)
+);
+INSERT INTO artifacts_v5 (
+    artifact_id, run_id, phase_id, execution_id, artifact_type,
+    file_path, created_at, metadata
+)
+SELECT artifact_id, run_id, phase_id, execution_id, artifact_type,
+       file_path, created_at, metadata
+FROM artifacts;
+DROP TABLE artifacts;
+ALTER TABLE artifacts_v5 RENAME TO artifacts;
+CREATE INDEX idx_artifacts_run_created ON artifacts(run_id, created_at);
+CREATE INDEX idx_artifacts_run_type_created ON artifacts(run_id, artifact_type, created_at);
+CREATE INDEX idx_artifacts_phase_created ON artifacts(phase_id, created_at);
+""",
+}
+
+
+async def _execute_transaction(db: aiosqlite.Connection, script: str) -> None:
+    """Run a SQL script as a single transaction, rolling back on failure."""
+    try:
+        await db.executescript(f"BEGIN;\n{script}\nCOMMIT;")
+    except Exception:
+        if db.in_transaction:
+            await db.rollback()
+        raise
+
 
 async def initialize_database(db: aiosqlite.Connection) -> None:
-    """Initialize database schema and apply migrations."""
+    """Initialize database schema and apply migrations.
+
+    All DDL runs inside a single transaction so the schema lands with one
+    commit instead of one per statement.
+    """
     try:
-        await db.executescript(CREATE_TABLES_SQL)
+        await _execute_transaction(db, CREATE_TABLES_SQL)
         
         # Check current schema version
-        async with db.execute("SELECT version FROM schema_version ORDER BY version DESC LIMIT 1") as cursor:
-            row = await cursor.fetchone()
-            current_version = row[0] if row else 0
+        async with db.execute("SELECT COALESCE(MAX(version), 0) FROM schema_version") as cursor:
+            (current_version,) = await cursor.fetchone()
         
         if current_version < SCHEMA_VERSION:
-            await db.execute(
-                "INSERT INTO schema_version (version) VALUES (?)",
-                (SCHEMA_VERSION,)
-            )
-            await db.commit()
+            for version in range(current_version + 1, SCHEMA_VERSION + 1):
+                await _execute_transaction(
+                    db,
+                    f"{MIGRATIONS.get(version, '')}\n"
+                    f"INSERT INTO schema_version (version) VALUES ({version});"
+                )
             logger.info(f"Database schema initialized to version {SCHEMA_VERSION}")
         else:
             logger.debug(f"Database schema already at version {current_version}")
@@ -149,8 +258,9 @@ async def initialize_database(db: aiosqlite.Connection) -> None:
 async def get_schema_version(db: aiosqlite.Connection) -> int:
     """Get current schema version."""
     try:
-        async with db.execute("SELECT version FROM schema_version ORDER BY version DESC LIMIT 1") as cursor:
-            row = await cursor.fetchone()
-            return row[0] if row else 0
-    except:
+        async with db.execute("SELECT COALESCE(MAX(version), 0) FROM schema_version") as cursor:
+            (version,) = await cursor.fetchone()
+            return version
+    except aiosqlite.OperationalError:
+        # schema_version table does not exist yet
         return 0
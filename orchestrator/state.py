@@ -1,14 +1,18 @@
 """State management for Agent Orchestrator using SQLite."""
 
+import asyncio
 import logging
 import json
+import sqlite3
 import uuid
+from collections import defaultdict
+from contextlib import asynccontextmanager
 from datetime import datetime
-from typing import Optional, List, Dict, Any, Tuple
+from typing import AsyncIterator, Iterator, Optional, List, Dict, Any, Sequence, Tuple, Union
 from pathlib import Path
 import aiosqlite
 
-from .schema import initialize_database
+from .schema import INSERT_FINDING_SQL, initialize_database
 from .models import (
     RunState, PhaseState, ExecutionState, Finding, 
     Artifact, ManualIntervention, RunSummary
@@ -20,20 +24,104 @@ from .exceptions import (
 
 logger = logging.getLogger(__name__)
 
+_EXPORT_ENCODER = json.JSONEncoder(indent=2)
+# Stored JSON columns are only read back by json.loads, so skip the spaces
+_COLUMN_ENCODER = json.JSONEncoder(separators=(',', ':'))
+
+
+def _new_id() -> str:
+    """Random 128-bit id as 32 hex digits, skipping ``str(UUID)`` dash formatting."""
+    return uuid.uuid4().hex
+
+
+def _now() -> Tuple[datetime, str]:
+    """Current time, plus the text stored for it in TIMESTAMP columns.
+    
+    The text matches what the sqlite3 default datetime adapter writes
+    (``isoformat(' ')``); passing it pre-adapted skips the adapter lookup
+    per bound parameter, and the datetime is reused for returned models.
+    """
+    now = datetime.now()
+    return now, now.isoformat(' ')
+
+
+def _encode_column(value: Union[Dict[str, Any], str]) -> str:
+    """Serialize a JSON column value, passing pre-serialized strings through."""
+    return value if isinstance(value, str) else _COLUMN_ENCODER.encode(value)
+
+
+def _dump_json_sections(output_path: str, sections: List[Tuple[str, Any]]) -> None:
+    """Write a JSON object one top-level key at a time.
+    
+    Output matches ``json.dump(dict(sections), f, indent=2)``, but iterator
+    values are written item by item so the full document is never held in
+    memory. Encoded JSON never contains a raw newline inside a string, so
+    nested values are re-indented with a plain ``replace``.
+    
+    Args:
+        output_path: File to write
+        sections: (key, value) pairs; iterator values are streamed as arrays
+    """
+    Path(output_path).parent.mkdir(parents=True, exist_ok=True)
+    with open(output_path, 'w') as f:
+        f.write('{')
+        for i, (key, value) in enumerate(sections):
+            f.write(f'{"," if i else ""}\n  {_EXPORT_ENCODER.encode(key)}: ')
+            if isinstance(value, Iterator):
+                empty = True
+                for item in value:
+                    f.write('[' if empty else ',')
+                    f.write('\n    ' + _EXPORT_ENCODER.encode(item).replace('\n', '\n    '))
+                    empty = False
+                f.write('[]' if empty else '\n  ]')
+            else:
+                f.write(_EXPORT_ENCODER.encode(value).replace('\n', '\n  '))
+        f.write('\n}' if sections else '}')
+
 
 class StateManager:
     """Manages orchestration state using SQLite database."""
     
-    def __init__(self, db_path: str, artifact_base_path: str):
+    # Connection tuning applied on open. With WAL, synchronous=NORMAL only
+    # syncs at checkpoints instead of on every commit.
+    PRAGMAS = (
+        "PRAGMA synchronous=NORMAL",
+        "PRAGMA temp_store=MEMORY",
+        "PRAGMA cache_size=-65536",
+        "PRAGMA busy_timeout=5000",
+    )
+    DEFAULT_MMAP_SIZE = 268435456
+    # Pages between automatic WAL checkpoints (SQLite default: 1000). Writes
+    # arrive in bursts, so checkpoint less often mid-burst and truncate the
+    # WAL explicitly once a run settles (see checkpoint()).
+    WAL_AUTOCHECKPOINT = 2000
+    # Prepared statements kept per connection, keyed by SQL text. All SQL
+    # here is constant strings, so every repeat call skips parse and plan.
+    STATEMENT_CACHE_SIZE = 256
+    # Rows pulled per fetchmany() when iterating large result sets
+    FETCH_BATCH_SIZE = 256
+    READ_POOL_SIZE = 4
+    
+    def __init__(
+        self,
+        db_path: str,
+        artifact_base_path: str,
+        mmap_size: int = DEFAULT_MMAP_SIZE
+    ):
         """Initialize state manager.
         
         Args:
             db_path: Path to SQLite database file
             artifact_base_path: Base directory for artifacts
+            mmap_size: Bytes of the database to memory-map (0 disables mmap)
         """
         self.db_path = db_path
         self.artifact_base_path = Path(artifact_base_path)
+        self.mmap_size = mmap_size
         self.db: Optional[aiosqlite.Connection] = None
+        self._write_lock = asyncio.Lock()
+        self._read_connections: List[aiosqlite.Connection] = []
+        self._read_pool: "asyncio.Queue[aiosqlite.Connection]" = asyncio.Queue()
         
     async def __aenter__(self):
         """Async context manager entry."""
@@ -42,7 +130,11 @@ class StateManager:
         
     async def __aexit__(self, exc_type, exc_val, exc_tb):
         """Async context manager exit."""
+        for conn in self._read_connections:
+            await conn.close()
+        self._read_connections.clear()
         if self.db:
+            await self._checkpoint_quietly()
             await self.db.close()
             
     async def _initialize(self):
@@ -51,14 +143,101 @@ class StateManager:
             # Ensure parent directory exists
             Path(self.db_path).parent.mkdir(parents=True, exist_ok=True)
             
-            self.db = await aiosqlite.connect(self.db_path)
+            # No converters: TIMESTAMP text is parsed by the state models
+            self.db = await aiosqlite.connect(
+                self.db_path,
+                detect_types=0,
+                cached_statements=self.STATEMENT_CACHE_SIZE
+            )
             self.db.row_factory = aiosqlite.Row
+            await self._apply_pragmas(self.db)
             await initialize_database(self.db)
+            await self._open_read_pool()
             logger.info(f"State manager initialized with database: {self.db_path}")
         except Exception as e:
             logger.error(f"Failed to initialize state manager: {e}")
             raise DatabaseError("Failed to initialize database", e)
     
+    async def _apply_pragmas(self, db: aiosqlite.Connection):
+        """Apply journal mode and connection tuning PRAGMAs."""
+        # In-memory databases have no journal file to put in WAL mode
+        if self.db_path != ':memory:':
+            await db.execute("PRAGMA journal_mode=WAL")
+            await db.execute(f"PRAGMA wal_autocheckpoint={int(self.WAL_AUTOCHECKPOINT)}")
+        for pragma in self.PRAGMAS:
+            await db.execute(pragma)
+        await db.execute(f"PRAGMA mmap_size={int(self.mmap_size)}")
+    
+    async def _open_read_pool(self):
+        """Open read-only connections so reads can run in parallel under WAL.
+        
+        In-memory databases are private to their connection, so they keep
+        reading through the main connection.
+        """
+        if self.db_path == ':memory:':
+            return
+        uri = f"{Path(self.db_path).resolve().as_uri()}?mode=ro"
+        for _ in range(self.READ_POOL_SIZE):
+            conn = await aiosqlite.connect(
+                uri,
+                uri=True,
+                detect_types=0,
+                cached_statements=self.STATEMENT_CACHE_SIZE
+            )
+            conn.row_factory = aiosqlite.Row
+            for pragma in self.PRAGMAS:
+                await conn.execute(pragma)
+            await conn.execute(f"PRAGMA mmap_size={int(self.mmap_size)}")
+            self._read_connections.append(conn)
+            self._read_pool.put_nowait(conn)
+    
+    @asynccontextmanager
+    async def _acquire_read(self) -> AsyncIterator[aiosqlite.Connection]:
+        """Borrow a read-only connection from the pool.
+        
+        Yields:
+            Pooled read connection, or the main connection if there is no pool
+        """
+        if not self._read_connections:
+            yield self.db
+            return
+        conn = await self._read_pool.get()
+        try:
+            yield conn
+        finally:
+            self._read_pool.put_nowait(conn)
+    
+    async def _fetch_all(self, sql: str, params: Tuple[Any, ...] = ()) -> List[aiosqlite.Row]:
+        """Run a read query on a pooled connection in a single round trip.
+        
+        Each connection keeps its compiled statements in sqlite3's statement
+        cache (STATEMENT_CACHE_SIZE), so repeated SQL text skips parse and plan.
+        """
+        async with self._acquire_read() as db:
+            return await db.execute_fetchall(sql, params)
+    
+    @asynccontextmanager
+    async def _transaction(self) -> AsyncIterator[aiosqlite.Connection]:
+        """Run the enclosed statements as one IMMEDIATE transaction.
+        
+        All writes go through this block, so they are serialized at the
+        application level instead of contending for SQLite's write lock;
+        reads stay lock-free. The block commits once on success and rolls
+        back on any exception. It is not reentrant.
+        
+        Yields:
+            Database connection to execute statements on
+        """
+        async with self._write_lock:
+            await self.db.execute("BEGIN IMMEDIATE")
+            try:
+                yield self.db
+                await self.db.commit()
+            except BaseException:
+                # A failed commit leaves the transaction open; roll it back too
+                await self.db.rollback()
+                raise
+    
     # Run Management
     
     async def create_run(
@@ -66,22 +245,26 @@ class StateManager:
         repo_path: str, 
         branch: str, 
         doc_path: str, 
-        config: dict
+        config: Union[dict, str]
     ) -> RunState:
-        """Create new orchestration run."""
-        run_id = str(uuid.uuid4())
-        now = datetime.now()
-        config_snapshot = json.dumps(config)
+        """Create new orchestration run.
+        
+        ``config`` may be passed already serialized to JSON so callers that
+        snapshot the same configuration repeatedly only encode it once.
+        """
+        run_id = _new_id()
+        now, stamp = _now()
+        config_snapshot = _encode_column(config)
         
         try:
-            await self.db.execute(
-                """INSERT INTO runs (
-                    run_id, created_at, updated_at, status, repo_path, branch,
-                    documentation_path, config_snapshot
-                ) VALUES (?, ?, ?, ?, ?, ?, ?, ?)""",
-                (run_id, now, now, 'planning', repo_path, branch, doc_path, config_snapshot)
-            )
-            await self.db.commit()
+            async with self._transaction() as db:
+                await db.execute(
+                    """INSERT INTO runs (
+                        run_id, created_at, updated_at, status, repo_path, branch,
+                        documentation_path, config_snapshot
+                    ) VALUES (?, ?, ?, ?, ?, ?, ?, ?)""",
+                    (run_id, stamp, stamp, 'planning', repo_path, branch, doc_path, config_snapshot)
+                )
             logger.info(f"Created run {run_id}")
             
             return RunState(
@@ -101,13 +284,8 @@ class StateManager:
     async def get_run(self, run_id: str) -> Optional[RunState]:
         """Get run by ID."""
         try:
-            async with self.db.execute(
-                "SELECT * FROM runs WHERE run_id = ?", (run_id,)
-            ) as cursor:
-                row = await cursor.fetchone()
-                if row:
-                    return RunState(**dict(row))
-                return None
+            rows = await self._fetch_all("SELECT * FROM runs WHERE run_id = ?", (run_id,))
+            return RunState.from_row(rows[0]) if rows else None
         except Exception as e:
             logger.error(f"Failed to get run {run_id}: {e}")
             raise DatabaseError(f"Failed to get run {run_id}", e)
@@ -120,36 +298,46 @@ class StateManager:
     ):
         """Update run status."""
         try:
-            now = datetime.now()
-            await self.db.execute(
-                """UPDATE runs 
-                   SET status = ?, updated_at = ?, error_message = ?
-                   WHERE run_id = ?""",
-                (status, now, error, run_id)
-            )
-            await self.db.commit()
+            _, stamp = _now()
+            async with self._transaction() as db:
+                await db.execute(
+                    """UPDATE runs 
+                       SET status = ?, updated_at = ?, error_message = ?
+                       WHERE run_id = ?""",
+                    (status, stamp, error, run_id)
+                )
             logger.info(f"Updated run {run_id} status to {status}")
         except Exception as e:
             logger.error(f"Failed to update run status: {e}")
             raise DatabaseError("Failed to update run status", e)
+        
+        # A finished run is a natural idle point to fold the WAL back
+        if status in ('completed', 'failed'):
+            await self._checkpoint_quietly()
     
     async def list_runs(
         self, 
         status: Optional[str] = None, 
-        limit: int = 50
+        limit: int = 50,
+        statuses: Optional[Sequence[str]] = None
     ) -> List[RunState]:
-        """List runs with optional status filter."""
+        """List runs, newest first, optionally filtered to one or more statuses."""
         try:
-            if status:
+            if statuses:
+                placeholders = ', '.join('?' * len(statuses))
+                query = (
+                    f"SELECT * FROM runs WHERE status IN ({placeholders}) "
+                    "ORDER BY created_at DESC LIMIT ?"
+                )
+                params = (*statuses, limit)
+            elif status:
                 query = "SELECT * FROM runs WHERE status = ? ORDER BY created_at DESC LIMIT ?"
                 params = (status, limit)
             else:
                 query = "SELECT * FROM runs ORDER BY created_at DESC LIMIT ?"
                 params = (limit,)
             
-            async with self.db.execute(query, params) as cursor:
-                rows = await cursor.fetchall()
-                return [RunState(**dict(row)) for row in rows]
+            return RunState.from_rows(await self._fetch_all(query, params))
         except Exception as e:
             logger.error(f"Failed to list runs: {e}")
             raise DatabaseError("Failed to list runs", e)
@@ -171,32 +359,32 @@ class StateManager:
         phase_number: int,
         title: str,
         intent: str,
-        plan: dict,
+        plan: Union[dict, str],
         max_retries: int,
         size: str = 'medium'
     ) -> PhaseState:
-        """Create new phase."""
-        phase_id = str(uuid.uuid4())
-        now = datetime.now()
-        plan_json = json.dumps(plan)
+        """Create new phase. ``plan`` may be pre-serialized JSON."""
+        phase_id = _new_id()
+        now, stamp = _now()
+        plan_json = _encode_column(plan)
         
         try:
-            await self.db.execute(
-                """INSERT INTO phases (
-                    phase_id, run_id, phase_number, title, intent, size,
-                    status, created_at, plan_json, max_retries
-                ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)""",
-                (phase_id, run_id, phase_number, title, intent, size, 
-                 'pending', now, plan_json, max_retries)
-            )
-            
-            # Update run total_phases
-            await self.db.execute(
-                "UPDATE runs SET total_phases = total_phases + 1 WHERE run_id = ?",
-                (run_id,)
-            )
+            async with self._transaction() as db:
+                await db.execute(
+                    """INSERT INTO phases (
+                        phase_id, run_id, phase_number, title, intent, size,
+                        status, created_at, plan_json, max_retries
+                    ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)""",
+                    (phase_id, run_id, phase_number, title, intent, size, 
+                     'pending', stamp, plan_json, max_retries)
+                )
+                
+                # Update run total_phases
+                await db.execute(
+                    "UPDATE runs SET total_phases = total_phases + 1 WHERE run_id = ?",
+                    (run_id,)
+                )
             
-            await self.db.commit()
             logger.info(f"Created phase {phase_id} (Phase {phase_number}: {title})")
             
             return PhaseState(
@@ -218,13 +406,8 @@ class StateManager:
     async def get_phase(self, phase_id: str) -> Optional[PhaseState]:
         """Get phase by ID."""
         try:
-            async with self.db.execute(
-                "SELECT * FROM phases WHERE phase_id = ?", (phase_id,)
-            ) as cursor:
-                row = await cursor.fetchone()
-                if row:
-                    return PhaseState(**dict(row))
-                return None
+            rows = await self._fetch_all("SELECT * FROM phases WHERE phase_id = ?", (phase_id,))
+            return PhaseState.from_row(rows[0]) if rows else None
         except Exception as e:
             logger.error(f"Failed to get phase {phase_id}: {e}")
             raise DatabaseError(f"Failed to get phase {phase_id}", e)
@@ -232,12 +415,13 @@ class StateManager:
     async def get_phases_for_run(self, run_id: str) -> List[PhaseState]:
         """Get all phases for a run."""
         try:
-            async with self.db.execute(
-                "SELECT * FROM phases WHERE run_id = ? ORDER BY phase_number",
-                (run_id,)
-            ) as cursor:
-                rows = await cursor.fetchall()
-                return [PhaseState(**dict(row)) for row in rows]
+            async with self._acquire_read() as db:
+                async with db.execute(
+                    "SELECT * FROM phases WHERE run_id = ? ORDER BY phase_number",
+                    (run_id,)
+                ) as cursor:
+                    rows = await cursor.fetchall()
+                    return PhaseState.from_rows(rows)
         except Exception as e:
             logger.error(f"Failed to get phases for run {run_id}: {e}")
             raise DatabaseError(f"Failed to get phases for run {run_id}", e)
@@ -256,31 +440,21 @@ class StateManager:
             
             if started_at:
                 updates.append("started_at = ?")
-                params.append(started_at)
+                params.append(started_at.isoformat(' '))
             if completed_at:
                 updates.append("completed_at = ?")
-                params.append(completed_at)
+                params.append(completed_at.isoformat(' '))
             
             params.append(phase_id)
             
-            await self.db.execute(
-                f"UPDATE phases SET {', '.join(updates)} WHERE phase_id = ?",
-                params
-            )
-            
-            # Update run's current_phase_id and completed_phases
-            if status == 'in_progress':
-                await self.db.execute(
-                    "UPDATE runs SET current_phase_id = ? WHERE run_id = (SELECT run_id FROM phases WHERE phase_id = ?)",
-                    (phase_id, phase_id)
-                )
-            elif status == 'completed':
-                await self.db.execute(
-                    "UPDATE runs SET completed_phases = completed_phases + 1 WHERE run_id IN (SELECT run_id FROM phases WHERE phase_id = ?)",
-                    (phase_id,)
+            # Run progress (current_phase_id, completed_phases) is maintained
+            # by the trg_phase_* triggers in the schema
+            async with self._transaction() as db:
+                await db.execute(
+                    f"UPDATE phases SET {', '.join(updates)} WHERE phase_id = ?",
+                    params
                 )
             
-            await self.db.commit()
             logger.info(f"Updated phase {phase_id} status to {status}")
         except Exception as e:
             logger.error(f"Failed to update phase status: {e}")
@@ -289,34 +463,40 @@ class StateManager:
     async def increment_phase_retry(self, phase_id: str) -> int:
         """Increment retry count and return new count."""
         try:
-            await self.db.execute(
-                "UPDATE phases SET retry_count = retry_count + 1 WHERE phase_id = ?",
-                (phase_id,)
-            )
-            await self.db.commit()
-            
-            async with self.db.execute(
-                "SELECT retry_count FROM phases WHERE phase_id = ?", (phase_id,)
-            ) as cursor:
-                row = await cursor.fetchone()
-                return row[0] if row else 0
+            async with self._transaction() as db:
+                async with db.execute(
+                    """UPDATE phases SET retry_count = retry_count + 1
+                       WHERE phase_id = ? RETURNING retry_count""",
+                    (phase_id,)
+                ) as cursor:
+                    row = await cursor.fetchone()
+            return row[0] if row else 0
         except Exception as e:
             logger.error(f"Failed to increment retry count: {e}")
             raise DatabaseError("Failed to increment retry count", e)
     
+    async def set_phase_branch(self, phase_id: str, branch_name: str):
+        """Record the git branch a phase is executed on."""
+        try:
+            async with self._transaction() as db:
+                await db.execute(
+                    "UPDATE phases SET branch_name = ? WHERE phase_id = ?",
+                    (branch_name, phase_id)
+                )
+        except Exception as e:
+            logger.error(f"Failed to set phase branch: {e}")
+            raise DatabaseError("Failed to set phase branch", e)
+    
     async def get_current_phase(self, run_id: str) -> Optional[PhaseState]:
         """Get currently executing phase."""
         try:
-            async with self.db.execute(
+            rows = await self._fetch_all(
                 """SELECT * FROM phases 
                    WHERE run_id = ? AND status = 'in_progress'
                    ORDER BY phase_number LIMIT 1""",
                 (run_id,)
-            ) as cursor:
-                row = await cursor.fetchone()
-                if row:
-                    return PhaseState(**dict(row))
-                return None
+            )
+            return PhaseState.from_row(rows[0]) if rows else None
         except Exception as e:
             logger.error(f"Failed to get current phase: {e}")
             raise DatabaseError("Failed to get current phase", e)
@@ -331,19 +511,19 @@ class StateManager:
         execution_mode: str
     ) -> ExecutionState:
         """Create execution record."""
-        execution_id = str(uuid.uuid4())
-        now = datetime.now()
+        execution_id = _new_id()
+        now, stamp = _now()
         
         try:
-            await self.db.execute(
-                """INSERT INTO executions (
-                    execution_id, phase_id, pass_number, started_at,
-                    status, copilot_input_path, execution_mode
-                ) VALUES (?, ?, ?, ?, ?, ?, ?)""",
-                (execution_id, phase_id, pass_number, now, 'running', 
-                 copilot_input_path, execution_mode)
-            )
-            await self.db.commit()
+            async with self._transaction() as db:
+                await db.execute(
+                    """INSERT INTO executions (
+                        execution_id, phase_id, pass_number, started_at,
+                        status, copilot_input_path, execution_mode
+                    ) VALUES (?, ?, ?, ?, ?, ?, ?)""",
+                    (execution_id, phase_id, pass_number, stamp, 'running', 
+                     copilot_input_path, execution_mode)
+                )
             logger.info(f"Created execution {execution_id} (pass {pass_number})")
             
             return ExecutionState(
@@ -367,15 +547,15 @@ class StateManager:
     ):
         """Mark execution complete."""
         try:
-            now = datetime.now()
-            await self.db.execute(
-                """UPDATE executions 
-                   SET status = 'completed', completed_at = ?,
-                       copilot_output_path = ?, copilot_summary = ?
-                   WHERE execution_id = ?""",
-                (now, copilot_output_path, copilot_summary, execution_id)
-            )
-            await self.db.commit()
+            _, stamp = _now()
+            async with self._transaction() as db:
+                await db.execute(
+                    """UPDATE executions 
+                       SET status = 'completed', completed_at = ?,
+                           copilot_output_path = ?, copilot_summary = ?
+                       WHERE execution_id = ?""",
+                    (stamp, copilot_output_path, copilot_summary, execution_id)
+                )
             logger.info(f"Completed execution {execution_id}")
         except Exception as e:
             logger.error(f"Failed to complete execution: {e}")
@@ -384,14 +564,14 @@ class StateManager:
     async def fail_execution(self, execution_id: str, error: str):
         """Mark execution failed."""
         try:
-            now = datetime.now()
-            await self.db.execute(
-                """UPDATE executions 
-                   SET status = 'failed', completed_at = ?, error_message = ?
-                   WHERE execution_id = ?""",
-                (now, error, execution_id)
-            )
-            await self.db.commit()
+            _, stamp = _now()
+            async with self._transaction() as db:
+                await db.execute(
+                    """UPDATE executions 
+                       SET status = 'failed', completed_at = ?, error_message = ?
+                       WHERE execution_id = ?""",
+                    (stamp, error, execution_id)
+                )
             logger.info(f"Failed execution {execution_id}")
         except Exception as e:
             logger.error(f"Failed to mark execution as failed: {e}")
@@ -400,16 +580,31 @@ class StateManager:
     async def get_executions_for_phase(self, phase_id: str) -> List[ExecutionState]:
         """Get all executions for a phase."""
         try:
-            async with self.db.execute(
-                "SELECT * FROM executions WHERE phase_id = ? ORDER BY pass_number",
-                (phase_id,)
-            ) as cursor:
-                rows = await cursor.fetchall()
-                return [ExecutionState(**dict(row)) for row in rows]
+            async with self._acquire_read() as db:
+                async with db.execute(
+                    "SELECT * FROM executions WHERE phase_id = ? ORDER BY pass_number",
+                    (phase_id,)
+                ) as cursor:
+                    rows = await cursor.fetchall()
+                    return ExecutionState.from_rows(rows)
         except Exception as e:
             logger.error(f"Failed to get executions: {e}")
             raise DatabaseError("Failed to get executions", e)
     
+    async def get_executions_for_run(self, run_id: str) -> List[ExecutionState]:
+        """Get every execution of a run, grouped by phase in pass order."""
+        try:
+            rows = await self._fetch_all(
+                """SELECT * FROM executions
+                   WHERE phase_id IN (SELECT phase_id FROM phases WHERE run_id = ?)
+                   ORDER BY phase_id, pass_number""",
+                (run_id,)
+            )
+            return ExecutionState.from_rows(rows)
+        except Exception as e:
+            logger.error(f"Failed to get executions for run: {e}")
+            raise DatabaseError("Failed to get executions for run", e)
+    
     # Findings Management
     
     async def add_finding(
@@ -423,89 +618,176 @@ class StateManager:
         suggested_fix: Optional[str] = None
     ) -> Finding:
         """Add finding."""
-        finding_id = str(uuid.uuid4())
-        now = datetime.now()
+        (finding,) = await self.add_findings_bulk(execution_id, [{
+            'severity': severity,
+            'category': category,
+            'title': title,
+            'description': description,
+            'evidence': evidence,
+            'suggested_fix': suggested_fix,
+        }])
+        return finding
+    
+    async def add_findings_bulk(
+        self,
+        execution_id: str,
+        findings: List[Dict[str, Any]]
+    ) -> List[Finding]:
+        """Add several findings for an execution in one transaction.
+        
+        Args:
+            execution_id: Execution the findings belong to
+            findings: Dicts with the keyword arguments of add_finding
+            
+        Returns:
+            Added findings in input order
+        """
+        now, stamp = _now()
         
         try:
-            await self.db.execute(
-                """INSERT INTO findings (
-                    finding_id, execution_id, severity, category, title,
-                    description, evidence, suggested_fix, created_at
-                ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)""",
-                (finding_id, execution_id, severity, category, title,
-                 description, evidence, suggested_fix, now)
-            )
-            await self.db.commit()
-            logger.debug(f"Added {severity} finding: {title}")
+            records = [
+                Finding(
+                    finding_id=_new_id(),
+                    execution_id=execution_id,
+                    severity=finding['severity'],
+                    category=finding['category'],
+                    title=finding['title'],
+                    description=finding['description'],
+                    evidence=finding['evidence'],
+                    suggested_fix=finding.get('suggested_fix'),
+                    created_at=now
+                )
+                for finding in findings
+            ]
             
-            return Finding(
-                finding_id=finding_id,
-                execution_id=execution_id,
-                severity=severity,
-                category=category,
-                title=title,
-                description=description,
-                evidence=evidence,
-                suggested_fix=suggested_fix,
-                created_at=now
-            )
+            async with self._transaction() as db:
+                await db.executemany(
+                    INSERT_FINDING_SQL,
+                    [
+                        (f.finding_id, f.execution_id, f.severity, f.category, f.title,
+                         f.description, f.evidence, f.suggested_fix, stamp)
+                        for f in records
+                    ]
+                )
+            logger.debug(f"Added {len(records)} findings for execution {execution_id}")
+            
+            return records
         except Exception as e:
-            logger.error(f"Failed to add finding: {e}")
-            raise DatabaseError("Failed to add finding", e)
+            logger.error(f"Failed to add findings: {e}")
+            raise DatabaseError("Failed to add findings", e)
     
     async def get_findings_for_execution(self, execution_id: str) -> List[Finding]:
         """Get findings for an execution."""
         try:
-            async with self.db.execute(
-                "SELECT * FROM findings WHERE execution_id = ? ORDER BY severity, created_at",
-                (execution_id,)
-            ) as cursor:
-                rows = await cursor.fetchall()
-                return [Finding(**dict(row)) for row in rows]
+            async with self._acquire_read() as db:
+                async with db.execute(
+                    "SELECT * FROM findings WHERE execution_id = ? ORDER BY severity, created_at",
+                    (execution_id,)
+                ) as cursor:
+                    rows = await cursor.fetchall()
+                    return Finding.from_rows(rows)
         except Exception as e:
             logger.error(f"Failed to get findings: {e}")
             raise DatabaseError("Failed to get findings", e)
     
+    async def get_findings_for_run(self, run_id: str) -> List[Finding]:
+        """Get every finding of a run, grouped by execution.
+        
+        Within each execution findings are ordered as in
+        get_findings_for_execution.
+        """
+        try:
+            rows = await self._fetch_all(
+                """SELECT f.* FROM findings f
+                   JOIN executions e ON f.execution_id = e.execution_id
+                   WHERE e.phase_id IN (SELECT phase_id FROM phases WHERE run_id = ?)
+                   ORDER BY f.execution_id, f.severity, f.created_at""",
+                (run_id,)
+            )
+            return Finding.from_rows(rows)
+        except Exception as e:
+            logger.error(f"Failed to get findings for run: {e}")
+            raise DatabaseError("Failed to get findings for run", e)
+    
     async def get_findings_for_phase(self, phase_id: str) -> List[Finding]:
         """Get all findings for a phase across all executions."""
         try:
-            async with self.db.execute(
+            rows = await self._fetch_all(
                 """SELECT f.* FROM findings f
                    JOIN executions e ON f.execution_id = e.execution_id
                    WHERE e.phase_id = ?
                    ORDER BY e.pass_number DESC, f.severity, f.created_at""",
                 (phase_id,)
-            ) as cursor:
-                rows = await cursor.fetchall()
-                return [Finding(**dict(row)) for row in rows]
+            )
+            return Finding.from_rows(rows)
         except Exception as e:
             logger.error(f"Failed to get findings for phase: {e}")
             raise DatabaseError("Failed to get findings for phase", e)
     
+    async def iter_findings_for_phase(self, phase_id: str) -> AsyncIterator[Finding]:
+        """Yield a phase's findings in batches instead of loading them all.
+        
+        Findings come newest pass first, then by severity and creation time
+        within each execution, matching get_findings_for_phase.
+        """
+        try:
+            async with self._acquire_read() as db:
+                async with db.execute(
+                    """SELECT f.* FROM findings f
+                       JOIN executions e ON f.execution_id = e.execution_id
+                       WHERE e.phase_id = ?
+                       ORDER BY e.pass_number DESC, f.severity, f.created_at""",
+                    (phase_id,)
+                ) as cursor:
+                    columns = None
+                    while rows := await cursor.fetchmany(self.FETCH_BATCH_SIZE):
+                        columns = columns or rows[0].keys()
+                        for row in rows:
+                            yield Finding.from_row(row, columns)
+        except Exception as e:
+            logger.error(f"Failed to iterate findings for phase: {e}")
+            raise DatabaseError("Failed to iterate findings for phase", e)
+    
     async def get_findings_summary(self, execution_id: str) -> Dict[str, int]:
         """Get counts by severity."""
         try:
-            async with self.db.execute(
+            rows = await self._fetch_all(
                 """SELECT severity, COUNT(*) as count 
                    FROM findings 
                    WHERE execution_id = ? 
                    GROUP BY severity""",
                 (execution_id,)
-            ) as cursor:
-                rows = await cursor.fetchall()
-                return {row['severity']: row['count'] for row in rows}
+            )
+            return {row['severity']: row['count'] for row in rows}
         except Exception as e:
             logger.error(f"Failed to get findings summary: {e}")
             raise DatabaseError("Failed to get findings summary", e)
     
+    async def get_findings_summary_for_run(self, run_id: str) -> Dict[str, int]:
+        """Get counts by severity across every execution of a run."""
+        try:
+            async with self._acquire_read() as db:
+                rows = await db.execute_fetchall(
+                    """SELECT f.severity, COUNT(*) FROM findings f
+                       JOIN executions e ON f.execution_id = e.execution_id
+                       JOIN phases p ON e.phase_id = p.phase_id
+                       WHERE p.run_id = ?
+                       GROUP BY f.severity""",
+                    (run_id,)
+                )
+            return dict(rows)
+        except Exception as e:
+            logger.error(f"Failed to get findings summary for run: {e}")
+            raise DatabaseError("Failed to get findings summary for run", e)
+    
     async def mark_finding_resolved(self, finding_id: str):
         """Mark finding as resolved."""
         try:
-            await self.db.execute(
-                "UPDATE findings SET resolved = 1 WHERE finding_id = ?",
-                (finding_id,)
-            )
-            await self.db.commit()
+            async with self._transaction() as db:
+                await db.execute(
+                    "UPDATE findings SET resolved = 1 WHERE finding_id = ?",
+                    (finding_id,)
+                )
             logger.debug(f"Marked finding {finding_id} as resolved")
         except Exception as e:
             logger.error(f"Failed to mark finding as resolved: {e}")
@@ -519,14 +801,13 @@ class StateManager:
         """Get unresolved findings by severity."""
         try:
             placeholders = ','.join('?' * len(severities))
-            async with self.db.execute(
+            rows = await self._fetch_all(
                 f"""SELECT * FROM findings 
                     WHERE execution_id = ? AND severity IN ({placeholders}) AND resolved = 0
                     ORDER BY severity, created_at""",
-                [execution_id] + severities
-            ) as cursor:
-                rows = await cursor.fetchall()
-                return [Finding(**dict(row)) for row in rows]
+                (execution_id, *severities)
+            )
+            return Finding.from_rows(rows)
         except Exception as e:
             logger.error(f"Failed to get unresolved findings: {e}")
             raise DatabaseError("Failed to get unresolved findings", e)
@@ -540,23 +821,23 @@ class StateManager:
         file_path: str,
         phase_id: Optional[str] = None,
         execution_id: Optional[str] = None,
-        metadata: Optional[dict] = None
+        metadata: Optional[Union[dict, str]] = None
     ) -> Artifact:
-        """Register artifact."""
-        artifact_id = str(uuid.uuid4())
-        now = datetime.now()
-        metadata_json = json.dumps(metadata) if metadata else None
+        """Register artifact. ``metadata`` may be pre-serialized JSON."""
+        artifact_id = _new_id()
+        now, stamp = _now()
+        metadata_json = _encode_column(metadata) if metadata else None
         
         try:
-            await self.db.execute(
-                """INSERT INTO artifacts (
-                    artifact_id, run_id, phase_id, execution_id, artifact_type,
-                    file_path, created_at, metadata
-                ) VALUES (?, ?, ?, ?, ?, ?, ?, ?)""",
-                (artifact_id, run_id, phase_id, execution_id, artifact_type,
-                 file_path, now, metadata_json)
-            )
-            await self.db.commit()
+            async with self._transaction() as db:
+                await db.execute(
+                    """INSERT INTO artifacts (
+                        artifact_id, run_id, phase_id, execution_id, artifact_type,
+                        file_path, created_at, metadata
+                    ) VALUES (?, ?, ?, ?, ?, ?, ?, ?)""",
+                    (artifact_id, run_id, phase_id, execution_id, artifact_type,
+                     file_path, stamp, metadata_json)
+                )
             logger.debug(f"Registered artifact {artifact_type}: {file_path}")
             
             return Artifact(
@@ -573,6 +854,54 @@ class StateManager:
             logger.error(f"Failed to register artifact: {e}")
             raise DatabaseError("Failed to register artifact", e)
     
+    async def register_artifacts(
+        self,
+        artifacts: List[Dict[str, Any]]
+    ) -> List[Artifact]:
+        """Register several artifacts with one bulk insert and commit.
+        
+        Args:
+            artifacts: Dicts with the keyword arguments of register_artifact
+            
+        Returns:
+            Registered artifacts in input order
+        """
+        now, stamp = _now()
+        
+        try:
+            records = []
+            for artifact in artifacts:
+                metadata = artifact.get('metadata')
+                records.append(Artifact(
+                    artifact_id=_new_id(),
+                    run_id=artifact['run_id'],
+                    phase_id=artifact.get('phase_id'),
+                    execution_id=artifact.get('execution_id'),
+                    artifact_type=artifact['artifact_type'],
+                    file_path=artifact['file_path'],
+                    created_at=now,
+                    metadata=_encode_column(metadata) if metadata else None
+                ))
+            
+            async with self._transaction() as db:
+                await db.executemany(
+                    """INSERT INTO artifacts (
+                        artifact_id, run_id, phase_id, execution_id, artifact_type,
+                        file_path, created_at, metadata
+                    ) VALUES (?, ?, ?, ?, ?, ?, ?, ?)""",
+                    [
+                        (a.artifact_id, a.run_id, a.phase_id, a.execution_id,
+                         a.artifact_type, a.file_path, stamp, a.metadata)
+                        for a in records
+                    ]
+                )
+            logger.debug(f"Registered {len(records)} artifacts")
+            
+            return records
+        except Exception as e:
+            logger.error(f"Failed to register artifacts: {e}")
+            raise DatabaseError("Failed to register artifacts", e)
+    
     async def get_artifacts_for_run(
         self,
         run_id: str,
@@ -587,9 +916,10 @@ class StateManager:
                 query = "SELECT * FROM artifacts WHERE run_id = ? ORDER BY created_at"
                 params = (run_id,)
             
-            async with self.db.execute(query, params) as cursor:
-                rows = await cursor.fetchall()
-                return [Artifact(**dict(row)) for row in rows]
+            async with self._acquire_read() as db:
+                async with db.execute(query, params) as cursor:
+                    rows = await cursor.fetchall()
+                    return Artifact.from_rows(rows)
         except Exception as e:
             logger.error(f"Failed to get artifacts: {e}")
             raise DatabaseError("Failed to get artifacts", e)
@@ -597,26 +927,57 @@ class StateManager:
     async def get_artifacts_for_phase(self, phase_id: str) -> List[Artifact]:
         """Get artifacts for a phase."""
         try:
-            async with self.db.execute(
+            rows = await self._fetch_all(
                 "SELECT * FROM artifacts WHERE phase_id = ? ORDER BY created_at",
                 (phase_id,)
-            ) as cursor:
-                rows = await cursor.fetchall()
-                return [Artifact(**dict(row)) for row in rows]
+            )
+            return Artifact.from_rows(rows)
         except Exception as e:
             logger.error(f"Failed to get phase artifacts: {e}")
             raise DatabaseError("Failed to get phase artifacts", e)
     
+    async def update_artifact_paths(self, updates: List[Tuple[str, str]]):
+        """Point artifacts at new file paths in one transaction.
+        
+        Args:
+            updates: (artifact_id, file_path) pairs
+        """
+        try:
+            async with self._transaction() as db:
+                await db.executemany(
+                    "UPDATE artifacts SET file_path = ? WHERE artifact_id = ?",
+                    [(file_path, artifact_id) for artifact_id, file_path in updates]
+                )
+            logger.debug(f"Updated paths for {len(updates)} artifacts")
+        except Exception as e:
+            logger.error(f"Failed to update artifact paths: {e}")
+            raise DatabaseError("Failed to update artifact paths", e)
+    
+    async def iter_old_artifacts(self, cutoff: datetime) -> AsyncIterator[Tuple[str, str]]:
+        """Yield (artifact_id, file_path) for artifacts of runs created before cutoff.
+        
+        Rows are fetched in batches of FETCH_BATCH_SIZE.
+        """
+        try:
+            async with self._acquire_read() as db:
+                async with db.execute(
+                    """SELECT a.artifact_id, a.file_path FROM artifacts a
+                       JOIN runs r ON a.run_id = r.run_id
+                       WHERE r.created_at < ?""",
+                    (cutoff.isoformat(' '),)
+                ) as cursor:
+                    while rows := await cursor.fetchmany(self.FETCH_BATCH_SIZE):
+                        for artifact_id, file_path in rows:
+                            yield artifact_id, file_path
+        except Exception as e:
+            logger.error(f"Failed to iterate old artifacts: {e}")
+            raise DatabaseError("Failed to iterate old artifacts", e)
+    
     async def get_artifact(self, artifact_id: str) -> Optional[Artifact]:
         """Get artifact by ID."""
         try:
-            async with self.db.execute(
-                "SELECT * FROM artifacts WHERE artifact_id = ?", (artifact_id,)
-            ) as cursor:
-                row = await cursor.fetchone()
-                if row:
-                    return Artifact(**dict(row))
-                return None
+            rows = await self._fetch_all("SELECT * FROM artifacts WHERE artifact_id = ?", (artifact_id,))
+            return Artifact.from_row(rows[0]) if rows else None
         except Exception as e:
             logger.error(f"Failed to get artifact {artifact_id}: {e}")
             raise DatabaseError(f"Failed to get artifact {artifact_id}", e)
@@ -629,17 +990,17 @@ class StateManager:
         reason: str
     ) -> ManualIntervention:
         """Create intervention record."""
-        intervention_id = str(uuid.uuid4())
-        now = datetime.now()
+        intervention_id = _new_id()
+        now, stamp = _now()
         
         try:
-            await self.db.execute(
-                """INSERT INTO manual_interventions (
-                    intervention_id, phase_id, created_at, reason
-                ) VALUES (?, ?, ?, ?)""",
-                (intervention_id, phase_id, now, reason)
-            )
-            await self.db.commit()
+            async with self._transaction() as db:
+                await db.execute(
+                    """INSERT INTO manual_interventions (
+                        intervention_id, phase_id, created_at, reason
+                    ) VALUES (?, ?, ?, ?)""",
+                    (intervention_id, phase_id, stamp, reason)
+                )
             logger.warning(f"Created intervention for phase {phase_id}: {reason}")
             
             return ManualIntervention(
@@ -660,14 +1021,14 @@ class StateManager:
     ):
         """Resolve intervention."""
         try:
-            now = datetime.now()
-            await self.db.execute(
-                """UPDATE manual_interventions 
-                   SET action_taken = ?, notes = ?, resolved_at = ?
-                   WHERE intervention_id = ?""",
-                (action, notes, now, intervention_id)
-            )
-            await self.db.commit()
+            _, stamp = _now()
+            async with self._transaction() as db:
+                await db.execute(
+                    """UPDATE manual_interventions 
+                       SET action_taken = ?, notes = ?, resolved_at = ?
+                       WHERE intervention_id = ?""",
+                    (action, notes, stamp, intervention_id)
+                )
             logger.info(f"Resolved intervention {intervention_id} with action: {action}")
         except Exception as e:
             logger.error(f"Failed to resolve intervention: {e}")
@@ -676,15 +1037,14 @@ class StateManager:
     async def get_pending_interventions(self, run_id: str) -> List[ManualIntervention]:
         """Get unresolved interventions."""
         try:
-            async with self.db.execute(
+            rows = await self._fetch_all(
                 """SELECT mi.* FROM manual_interventions mi
                    JOIN phases p ON mi.phase_id = p.phase_id
                    WHERE p.run_id = ? AND mi.resolved_at IS NULL
                    ORDER BY mi.created_at""",
                 (run_id,)
-            ) as cursor:
-                rows = await cursor.fetchall()
-                return [ManualIntervention(**dict(row)) for row in rows]
+            )
+            return ManualIntervention.from_rows(rows)
         except Exception as e:
             logger.error(f"Failed to get pending interventions: {e}")
             raise DatabaseError("Failed to get pending interventions", e)
@@ -701,32 +1061,33 @@ class StateManager:
             phases = await self.get_phases_for_run(run_id)
             artifacts = await self.get_artifacts_for_run(run_id)
             
-            phase_data = []
-            for phase in phases:
-                executions = await self.get_executions_for_phase(phase.phase_id)
-                execution_data = []
-                
-                for execution in executions:
-                    findings = await self.get_findings_for_execution(execution.execution_id)
-                    execution_data.append({
-                        'execution': execution.to_dict(),
-                        'findings': [f.to_dict() for f in findings]
-                    })
-                
-                phase_data.append({
-                    'phase': phase.to_dict(),
-                    'executions': execution_data
+            # Fetch every execution and finding for the run in one query each
+            # and group them in Python, instead of querying per phase/execution
+            findings_by_execution: Dict[str, List[Dict[str, Any]]] = defaultdict(list)
+            for finding in await self.get_findings_for_run(run_id):
+                findings_by_execution[finding.execution_id].append(finding.to_dict())
+            
+            executions_by_phase: Dict[str, List[Dict[str, Any]]] = defaultdict(list)
+            for execution in await self.get_executions_for_run(run_id):
+                executions_by_phase[execution.phase_id].append({
+                    'execution': execution.to_dict(),
+                    'findings': findings_by_execution[execution.execution_id]
                 })
             
-            export = {
-                'run': run.to_dict(),
-                'phases': phase_data,
-                'artifacts': [a.to_dict() for a in artifacts]
-            }
+            # Phases are encoded and written one at a time off the event loop
+            phase_data = (
+                {
+                    'phase': phase.to_dict(),
+                    'executions': executions_by_phase[phase.phase_id]
+                }
+                for phase in phases
+            )
             
-            Path(output_path).parent.mkdir(parents=True, exist_ok=True)
-            with open(output_path, 'w') as f:
-                json.dump(export, f, indent=2)
+            await asyncio.to_thread(_dump_json_sections, output_path, [
+                ('run', run.to_dict()),
+                ('phases', phase_data),
+                ('artifacts', [a.to_dict() for a in artifacts]),
+            ])
             
             logger.info(f"Exported run {run_id} to {output_path}")
         except Exception as e:
@@ -743,23 +1104,24 @@ class StateManager:
             executions = await self.get_executions_for_phase(phase_id)
             artifacts = await self.get_artifacts_for_phase(phase_id)
             
-            execution_data = []
-            for execution in executions:
-                findings = await self.get_findings_for_execution(execution.execution_id)
-                execution_data.append({
-                    'execution': execution.to_dict(),
-                    'findings': [f.to_dict() for f in findings]
-                })
+            # One streamed query for every execution's findings
+            findings_by_execution: Dict[str, List[Dict[str, Any]]] = defaultdict(list)
+            async for finding in self.iter_findings_for_phase(phase_id):
+                findings_by_execution[finding.execution_id].append(finding.to_dict())
             
-            export = {
-                'phase': phase.to_dict(),
-                'executions': execution_data,
-                'artifacts': [a.to_dict() for a in artifacts]
-            }
+            execution_data = [
+                {
+                    'execution': execution.to_dict(),
+                    'findings': findings_by_execution[execution.execution_id]
+                }
+                for execution in executions
+            ]
             
-            Path(output_path).parent.mkdir(parents=True, exist_ok=True)
-            with open(output_path, 'w') as f:
-                json.dump(export, f, indent=2)
+            await asyncio.to_thread(_dump_json_sections, output_path, [
+                ('phase', phase.to_dict()),
+                ('executions', iter(execution_data)),
+                ('artifacts', [a.to_dict() for a in artifacts]),
+            ])
             
             logger.info(f"Exported phase {phase_id} to {output_path}")
         except Exception as e:
@@ -774,26 +1136,26 @@ class StateManager:
                 raise RunNotFoundError(run_id)
             
             phases = await self.get_phases_for_run(run_id)
-            artifacts = await self.get_artifacts_for_run(run_id)
             
-            execution_count = 0
+            # Aggregate in SQLite rather than walking phases and executions
+            async with self._acquire_read() as db:
+                ((execution_count, artifacts_count),) = await db.execute_fetchall(
+                    """SELECT
+                           (SELECT COUNT(*) FROM executions e
+                            JOIN phases p ON e.phase_id = p.phase_id
+                            WHERE p.run_id = ?),
+                           (SELECT COUNT(*) FROM artifacts WHERE run_id = ?)""",
+                    (run_id, run_id)
+                )
             findings_summary = {'major': 0, 'medium': 0, 'minor': 0}
-            
-            for phase in phases:
-                executions = await self.get_executions_for_phase(phase.phase_id)
-                execution_count += len(executions)
-                
-                for execution in executions:
-                    summary = await self.get_findings_summary(execution.execution_id)
-                    for severity, count in summary.items():
-                        findings_summary[severity] = findings_summary.get(severity, 0) + count
+            findings_summary.update(await self.get_findings_summary_for_run(run_id))
             
             return RunSummary(
                 run=run,
                 phases=phases,
                 execution_count=execution_count,
                 findings_summary=findings_summary,
-                artifacts_count=len(artifacts)
+                artifacts_count=artifacts_count
             )
         except Exception as e:
             logger.error(f"Failed to export run summary: {e}")
@@ -807,7 +1169,7 @@ class StateManager:
     
     async def get_recoverable_runs(self) -> List[RunState]:
         """Get runs that can be recovered."""
-        return await self.list_runs(status='executing') + await self.list_runs(status='paused')
+        return await self.list_runs(statuses=('executing', 'paused'), limit=100)
     
     async def recover_run(self, run_id: str) -> Tuple[RunState, Optional[PhaseState]]:
         """Load run state for recovery."""
@@ -830,35 +1192,72 @@ class StateManager:
     
     # Utilities
     
+    @staticmethod
+    def _vacuum_file(db_path: str):
+        """Checkpoint, VACUUM and re-analyze a database file on a private connection."""
+        conn = sqlite3.connect(db_path, isolation_level=None)
+        try:
+            conn.execute("PRAGMA busy_timeout=5000")
+            # Fold the WAL back in first so VACUUM does not copy it as well
+            conn.execute("PRAGMA wal_checkpoint(TRUNCATE)")
+            conn.execute("VACUUM")
+            # Under WAL the rewritten pages land in the WAL; fold them in too
+            conn.execute("PRAGMA wal_checkpoint(TRUNCATE)")
+            conn.execute("PRAGMA optimize")
+        finally:
+            conn.close()
+    
     async def vacuum_database(self):
-        """Optimize database."""
+        """Optimize database.
+        
+        File databases are vacuumed from a worker thread on their own
+        connection, so the main connection and read pool keep serving
+        queries meanwhile. Must not be called from within a write.
+        """
         try:
-            await self.db.execute("VACUUM")
-            await self.db.commit()
+            # VACUUM cannot run inside a transaction; just hold off other writers
+            async with self._write_lock:
+                if self.db_path == ':memory:':
+                    await self.db.execute("VACUUM")
+                else:
+                    await asyncio.to_thread(self._vacuum_file, self.db_path)
             logger.info("Database vacuumed")
         except Exception as e:
             logger.error(f"Failed to vacuum database: {e}")
             raise DatabaseError("Failed to vacuum database", e)
     
+    async def checkpoint(self):
+        """Checkpoint the WAL into the database file and truncate it."""
+        try:
+            async with self._write_lock:
+                await self.db.execute("PRAGMA wal_checkpoint(TRUNCATE)")
+            logger.debug("WAL checkpointed")
+        except Exception as e:
+            logger.error(f"Failed to checkpoint database: {e}")
+            raise DatabaseError("Failed to checkpoint database", e)
+    
+    async def _checkpoint_quietly(self):
+        """Checkpoint at an idle point; a failure here is not worth surfacing."""
+        try:
+            await self.checkpoint()
+        except DatabaseError as e:
+            logger.warning(f"Skipped WAL checkpoint: {e}")
+    
     async def get_statistics(self) -> Dict[str, Any]:
         """Get database statistics."""
         try:
-            stats = {}
-            
-            async with self.db.execute("SELECT COUNT(*) FROM runs") as cursor:
-                row = await cursor.fetchone()
-                stats['total_runs'] = row[0]
-            
-            async with self.db.execute("SELECT COUNT(*) FROM phases") as cursor:
-                row = await cursor.fetchone()
-                stats['total_phases'] = row[0]
-            
-            async with self.db.execute(
-                "SELECT severity, COUNT(*) as count FROM findings GROUP BY severity"
-            ) as cursor:
-                rows = await cursor.fetchall()
-                stats['findings_by_severity'] = {row['severity']: row['count'] for row in rows}
+            ((total_runs, total_phases),) = await self._fetch_all(
+                "SELECT (SELECT COUNT(*) FROM runs), (SELECT COUNT(*) FROM phases)"
+            )
+            severity_rows = await self._fetch_all(
+                "SELECT severity, COUNT(*) FROM findings GROUP BY severity"
+            )
             
+            stats = {
+                'total_runs': total_runs,
+                'total_phases': total_phases,
+                'findings_by_severity': dict(severity_rows),
+            }
             return stats
         except Exception as e:
             logger.error(f"Failed to get statistics: {e}")
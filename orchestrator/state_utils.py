@@ -1,14 +1,68 @@
 """Utility functions for state management."""
 
+import asyncio
+import gzip
 import logging
+import os
+import shutil
+import threading
+import time
+from collections import defaultdict
+from functools import lru_cache
 from pathlib import Path
-from typing import Optional
+from typing import Dict, List, Optional, Set, Tuple
 from datetime import datetime, timedelta
 
+from .models import ExecutionState, Finding
 from .state import StateManager
 
 logger = logging.getLogger(__name__)
 
+# Artifact directories (absolute paths) already created by this process
+_ARTIFACT_DIR_CACHE: Set[str] = set()
+_ARTIFACT_DIR_LOCK = threading.Lock()
+
+# Suffix appended to artifact files compressed by cleanup_old_artifacts
+_COMPRESSED_SUFFIX = ".gz"
+
+
+@lru_cache(maxsize=None)
+def _abs_base(base_path: str) -> str:
+    """Resolve an artifacts base directory against the working directory once."""
+    return os.path.abspath(base_path)
+
+
+@lru_cache(maxsize=1)
+def _second_label(epoch_seconds: int) -> str:
+    """Format a whole-second local timestamp as YYYYmmdd_HHMMSS, once per second.
+    
+    Built from the struct_time fields directly rather than via strftime.
+    """
+    tm = time.localtime(epoch_seconds)
+    return (
+        f"{tm.tm_year:04d}{tm.tm_mon:02d}{tm.tm_mday:02d}_"
+        f"{tm.tm_hour:02d}{tm.tm_min:02d}{tm.tm_sec:02d}"
+    )
+
+
+def _write_file(file_path: str, data: bytes) -> None:
+    """Write bytes to a file with raw os-level calls, truncating any old content."""
+    fd = os.open(file_path, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o644)
+    try:
+        view = memoryview(data)
+        while view:
+            view = view[os.write(fd, view):]
+    finally:
+        os.close(fd)
+
+
+def _read_text(file_path: Path) -> str:
+    """Read an artifact file, decompressing ones gzipped by cleanup."""
+    if file_path.name.endswith(_COMPRESSED_SUFFIX):
+        with gzip.open(file_path, 'rt', encoding='utf-8') as f:
+            return f.read()
+    return file_path.read_text(encoding='utf-8')
+
 
 def create_artifact_directory(
     run_id: str,
@@ -27,20 +81,22 @@ def create_artifact_directory(
     Returns:
         Absolute path to created directory
     """
-    parts = [base_path, run_id]
-    if phase_id:
-        parts.append(phase_id)
-    if execution_id:
-        parts.append(execution_id)
-    
-    dir_path = Path(*parts)
-    dir_path.mkdir(parents=True, exist_ok=True)
+    dir_path = os.path.join(_abs_base(base_path), run_id, phase_id or "", execution_id or "")
+    # Drop the trailing separator left by empty optional parts
+    dir_path = dir_path.rstrip(os.sep)
     
-    # Create .gitkeep to preserve structure
-    gitkeep = dir_path / ".gitkeep"
-    gitkeep.touch(exist_ok=True)
+    # Directories made earlier in this process only need a single stat
+    if dir_path in _ARTIFACT_DIR_CACHE and os.path.isdir(dir_path):
+        return dir_path
     
-    return str(dir_path.absolute())
+    with _ARTIFACT_DIR_LOCK:
+        os.makedirs(dir_path, exist_ok=True)
+        
+        # Create .gitkeep to preserve structure
+        os.close(os.open(os.path.join(dir_path, ".gitkeep"), os.O_WRONLY | os.O_CREAT, 0o644))
+        
+        _ARTIFACT_DIR_CACHE.add(dir_path)
+    return dir_path
 
 
 async def save_artifact(
@@ -71,17 +127,17 @@ async def save_artifact(
     # Create directory
     dir_path = create_artifact_directory(run_id, phase_id, execution_id, base_path)
     
-    # Generate filename with timestamp
-    timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-    filename = f"{artifact_type}_{timestamp}.{extension}"
-    file_path = Path(dir_path) / filename
+    # Generate filename with timestamp; the nanosecond part keeps saves
+    # within the same second from overwriting each other
+    seconds, nanos = divmod(time.time_ns(), 1_000_000_000)
+    filename = f"{artifact_type}_{_second_label(seconds)}_{nanos:09d}.{extension}"
+    file_path = os.path.join(dir_path, filename)
     
-    # Write content
-    with open(file_path, 'w', encoding='utf-8') as f:
-        f.write(content)
+    # Write content off the event loop
+    await asyncio.to_thread(_write_file, file_path, content.encode('utf-8'))
     
-    # Make path relative to base_path for storage
-    relative_path = str(file_path.relative_to(base_path))
+    # Store the path relative to base_path; dir_path always starts with it
+    relative_path = file_path[len(_abs_base(base_path)) + 1:]
     
     # Register in database
     await state_manager.register_artifact(
@@ -93,7 +149,7 @@ async def save_artifact(
     )
     
     logger.info(f"Saved artifact: {relative_path}")
-    return str(file_path)
+    return file_path
 
 
 async def load_artifact(artifact_id: str, state_manager: StateManager, base_path: str = "data/artifacts") -> str:
@@ -114,9 +170,7 @@ async def load_artifact(artifact_id: str, state_manager: StateManager, base_path
         raise ValueError(f"Artifact not found: {artifact_id}")
     
     # Load file
-    file_path = Path(base_path) / artifact.file_path
-    with open(file_path, 'r', encoding='utf-8') as f:
-        return f.read()
+    return await asyncio.to_thread(_read_text, Path(base_path) / artifact.file_path)
 
 
 async def export_run_markdown(
@@ -132,42 +186,100 @@ async def export_run_markdown(
         output_path: Output file path
     """
     summary = await state_manager.export_run_summary(run_id)
-    markdown = summary.to_markdown()
     
-    # Add execution details
-    markdown += "\n\n## Execution Details\n\n"
+    # Fetch the run's executions and findings with one query each and
+    # group them here, rather than querying per phase and per execution
+    executions_by_phase: Dict[str, List[ExecutionState]] = defaultdict(list)
+    for execution in await state_manager.get_executions_for_run(run_id):
+        executions_by_phase[execution.phase_id].append(execution)
+    findings_by_execution: Dict[str, List[Finding]] = defaultdict(list)
+    for finding in await state_manager.get_findings_for_run(run_id):
+        findings_by_execution[finding.execution_id].append(finding)
+    
+    # Collect fragments and join once instead of growing one string
+    parts = [summary.to_markdown(), "\n\n## Execution Details\n\n"]
     
     for phase in summary.phases:
-        executions = await state_manager.get_executions_for_phase(phase.phase_id)
-        
+        executions = executions_by_phase[phase.phase_id]
         if executions:
-            markdown += f"### Phase {phase.phase_number} Executions\n\n"
+            parts.append(f"### Phase {phase.phase_number} Executions\n\n")
             
             for execution in executions:
-                markdown += f"**Pass {execution.pass_number}** ({execution.status})\n"
-                markdown += f"- Started: {execution.started_at.isoformat()}\n"
+                parts.append(f"**Pass {execution.pass_number}** ({execution.status})\n")
+                parts.append(f"- Started: {execution.started_at_iso}\n")
                 if execution.completed_at:
-                    markdown += f"- Completed: {execution.completed_at.isoformat()}\n"
+                    parts.append(f"- Completed: {execution.completed_at_iso}\n")
                 if execution.copilot_summary:
-                    markdown += f"- Summary: {execution.copilot_summary}\n"
+                    parts.append(f"- Summary: {execution.copilot_summary}\n")
                 
                 # Add findings
-                findings = await state_manager.get_findings_for_execution(execution.execution_id)
+                findings = findings_by_execution[execution.execution_id]
                 if findings:
-                    markdown += f"- Findings: {len(findings)}\n"
-                    for finding in findings[:5]:  # Limit to first 5
-                        markdown += f"  - [{finding.severity}] {finding.title}\n"
+                    parts.append(f"- Findings: {len(findings)}\n")
+                    parts.extend(
+                        f"  - [{finding.severity}] {finding.title}\n"
+                        for finding in findings[:5]  # Limit to first 5
+                    )
                 
-                markdown += "\n"
+                parts.append("\n")
+    
+    markdown = "".join(parts)
     
     # Save markdown
     Path(output_path).parent.mkdir(parents=True, exist_ok=True)
-    with open(output_path, 'w', encoding='utf-8') as f:
-        f.write(markdown)
+    await asyncio.to_thread(_write_file, output_path, markdown.encode('utf-8'))
     
     logger.info(f"Exported run report to {output_path}")
 
 
+def _delete_files(file_paths: List[Path]) -> int:
+    """Delete the files that exist and return how many were removed."""
+    deleted = 0
+    for file_path in file_paths:
+        try:
+            os.unlink(file_path)
+        except FileNotFoundError:
+            continue
+        deleted += 1
+        logger.debug(f"Deleted: {file_path}")
+    return deleted
+
+
+def _compress_files(base: Path, artifacts: List[Tuple[str, str]]) -> List[Tuple[str, str]]:
+    """Gzip artifact files in place of the originals.
+    
+    Args:
+        base: Base artifacts directory
+        artifacts: (artifact_id, relative file_path) pairs
+        
+    Returns:
+        (artifact_id, new relative file_path) for each file compressed
+    """
+    compressed = []
+    for artifact_id, file_path in artifacts:
+        if file_path.endswith(_COMPRESSED_SUFFIX):
+            continue
+        source = base / file_path
+        target = base / f"{file_path}{_COMPRESSED_SUFFIX}"
+        try:
+            with open(source, 'rb') as src, gzip.open(target, 'wb') as dst:
+                shutil.copyfileobj(src, dst)
+            os.unlink(source)
+        except OSError as e:
+            # Keep the original and drop any partial archive, so the stored
+            # path stays valid; the remaining files are still processed
+            if not isinstance(e, FileNotFoundError):
+                logger.warning(f"Failed to compress {source}: {e}")
+            try:
+                os.unlink(target)
+            except OSError:
+                pass
+            continue
+        compressed.append((artifact_id, f"{file_path}{_COMPRESSED_SUFFIX}"))
+        logger.debug(f"Compressed: {source}")
+    return compressed
+
+
 async def cleanup_old_artifacts(
     state_manager: StateManager,
     retention_days: int,
@@ -183,25 +295,18 @@ async def cleanup_old_artifacts(
         compress: Whether to compress instead of delete
     """
     cutoff_date = datetime.now() - timedelta(days=retention_days)
+    base = Path(base_path)
     
-    # Get all runs
-    runs = await state_manager.list_runs(limit=1000)
+    # Let SQLite select old runs' artifacts; touch files off the event loop
+    artifacts = [item async for item in state_manager.iter_old_artifacts(cutoff_date)]
     
-    cleaned_count = 0
-    for run in runs:
-        if run.created_at < cutoff_date:
-            artifacts = await state_manager.get_artifacts_for_run(run.run_id)
-            
-            for artifact in artifacts:
-                file_path = Path(base_path) / artifact.file_path
-                
-                if file_path.exists():
-                    if compress:
-                        # TODO: Implement compression
-                        logger.debug(f"Would compress: {file_path}")
-                    else:
-                        file_path.unlink()
-                        cleaned_count += 1
-                        logger.debug(f"Deleted: {file_path}")
+    if compress:
+        compressed = await asyncio.to_thread(_compress_files, base, artifacts)
+        await state_manager.update_artifact_paths(compressed)
+        cleaned_count = len(compressed)
+    else:
+        cleaned_count = await asyncio.to_thread(
+            _delete_files, [base / file_path for _, file_path in artifacts]
+        )
     
     logger.info(f"Cleaned up {cleaned_count} old artifacts")
@@ -1,9 +1,21 @@
+from collections import Counter
 from dataclasses import dataclass, field
-from typing import List, Dict, Optional
+from typing import Iterable, List, Dict, Optional
 from orchestrator.models import Finding
 
+SEVERITIES = ("major", "medium", "minor")
 
-@dataclass
+
+def summarize_findings(findings: Iterable[Finding]) -> Dict[str, int]:
+    """Count findings per severity in a single pass.
+
+    Every severity in SEVERITIES is present in the result, even when zero.
+    """
+    counts = Counter(f.severity for f in findings)
+    return {severity: counts[severity] for severity in SEVERITIES}
+
+
+@dataclass(slots=True, frozen=True)
 class ChecklistItem:
     text: str
     completed: bool
@@ -11,7 +23,7 @@ class ChecklistItem:
     suggested_fix: Optional[str] = None
 
 
-@dataclass
+@dataclass(slots=True, frozen=True)
 class SpecComplianceResult:
     compliant: bool
     deviations: List[str]
@@ -19,7 +31,7 @@ class SpecComplianceResult:
     overall_assessment: str
 
 
-@dataclass
+@dataclass(slots=True, frozen=True)
 class VerificationResult:
     passed: bool
     findings: List[Finding]
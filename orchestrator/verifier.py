@@ -1,9 +1,12 @@
 import asyncio
+import hashlib
 import json
 import logging
 import re
 import subprocess
 import time
+from collections import OrderedDict
+from itertools import islice
 from pathlib import Path
 from typing import List, Dict, Optional, Tuple
 from datetime import datetime
@@ -14,7 +17,8 @@ from orchestrator.models import Finding
 from orchestrator.verification_models import (
     ChecklistItem,
     SpecComplianceResult,
-    VerificationResult
+    VerificationResult,
+    summarize_findings
 )
 from orchestrator.state import StateManager
 from orchestrator.llm_client import OllamaClient
@@ -22,6 +26,14 @@ from orchestrator.llm_client import OllamaClient
 
 logger = logging.getLogger(__name__)
 
+# Output and spec patterns, compiled once at import. The *_LINE_RE patterns
+# match whole output lines so one finditer pass replaces split-and-search.
+_ERROR_LINE_RE = re.compile(r"^.*error.*$", re.IGNORECASE | re.MULTILINE)
+_FAILED_LINE_RE = re.compile(r"^.*(?:FAILED|Failed:|✗|❌).*$", re.IGNORECASE | re.MULTILINE)
+_NONBLANK_LINE_RE = re.compile(r"^.*\S.*$", re.MULTILINE)
+_VULN_LINE_RE = re.compile(r"^.*(?:vulnerability|vulnerable|CVE-\d+).*$", re.IGNORECASE | re.MULTILINE)
+_CHECKLIST_RE = re.compile(r"^- \[ \] (.+)$", re.MULTILINE)
+
 
 class VerificationConfig:
     """Configuration for verification checks."""
@@ -59,6 +71,13 @@ class VerificationConfig:
 class PhaseVerifier:
     """Verifies phase execution through multiple validation layers."""
     
+    # Bytes of stdout/stderr kept per command stream; the rest is discarded
+    # while reading so verbose commands do not grow memory without bound
+    OUTPUT_LIMIT = 1 << 20
+    OUTPUT_CHUNK_SIZE = 65536
+    # Parsed spec-validation responses remembered per verifier, keyed by prompt
+    SPEC_CACHE_SIZE = 16
+    
     def __init__(
         self,
         state_manager: StateManager,
@@ -72,6 +91,7 @@ class PhaseVerifier:
         self.config = config
         self.repo_path = Path(repo_path)
         self.prompts_config = prompts_config
+        self._spec_cache: "OrderedDict[bytes, Dict]" = OrderedDict()
         
         # Setup Jinja2 for template rendering
         template_dir = Path(__file__).parent.parent / "templates"
@@ -93,128 +113,100 @@ class PhaseVerifier:
         failed_checklist_items = []
         spec_compliance = None
         
-        # Run build check
+        # Enabled checks as (name, label, error finding, coroutine). The error
+        # finding is (severity, title, suggested fix) or None to only log.
+        checks = []
         if self.config.build_enabled:
-            logger.info("Running build check")
-            checks_run.append("build")
-            try:
-                findings = await self._run_build_check(execution_id)
-                all_findings.extend(findings)
-            except Exception as e:
-                logger.error(f"Build check failed: {e}")
-                all_findings.append(self._create_finding(
-                    execution_id, "major", "build",
-                    "Build Check Failed",
-                    f"Build check execution failed: {str(e)}",
-                    str(e),
-                    "Ensure build command is correctly configured and executable"
-                ))
-        
-        # Run test check
+            checks.append((
+                "build", "Build check",
+                ("major", "Build Check Failed",
+                 "Ensure build command is correctly configured and executable"),
+                self._run_build_check(execution_id)
+            ))
         if self.config.test_enabled:
-            logger.info("Running test check")
-            checks_run.append("test")
-            try:
-                findings = await self._run_test_check(execution_id)
-                all_findings.extend(findings)
-            except Exception as e:
-                logger.error(f"Test check failed: {e}")
-                all_findings.append(self._create_finding(
-                    execution_id, "major", "test",
-                    "Test Check Failed",
-                    f"Test check execution failed: {str(e)}",
-                    str(e),
-                    "Ensure test command is correctly configured and executable"
-                ))
-        
-        # Run lint check
+            checks.append((
+                "test", "Test check",
+                ("major", "Test Check Failed",
+                 "Ensure test command is correctly configured and executable"),
+                self._run_test_check(execution_id)
+            ))
         if self.config.lint_enabled:
-            logger.info("Running lint check")
-            checks_run.append("lint")
-            try:
-                findings = await self._run_lint_check(execution_id)
-                all_findings.extend(findings)
-            except Exception as e:
-                logger.error(f"Lint check failed: {e}")
-                all_findings.append(self._create_finding(
-                    execution_id, "minor", "lint",
-                    "Lint Check Failed",
-                    f"Lint check execution failed: {str(e)}",
-                    str(e),
-                    "Ensure lint command is correctly configured and executable"
-                ))
-        
-        # Run security scan
+            checks.append((
+                "lint", "Lint check",
+                ("minor", "Lint Check Failed",
+                 "Ensure lint command is correctly configured and executable"),
+                self._run_lint_check(execution_id)
+            ))
         if self.config.security_scan_enabled:
-            logger.info("Running security scan")
-            checks_run.append("security")
-            try:
-                findings = await self._run_security_scan(execution_id)
-                all_findings.extend(findings)
-            except Exception as e:
-                logger.error(f"Security scan failed: {e}")
-                all_findings.append(self._create_finding(
-                    execution_id, "medium", "security",
-                    "Security Scan Failed",
-                    f"Security scan execution failed: {str(e)}",
-                    str(e),
-                    "Ensure security scan command is correctly configured and executable"
-                ))
-        
-        # Run custom tests
+            checks.append((
+                "security", "Security scan",
+                ("medium", "Security Scan Failed",
+                 "Ensure security scan command is correctly configured and executable"),
+                self._run_security_scan(execution_id)
+            ))
         if self.config.custom_tests:
-            logger.info("Running custom tests")
-            checks_run.append("custom")
-            try:
-                findings = await self._run_custom_tests(execution_id)
-                all_findings.extend(findings)
-            except Exception as e:
-                logger.error(f"Custom tests failed: {e}")
-        
-        # Run spec validation
+            checks.append((
+                "custom", "Custom tests", None,
+                self._run_custom_tests(execution_id)
+            ))
         if self.config.spec_validation_enabled:
-            logger.info("Running spec validation")
-            checks_run.append("spec_validation")
-            try:
-                findings, failed_items, compliance = await self._validate_spec_compliance(
-                    execution_id, spec_path, copilot_result
-                )
+            checks.append((
+                "spec_validation", "Spec validation",
+                ("medium", "Spec Validation Failed",
+                 "Review spec validation configuration and LLM connectivity"),
+                self._validate_spec_compliance(execution_id, spec_path, copilot_result)
+            ))
+        
+        # Checks are independent and mostly wait on subprocesses or the LLM,
+        # so run them all at once; results come back in check order
+        logger.info(f"Running checks: {', '.join(name for name, _, _, _ in checks)}")
+        results = await asyncio.gather(
+            *(coro for _, _, _, coro in checks), return_exceptions=True
+        )
+        
+        for (name, label, on_error, _), result in zip(checks, results):
+            checks_run.append(name)
+            if isinstance(result, Exception):
+                logger.error(f"{label} failed: {result}")
+                if on_error:
+                    severity, title, suggested_fix = on_error
+                    all_findings.append(self._create_finding(
+                        execution_id, severity, name,
+                        title,
+                        f"{label} execution failed: {str(result)}",
+                        str(result),
+                        suggested_fix
+                    ))
+            elif isinstance(result, BaseException):
+                raise result
+            elif name == "spec_validation":
+                findings, failed_checklist_items, spec_compliance = result
                 all_findings.extend(findings)
-                failed_checklist_items = failed_items
-                spec_compliance = compliance
-            except Exception as e:
-                logger.error(f"Spec validation failed: {e}")
-                all_findings.append(self._create_finding(
-                    execution_id, "medium", "spec_validation",
-                    "Spec Validation Failed",
-                    f"Spec validation execution failed: {str(e)}",
-                    str(e),
-                    "Review spec validation configuration and LLM connectivity"
-                ))
+            else:
+                all_findings.extend(result)
         
         # Calculate findings summary
-        findings_summary = {
-            "major": sum(1 for f in all_findings if f.severity == "major"),
-            "medium": sum(1 for f in all_findings if f.severity == "medium"),
-            "minor": sum(1 for f in all_findings if f.severity == "minor")
-        }
+        findings_summary = summarize_findings(all_findings)
         
         logger.info(f"Verification complete. Findings: {findings_summary}")
         
-        # Persist findings to state manager
-        for finding in all_findings:
+        # Persist findings to state manager in one transaction; every
+        # finding here was created for this execution
+        if all_findings:
             try:
-                await self.state_manager.add_finding(
-                    execution_id=finding.execution_id,
-                    severity=finding.severity,
-                    category=finding.category,
-                    title=finding.title,
-                    description=finding.description,
-                    evidence=finding.evidence,
-                    suggested_fix=finding.suggested_fix
-                )
+                await self.state_manager.add_findings_bulk(execution_id, [
+                    {
+                        "severity": finding.severity,
+                        "category": finding.category,
+                        "title": finding.title,
+                        "description": finding.description,
+                        "evidence": finding.evidence,
+                        "suggested_fix": finding.suggested_fix
+                    }
+                    for finding in all_findings
+                ])
             except Exception as e:
-                logger.error(f"Failed to persist finding: {e}")
+                logger.error(f"Failed to persist findings: {e}")
         
         # Check if verification passed
         passed = self._check_findings_thresholds(findings_summary)
@@ -243,11 +235,11 @@ class PhaseVerifier:
         
         if result["exit_code"] != 0:
             # Parse build errors
-            error_lines = [line for line in result["stderr"].split("\n") if "error" in line.lower()]
+            error_lines = [m.group() for m in islice(_ERROR_LINE_RE.finditer(result["stderr"]), 10)]
             
             evidence = f"Command: {self.config.build_command}\n"
             evidence += f"Exit Code: {result['exit_code']}\n"
-            evidence += f"Errors:\n{chr(10).join(error_lines[:10])}"
+            evidence += f"Errors:\n{chr(10).join(error_lines)}"
             
             findings.append(self._create_finding(
                 execution_id,
@@ -275,8 +267,7 @@ class PhaseVerifier:
         output = result["stdout"] + result["stderr"]
         
         # Look for common test failure patterns
-        failed_pattern = re.compile(r"FAILED|Failed:|✗|❌", re.IGNORECASE)
-        test_failures = [line for line in output.split("\n") if failed_pattern.search(line)]
+        test_failures = [m.group() for m in _FAILED_LINE_RE.finditer(output)]
         
         if test_failures or result["exit_code"] != 0:
             evidence = f"Command: {self.config.test_command}\n"
@@ -309,11 +300,11 @@ class PhaseVerifier:
             output = result["stdout"] + result["stderr"]
             
             # Count violations
-            violation_lines = [line for line in output.split("\n") if line.strip()]
+            violation_lines = [m.group() for m in islice(_NONBLANK_LINE_RE.finditer(output), 20)]
             
             evidence = f"Command: {self.config.lint_command}\n"
             evidence += f"Exit Code: {result['exit_code']}\n"
-            evidence += f"Violations:\n{chr(10).join(violation_lines[:20])}"
+            evidence += f"Violations:\n{chr(10).join(violation_lines)}"
             
             findings.append(self._create_finding(
                 execution_id,
@@ -340,8 +331,7 @@ class PhaseVerifier:
         output = result["stdout"] + result["stderr"]
         
         # Look for vulnerability patterns
-        vuln_pattern = re.compile(r"vulnerability|vulnerable|CVE-\d+", re.IGNORECASE)
-        vulnerabilities = [line for line in output.split("\n") if vuln_pattern.search(line)]
+        vulnerabilities = [m.group() for m in _VULN_LINE_RE.finditer(output)]
         
         if vulnerabilities:
             evidence = f"Command: {self.config.security_command}\n"
@@ -438,15 +428,28 @@ class PhaseVerifier:
             "You are a code review expert validating implementation against specification."
         )
         
+        # Identical prompts (e.g. a retry pass with no new changes) reuse the
+        # earlier parsed response instead of calling the LLM again
+        temperature = self.config.spec_validation_temperature
+        cache_key = hashlib.blake2b(
+            f"{temperature}\0{system_prompt}\0{prompt}".encode("utf-8"),
+            digest_size=16
+        ).digest()
+        
         try:
-            response = await self.llm_client.generate(
-                prompt=prompt,
-                system_prompt=system_prompt,
-                temperature=self.config.spec_validation_temperature
-            )
-            
-            # Parse JSON response
-            validation_result = json.loads(response)
+            validation_result = self._spec_cache.get(cache_key)
+            if validation_result is not None:
+                self._spec_cache.move_to_end(cache_key)
+                logger.info("Reusing cached spec validation result")
+            else:
+                response = await self.llm_client.generate(
+                    prompt=prompt,
+                    system_prompt=system_prompt,
+                    temperature=temperature
+                )
+                
+                # Parse JSON response
+                validation_result = json.loads(response)
             
             # Process checklist results
             for item_result in validation_result.get("checklist_results", []):
@@ -495,6 +498,11 @@ class PhaseVerifier:
                 overall_assessment=validation_result.get("overall_assessment", "")
             )
             
+            # Only responses that processed cleanly are worth replaying
+            self._spec_cache[cache_key] = validation_result
+            if len(self._spec_cache) > self.SPEC_CACHE_SIZE:
+                self._spec_cache.popitem(last=False)
+            
         except json.JSONDecodeError as e:
             logger.error(f"Failed to parse LLM response: {e}")
             findings.append(self._create_finding(
@@ -569,18 +577,18 @@ Respond with JSON containing checklist_results, spec_compliance, and overall_ass
     
     async def _get_git_diff(self) -> str:
         """Get git diff of recent changes."""
+        # The prompt only uses the start of the diff
         result = await self._run_command(
             "git --no-pager diff HEAD",
             30,
-            self.repo_path
+            self.repo_path,
+            keep_head=True
         )
         return result["stdout"]
     
     def _extract_checklist_from_spec(self, spec_content: str) -> List[str]:
         """Extract checklist items from spec."""
-        pattern = re.compile(r"^- \[ \] (.+)$", re.MULTILINE)
-        matches = pattern.findall(spec_content)
-        return matches
+        return _CHECKLIST_RE.findall(spec_content)
     
     def _create_finding(
         self,
@@ -630,9 +638,14 @@ Respond with JSON containing checklist_results, spec_compliance, and overall_ass
         self,
         command: str,
         timeout: int,
-        working_dir: Path
+        working_dir: Path,
+        keep_head: bool = False
     ) -> Dict[str, any]:
-        """Run a shell command and return results."""
+        """Run a shell command and return results.
+        
+        Only the last OUTPUT_LIMIT bytes of each stream are kept (the first,
+        with keep_head), which is all the checks quote as evidence.
+        """
         logger.debug(f"Running command: {command} in {working_dir}")
         
         try:
@@ -643,8 +656,12 @@ Respond with JSON containing checklist_results, spec_compliance, and overall_ass
                 cwd=str(working_dir)
             )
             
-            stdout, stderr = await asyncio.wait_for(
-                process.communicate(),
+            stdout, stderr, _ = await asyncio.wait_for(
+                asyncio.gather(
+                    self._drain(process.stdout, keep_head),
+                    self._drain(process.stderr, keep_head),
+                    process.wait()
+                ),
                 timeout=timeout
             )
             
@@ -669,6 +686,20 @@ Respond with JSON containing checklist_results, spec_compliance, and overall_ass
                 "stderr": str(e)
             }
     
+    async def _drain(self, reader: asyncio.StreamReader, keep_head: bool) -> bytearray:
+        """Read a stream to EOF, keeping at most OUTPUT_LIMIT bytes of it."""
+        limit = self.OUTPUT_LIMIT
+        buffer = bytearray()
+        while chunk := await reader.read(self.OUTPUT_CHUNK_SIZE):
+            if keep_head:
+                # Keep reading past the limit so the process never blocks on a full pipe
+                buffer += chunk[:limit - len(buffer)]
+            else:
+                buffer += chunk
+                if len(buffer) > limit:
+                    del buffer[:len(buffer) - limit]
+        return buffer
+    
     async def generate_feedback_spec(
         self,
         original_spec_path: Path,
@@ -58,6 +58,7 @@ def mock_state_manager():
     state.update_run_status = AsyncMock()
     state.update_phase_status = AsyncMock()
     state.register_artifact = AsyncMock()
+    state.register_artifacts = AsyncMock()
     state.create_intervention = AsyncMock(return_value=MagicMock(intervention_id="intervention_123"))
     state.get_pending_interventions = AsyncMock(return_value=[])
     state.resolve_intervention = AsyncMock()
@@ -65,9 +66,7 @@ def mock_state_manager():
     state.get_artifacts_for_phase = AsyncMock(return_value=[])
     state.get_executions_for_phase = AsyncMock(return_value=[])
     state.get_findings_for_phase = AsyncMock(return_value=[])
-    state.db = MagicMock()
-    state.db.execute = AsyncMock()
-    state.db.commit = AsyncMock()
+    state.set_phase_branch = AsyncMock()
     return state
 
 
@@ -333,7 +332,7 @@ class TestBranchManagement:
         executor.config.execution.copilot_mode = "branch"
 
         phase = MagicMock(spec=PhaseState)
-        phase.id = "phase_123"
+        phase.phase_id = "phase_123"
         phase.phase_number = 1
         phase.title = "Test Phase"
 
@@ -350,6 +349,7 @@ class TestBranchManagement:
         assert "test-phase" in branch_name
         mock_repo.create_head.assert_called_once()
         mock_branch.checkout.assert_called_once()
+        mock_state_manager.set_phase_branch.assert_awaited_once_with("phase_123", branch_name)
 
     @pytest.mark.asyncio
     async def test_no_branch_in_direct_mode(self, executor, mock_state_manager):
@@ -1,11 +1,16 @@
 """Unit tests for phase planner components."""
 
+import asyncio
+import io
+import os
 import pytest
 import json
-from unittest.mock import Mock, AsyncMock, patch
+from unittest.mock import Mock, MagicMock, AsyncMock, patch
 from orchestrator.phase_validator import PhaseValidator, ValidationError
-from orchestrator.prompt_builder import PromptBuilder
-from orchestrator.planner import PhasePlanner
+from orchestrator.prompt_builder import PromptBuilder, _compile_template
+from orchestrator.planner import PhasePlanner, PlannerError
+from orchestrator.planner_ui import PlannerUI
+from orchestrator.state import StateManager
 
 
 class TestPhaseValidator:
@@ -95,6 +100,23 @@ That's the plan!
         assert len(phases) == 1
         assert phases[0]['size'] == 'medium'
 
+    def test_parse_llm_response_bare_array_with_prose(self):
+        """Test extraction of an unfenced array surrounded by text."""
+        phase = {
+            'phase_number': 1,
+            'title': 'Phase [1]',
+            'intent': 'Do something',
+            'size': 'small',
+            'files': ['file.py'],
+            'acceptance_criteria': ['Works'],
+            'dependencies': []
+        }
+        response = f"Plan below [draft]:\n{json.dumps([phase, {**phase, 'phase_number': 2}])}\nDone]"
+
+        phases = PhaseValidator.parse_llm_response(response)
+        assert [p['phase_number'] for p in phases] == [1, 2]
+        assert phases[0]['title'] == 'Phase [1]'
+
     def test_parse_llm_response_invalid_json(self):
         """Test parsing handles invalid JSON."""
         response = "This is not JSON at all"
@@ -102,6 +124,71 @@ That's the plan!
         with pytest.raises(ValidationError):
             PhaseValidator.parse_llm_response(response)
 
+    def test_parse_llm_response_preserves_extra_fields(self):
+        """Test parsing keeps fields beyond the declared phase structure."""
+        response = json.dumps([{
+            'phase_number': 1,
+            'title': 'Phase 1',
+            'intent': 'Do something',
+            'size': 'small',
+            'files': ['file.py'],
+            'acceptance_criteria': ['Works'],
+            'notes': 'Extra context'
+        }])
+
+        phases = PhaseValidator.parse_llm_response(response)
+        assert phases[0]['notes'] == 'Extra context'
+        assert 'dependencies' not in phases[0]
+
+    def test_parse_llm_response_cached_results_are_independent(self):
+        """Test repeated parses of the same text return fresh phase dicts."""
+        response = json.dumps([{
+            'phase_number': 1,
+            'title': 'Phase 1',
+            'intent': 'Do something',
+            'size': 'small',
+            'files': ['file.py'],
+            'acceptance_criteria': ['Works']
+        }])
+
+        first = PhaseValidator.parse_llm_response(response)
+        first[0]['files'].append('other.py')
+        first[0]['title'] = 'Changed'
+
+        second = PhaseValidator.parse_llm_response(response)
+        assert second[0]['files'] == ['file.py']
+        assert second[0]['title'] == 'Phase 1'
+
+    def test_parse_llm_response_reports_phase_errors(self):
+        """Test parsing reports field-level errors for invalid phases."""
+        response = json.dumps([{
+            'phase_number': 1,
+            'title': 'Phase 1',
+            'intent': 'Do something',
+            'size': 'huge',
+            'files': ['file.py'],
+            'acceptance_criteria': ['Works']
+        }])
+
+        with pytest.raises(ValidationError, match="Phase 1 validation failed"):
+            PhaseValidator.parse_llm_response(response)
+
+    def test_validate_all(self):
+        """Test whole-plan validation accepts valid phases and reports errors."""
+        phase = {
+            'phase_number': 1,
+            'title': 'Phase 1',
+            'intent': 'Test',
+            'size': 'small',
+            'files': [],
+            'acceptance_criteria': ['Test']
+        }
+
+        PhaseValidator.validate_all([phase])
+
+        with pytest.raises(ValidationError, match="Missing required field: intent"):
+            PhaseValidator.validate_all([phase, {'phase_number': 2, 'title': 'Phase 2'}])
+
     def test_check_circular_dependencies(self):
         """Test dependency validation catches cycles."""
         phases = [
@@ -129,6 +216,33 @@ That's the plan!
         assert not is_valid
         assert any('cannot depend on phase 2' in err.lower() for err in errors)
 
+    def test_check_dependencies_long_chain(self):
+        """Test cycle detection handles chains deeper than the recursion limit."""
+        phases = [
+            {'phase_number': n, 'dependencies': [n - 1] if n > 1 else []}
+            for n in range(3000, 0, -1)
+        ]
+
+        is_valid, errors = PhaseValidator.check_phase_dependencies(phases)
+        assert is_valid
+        assert errors == []
+
+    def test_check_duplicate_phase_numbers(self):
+        """Test dependency validation rejects duplicate phase numbers."""
+        phase = {
+            'phase_number': 1,
+            'title': 'Phase 1',
+            'intent': 'Test',
+            'size': 'small',
+            'files': [],
+            'acceptance_criteria': ['Test'],
+            'dependencies': []
+        }
+
+        is_valid, errors = PhaseValidator.check_phase_dependencies([phase, dict(phase)])
+        assert not is_valid
+        assert any('duplicate phase number 1' in err.lower() for err in errors)
+
     def test_check_valid_dependencies(self):
         """Test dependency validation accepts valid dependencies."""
         phases = [
@@ -210,6 +324,28 @@ follow_up_prompt: |
         assert 'file2.py' in formatted['relevant_code']
         assert 'Guide' in formatted['documentation']
 
+    def test_format_repo_context_reuses_result_for_same_context(self, prompt_builder):
+        """Test the same context object is only formatted once."""
+        context = {'hot_files': ['a.py'], 'code_chunks': [], 'documentation': []}
+
+        with patch('orchestrator.prompt_builder.io.StringIO', wraps=io.StringIO) as buffers:
+            first = prompt_builder.format_repo_context(context)
+            second = prompt_builder.format_repo_context(context)
+            assert buffers.call_count == 1
+        assert first == second
+
+        other = prompt_builder.format_repo_context({'hot_files': ['b.py']})
+        assert 'b.py' in other['hot_files']
+
+    def test_compiled_template_matches_str_format(self):
+        """Test pre-parsed prompt templates render exactly like str.format."""
+        template = "Issue: {issue}\n{{literal}} {count:>3} {name!r}\nCode: {code}"
+        fields = {'issue': 'Add cache', 'count': 7, 'name': 'x', 'code': 'print(1)'}
+
+        assert _compile_template(template)(**fields) == template.format(**fields)
+        with pytest.raises(KeyError):
+            _compile_template(template)(issue='only')
+
     def test_build_follow_up_prompt(self, prompt_builder):
         """Test follow-up prompt building."""
         original = "Original prompt"
@@ -227,6 +363,79 @@ follow_up_prompt: |
         assert "A1" in prompt
 
 
+    def test_prompts_config_cached_until_file_changes(self, tmp_path):
+        """Test prompts.yaml is parsed once per file version."""
+        config_path = tmp_path / "prompts.yaml"
+        config_path.write_text('system_prompt: "One"\n')
+
+        first = PromptBuilder(str(config_path))
+        second = PromptBuilder(str(config_path))
+        assert first.config is second.config
+
+        config_path.write_text('system_prompt: "Two"\n')
+        stat = config_path.stat()
+        os.utime(config_path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000_000))
+
+        assert PromptBuilder(str(config_path)).config['system_prompt'] == 'Two'
+
+
+class TestPlannerUI:
+    """Tests for PlannerUI."""
+
+    def test_frame_batches_screen_into_single_print(self):
+        """Test displays inside a frame are written once, before the prompt."""
+        ui = PlannerUI()
+        ui.console.print = Mock()
+        phases = [{'phase_number': 1, 'title': 'Setup', 'size': 'small', 'files': [], 'dependencies': []}]
+
+        with patch('orchestrator.planner_ui.Prompt.ask', return_value='a'):
+            with ui.frame():
+                ui.display_phase_detail({**phases[0], 'intent': 'Do it', 'acceptance_criteria': ['Done']})
+                ui.display_phase_summary(phases)
+                assert ui.console.print.call_count == 0
+                assert ui.prompt_approval_action() == 'approve'
+                assert ui.console.print.call_count == 1
+
+        assert ui.console.print.call_count == 1
+
+    def test_display_phase_summary_reuses_rendered_table(self):
+        """Test unchanged phases are not laid out again on redisplay."""
+        ui = PlannerUI()
+        phases = [{'phase_number': 1, 'title': 'Setup', 'size': 'small', 'files': ['a.py'], 'dependencies': []}]
+
+        with patch.object(ui, '_build_summary_table', wraps=ui._build_summary_table) as build:
+            with ui.console.capture() as first:
+                ui.display_phase_summary(phases)
+            with ui.console.capture() as second:
+                ui.display_phase_summary([dict(phases[0])])
+            assert build.call_count == 1
+            assert first.get() == second.get()
+
+            ui.display_phase_summary([{**phases[0], 'size': 'large'}])
+            assert build.call_count == 2
+
+
+    def test_prompt_follow_up_question_stops_at_blank_line(self):
+        """Test follow-up input ends at the first blank line."""
+        ui = PlannerUI()
+        ui.console.print = Mock()
+
+        with patch('builtins.input', side_effect=['Split phase 2', '  into two', '   ', 'unread']):
+            assert ui.prompt_follow_up_question() == 'Split phase 2\n  into two'
+
+
+    def test_show_progress_reuses_instance(self):
+        """Test spinners share one Progress and start without stale tasks."""
+        ui = PlannerUI()
+
+        with ui.show_progress("First") as progress:
+            progress.add_task("Working...", total=None)
+
+        second = ui.show_progress("Second")
+        assert second is progress
+        assert second.task_ids == []
+
+
 class TestPhasePlanner:
     """Tests for PhasePlanner integration."""
 
@@ -264,6 +473,7 @@ class TestPhasePlanner:
         manager = Mock()
         manager.create_phase = AsyncMock(return_value="phase_id_1")
         manager.register_artifact = AsyncMock()
+        manager.register_artifacts = AsyncMock()
         manager.update_run_status = AsyncMock()
         return manager
 
@@ -306,6 +516,176 @@ output_format_instructions: "JSON"
         assert mock_llm_client.generate.called
         assert mock_rag_system.get_phase_planning_context.called
 
+    @pytest.mark.asyncio
+    async def test_planning_session_waits_for_rag_before_failing(
+        self,
+        mock_config,
+        mock_llm_client,
+        mock_rag_system,
+        mock_state_manager,
+        tmp_path
+    ):
+        """Test a missing issue doc fails only after RAG setup has finished."""
+        config_dir = tmp_path / "config"
+        config_dir.mkdir()
+        (config_dir / "prompts.yaml").write_text("""
+system_prompt: "Test"
+phase_planning_prompt: "Test: {issue_documentation} {hot_files} {relevant_code} {documentation}"
+output_format_instructions: "JSON"
+""")
+        (tmp_path / "templates").mkdir()
+        mock_config.base_path = str(tmp_path)
+
+        finished = []
+
+        async def slow_initialize():
+            await asyncio.sleep(0.05)
+            finished.append(True)
+
+        mock_rag_system.initialize = AsyncMock(side_effect=slow_initialize)
+        planner = PhasePlanner(
+            mock_config,
+            mock_llm_client,
+            mock_rag_system,
+            mock_state_manager
+        )
+        planner.ui = MagicMock()
+
+        with pytest.raises(PlannerError, match="Issue documentation not found"):
+            await planner.run_planning_session(
+                "run_1", str(tmp_path / "missing.md"), "/repo", "main"
+            )
+        assert finished == [True]
+
+    @pytest.mark.asyncio
+    async def test_generate_phase_breakdown_uses_cache(
+        self,
+        mock_config,
+        mock_llm_client,
+        mock_rag_system,
+        mock_state_manager,
+        tmp_path
+    ):
+        """Test identical generation requests reuse the cached breakdown."""
+        config_dir = tmp_path / "config"
+        config_dir.mkdir()
+        (config_dir / "prompts.yaml").write_text("""
+system_prompt: "Test"
+phase_planning_prompt: "Test: {issue_documentation} {hot_files} {relevant_code} {documentation}"
+output_format_instructions: "JSON"
+""")
+        (tmp_path / "templates").mkdir()
+        mock_config.base_path = str(tmp_path)
+
+        planner = PhasePlanner(
+            mock_config,
+            mock_llm_client,
+            mock_rag_system,
+            mock_state_manager
+        )
+
+        first = await planner.generate_phase_breakdown("Test issue", "/repo")
+        first[0]['title'] = 'Changed'
+        second = await planner.generate_phase_breakdown("Test issue", "/repo")
+
+        assert mock_llm_client.generate.await_count == 1
+        assert mock_rag_system.get_phase_planning_context.await_count == 1
+        assert second[0]['title'] == 'Test'
+
+        await planner.generate_phase_breakdown("Test issue", "/repo", use_cache=False)
+        assert mock_llm_client.generate.await_count == 2
+
+    def test_dedupe_repo_context(self):
+        """Test duplicate code chunks and hot files are dropped without mutating input."""
+        repo_context = {
+            'hot_files': [{'path': 'a.py', 'commit_count': 3}, {'path': 'a.py', 'commit_count': 3}, 'b.py'],
+            'code_chunks': [
+                {'file_path': 'a.py', 'start_line': 1, 'content': 'x'},
+                {'file_path': 'a.py', 'start_line': 1, 'content': 'x'},
+                {'file_path': 'a.py', 'start_line': 10, 'content': 'y'},
+            ],
+            'documentation': []
+        }
+
+        deduped = PhasePlanner._dedupe_repo_context(repo_context)
+
+        assert [f['path'] if isinstance(f, dict) else f for f in deduped['hot_files']] == ['a.py', 'b.py']
+        assert [c['start_line'] for c in deduped['code_chunks']] == [1, 10]
+        assert len(repo_context['code_chunks']) == 3
+
+    @pytest.mark.asyncio
+    async def test_save_phases_writes_artifacts(
+        self,
+        mock_config,
+        mock_llm_client,
+        mock_rag_system,
+        tmp_path
+    ):
+        """Test saving phases persists state and registers plan artifacts."""
+        config_dir = tmp_path / "config"
+        config_dir.mkdir()
+        (config_dir / "prompts.yaml").write_text("""
+system_prompt: "Test"
+phase_planning_prompt: "Test: {issue_documentation} {hot_files} {relevant_code} {documentation}"
+output_format_instructions: "JSON"
+""")
+
+        templates_dir = tmp_path / "templates"
+        templates_dir.mkdir()
+        (templates_dir / "phase_plan.md.j2").write_text(
+            "# {{ run_id }}\n{% for phase in phases %}- {{ phase.title }}\n{% endfor %}"
+        )
+        (templates_dir / "phase_detail.md.j2").write_text(
+            "# {{ phase.title }} of {{ total_phases }}"
+        )
+
+        mock_config.base_path = str(tmp_path)
+
+        phases = [
+            {
+                'phase_number': n,
+                'title': f'Phase {n}',
+                'intent': 'Test',
+                'size': 'small',
+                'files': [],
+                'acceptance_criteria': ['Works']
+            }
+            for n in (1, 2)
+        ]
+
+        async with StateManager(str(tmp_path / "state.db"), str(tmp_path / "artifacts")) as state_manager:
+            run = await state_manager.create_run(
+                repo_path="/repo",
+                branch="main",
+                doc_path="/doc.md",
+                config={}
+            )
+            planner = PhasePlanner(
+                mock_config,
+                mock_llm_client,
+                mock_rag_system,
+                state_manager
+            )
+
+            paths = await planner.save_phases(run.run_id, phases, "/repo", "main")
+
+            planning_dir = tmp_path / "data" / "artifacts" / run.run_id / "planning"
+            assert json.loads((planning_dir / "PhasePlan.json").read_text()) == phases
+            assert "- Phase 2" in (planning_dir / "PhasePlan.md").read_text()
+            assert (planning_dir / "Phase_1_Detail.md").read_text() == "# Phase 1 of 2"
+            assert len(paths) == 4
+
+            saved_phases = await state_manager.get_phases_for_run(run.run_id)
+            assert [p.title for p in saved_phases] == ['Phase 1', 'Phase 2']
+            assert saved_phases[0].plan_data == phases[0]
+            assert (await state_manager.get_run(run.run_id)).status == 'executing'
+
+            artifacts = await state_manager.get_artifacts_for_run(run.run_id)
+            assert sorted(a.file_path for a in artifacts) == sorted(paths)
+            assert sorted(a.artifact_type for a in artifacts) == [
+                'phase_detail', 'phase_detail', 'phase_plan', 'phase_plan'
+            ]
+
 
 if __name__ == '__main__':
     pytest.main([__file__, '-v'])
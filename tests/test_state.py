@@ -1,14 +1,21 @@
 """Unit tests for state management."""
 
+import asyncio
 import pytest
 import tempfile
+import aiosqlite
 import json
+import os
+import sqlite3
 from pathlib import Path
 from datetime import datetime
+from unittest.mock import patch
+from pydantic import ValidationError
 
 from orchestrator.state import StateManager
+from orchestrator.schema import SCHEMA_VERSION, get_schema_version, initialize_database
 from orchestrator.models import RunState, PhaseState, ExecutionState, Finding
-from orchestrator.exceptions import RunNotFoundError, PhaseNotFoundError
+from orchestrator.exceptions import DatabaseError, RunNotFoundError, PhaseNotFoundError
 
 
 @pytest.fixture
@@ -106,6 +113,8 @@ async def test_create_phase(state_manager):
     assert phase.phase_number == 1
     assert phase.status == "pending"
     assert json.loads(phase.plan_json) == plan
+    assert phase.plan_data == plan
+    assert phase.plan_data is phase.plan_data
 
 
 @pytest.mark.asyncio
@@ -265,6 +274,37 @@ async def test_add_findings(state_manager):
     assert finding.resolved is False
 
 
+@pytest.mark.asyncio
+async def test_register_artifacts(state_manager):
+    """Test registering several artifacts at once."""
+    config = {"max_retries": 3}
+    run = await state_manager.create_run(
+        repo_path="/test/repo",
+        branch="main",
+        doc_path="/test/doc.md",
+        config=config
+    )
+    
+    artifacts = await state_manager.register_artifacts([
+        {
+            "run_id": run.run_id,
+            "artifact_type": "phase_plan",
+            "file_path": "planning/PhasePlan.json",
+            "metadata": {"description": "JSON plan"}
+        },
+        {
+            "run_id": run.run_id,
+            "artifact_type": "phase_plan",
+            "file_path": "planning/PhasePlan.md"
+        }
+    ])
+    
+    assert [a.file_path for a in artifacts] == ["planning/PhasePlan.json", "planning/PhasePlan.md"]
+    stored = await state_manager.get_artifacts_for_run(run.run_id)
+    assert {a.artifact_id for a in stored} == {a.artifact_id for a in artifacts}
+    assert artifacts[0].get_metadata() == {"description": "JSON plan"}
+
+
 @pytest.mark.asyncio
 async def test_findings_summary(state_manager):
     """Test findings summary."""
@@ -349,3 +389,1046 @@ async def test_run_not_found(state_manager):
     """Test error handling for non-existent run."""
     result = await state_manager.get_run("nonexistent-id")
     assert result is None
+
+
+@pytest.mark.asyncio
+async def test_state_models_are_immutable(state_manager):
+    """Test that returned state objects cannot be mutated in place."""
+    config = {"max_retries": 3}
+    run = await state_manager.create_run(
+        repo_path="/test/repo",
+        branch="main",
+        doc_path="/test/doc.md",
+        config=config
+    )
+    
+    with pytest.raises(ValidationError):
+        run.status = "executing"
+
+
+@pytest.mark.asyncio
+async def test_initialize_database_is_idempotent(state_manager):
+    """Test re-running schema setup commits cleanly and keeps the version."""
+    await initialize_database(state_manager.db)
+
+    assert not state_manager.db.in_transaction
+    assert await get_schema_version(state_manager.db) == SCHEMA_VERSION
+
+
+@pytest.mark.asyncio
+async def test_initialize_database_migrates_v1_indexes(tmp_path):
+    """Test a version 1 database is upgraded to the composite indexes."""
+    async with aiosqlite.connect(str(tmp_path / "v1.db")) as db:
+        await db.executescript(
+            "CREATE TABLE schema_version (version INTEGER PRIMARY KEY, applied_at TIMESTAMP);"
+            "INSERT INTO schema_version (version) VALUES (1);"
+        )
+        await initialize_database(db)
+        await db.execute("CREATE INDEX IF NOT EXISTS idx_phases_status ON phases(status)")
+        await db.execute("DELETE FROM schema_version WHERE version > 1")
+        await db.commit()
+
+        await initialize_database(db)
+
+        async with db.execute("SELECT name FROM sqlite_master WHERE type = 'index'") as cursor:
+            indexes = {row[0] for row in await cursor.fetchall()}
+        assert 'idx_phases_status' not in indexes
+        assert 'idx_phases_run_status_num' in indexes
+        assert await get_schema_version(db) == SCHEMA_VERSION
+
+
+@pytest.mark.asyncio
+async def test_initialize_database_drops_prefix_indexes(tmp_path):
+    """Test a version 3 database drops indexes covered by composite ones."""
+    async with aiosqlite.connect(str(tmp_path / "v3.db")) as db:
+        await initialize_database(db)
+        await db.executescript(
+            "CREATE INDEX idx_executions_phase_id ON executions(phase_id);"
+            "CREATE INDEX idx_findings_execution_id ON findings(execution_id);"
+            "DELETE FROM schema_version WHERE version > 3;"
+        )
+
+        await initialize_database(db)
+
+        async with db.execute("SELECT name FROM sqlite_master WHERE type = 'index'") as cursor:
+            indexes = {row[0] for row in await cursor.fetchall()}
+        assert 'idx_executions_phase_id' not in indexes
+        assert 'idx_findings_execution_id' not in indexes
+        assert 'idx_artifacts_phase_created' in indexes
+        async with db.execute("SELECT COUNT(*) FROM sqlite_master WHERE name = 'sqlite_stat1'") as cursor:
+            assert (await cursor.fetchone())[0] == 1
+        assert await get_schema_version(db) == SCHEMA_VERSION
+
+
+@pytest.mark.asyncio
+async def test_initialize_database_widens_artifact_types(tmp_path):
+    """Test a version 4 database accepts every Artifact model type after upgrade."""
+    db_path = str(tmp_path / "v4.db")
+    async with aiosqlite.connect(db_path) as db:
+        await initialize_database(db)
+        await db.executescript(
+            "DROP TABLE artifacts;"
+            "CREATE TABLE artifacts (artifact_id TEXT PRIMARY KEY, run_id TEXT NOT NULL,"
+            " phase_id TEXT, execution_id TEXT, artifact_type TEXT NOT NULL CHECK("
+            "artifact_type IN ('phase_plan', 'spec', 'copilot_output', 'findings_report',"
+            " 'verification_log')), file_path TEXT NOT NULL, created_at TIMESTAMP NOT NULL,"
+            " metadata TEXT);"
+            "INSERT INTO runs VALUES ('run-1', '2024-01-01', '2024-01-01', 'executing',"
+            " '/repo', 'main', '/doc.md', '{}', 0, 0, NULL, NULL);"
+            "INSERT INTO artifacts VALUES ('a-1', 'run-1', NULL, NULL, 'spec', 'spec.md',"
+            " '2024-01-01', NULL);"
+            "DELETE FROM schema_version WHERE version > 4;"
+        )
+
+    async with StateManager(db_path, str(tmp_path / "artifacts")) as sm:
+        assert await get_schema_version(sm.db) == SCHEMA_VERSION
+        await sm.register_artifacts([
+            {"run_id": "run-1", "artifact_type": "copilot_output", "file_path": "out.md"},
+            {"run_id": "run-1", "artifact_type": "copilot_prompt", "file_path": "prompt.md"},
+            {"run_id": "run-1", "artifact_type": "findings_report_md", "file_path": "f.md"},
+            {"run_id": "run-1", "artifact_type": "findings_report_json", "file_path": "f.json"},
+            {"run_id": "run-1", "artifact_type": "feedback_spec", "file_path": "fb.md"},
+            {"run_id": "run-1", "artifact_type": "phase_detail", "file_path": "detail.md"},
+        ])
+        artifacts = await sm.get_artifacts_for_run("run-1")
+        assert len(artifacts) == 7
+        assert (await sm.get_artifact("a-1")).file_path == "spec.md"
+
+        async with sm.db.execute(
+            "SELECT name FROM sqlite_master WHERE type = 'index' AND tbl_name = 'artifacts'"
+        ) as cursor:
+            indexes = {row[0] for row in await cursor.fetchall()}
+        assert {"idx_artifacts_run_created", "idx_artifacts_run_type_created",
+                "idx_artifacts_phase_created"} <= indexes
+
+
+@pytest.mark.asyncio
+async def test_get_schema_version_without_table():
+    """Test an uninitialized database reports schema version 0."""
+    async with aiosqlite.connect(":memory:") as db:
+        assert await get_schema_version(db) == 0
+
+
+@pytest.mark.asyncio
+async def test_connection_pragmas(state_manager):
+    """Test the connection is opened in WAL mode with tuned PRAGMAs."""
+    async with state_manager.db.execute("PRAGMA journal_mode") as cursor:
+        assert (await cursor.fetchone())[0] == "wal"
+    async with state_manager.db.execute("PRAGMA synchronous") as cursor:
+        assert (await cursor.fetchone())[0] == 1  # NORMAL
+    async with state_manager.db.execute("PRAGMA temp_store") as cursor:
+        assert (await cursor.fetchone())[0] == 2  # MEMORY
+    async with state_manager.db.execute("PRAGMA cache_size") as cursor:
+        assert (await cursor.fetchone())[0] == -65536
+    async with state_manager.db.execute("PRAGMA busy_timeout") as cursor:
+        assert (await cursor.fetchone())[0] == 5000
+    for conn in state_manager._read_connections:
+        async with conn.execute("PRAGMA journal_mode") as cursor:
+            assert (await cursor.fetchone())[0] == "wal"
+        async with conn.execute("PRAGMA busy_timeout") as cursor:
+            assert (await cursor.fetchone())[0] == 5000
+
+
+@pytest.mark.asyncio
+async def test_concurrent_phase_creation_is_atomic(state_manager):
+    """Test concurrent phase writes each commit as their own transaction."""
+    run = await state_manager.create_run(
+        repo_path="/test/repo",
+        branch="main",
+        doc_path="/test/doc.md",
+        config={}
+    )
+
+    phases = await asyncio.gather(*(
+        state_manager.create_phase(
+            run_id=run.run_id,
+            phase_number=n,
+            title=f"Phase {n}",
+            intent="Intent",
+            plan={},
+            max_retries=3
+        )
+        for n in range(1, 6)
+    ))
+
+    with pytest.raises(DatabaseError):
+        await state_manager.update_phase_status(phases[0].phase_id, "not-a-status")
+
+    assert not state_manager.db.in_transaction
+    assert (await state_manager.get_run(run.run_id)).total_phases == 5
+    assert (await state_manager.get_phase(phases[0].phase_id)).status == "pending"
+
+
+@pytest.mark.asyncio
+async def test_failed_commit_rolls_back_transaction(state_manager):
+    """Test a commit error does not leave the connection inside BEGIN."""
+    with patch.object(state_manager.db, "commit", side_effect=sqlite3.OperationalError("busy")):
+        with pytest.raises(DatabaseError):
+            await state_manager.create_run(
+                repo_path="/test/repo",
+                branch="main",
+                doc_path="/test/doc.md",
+                config={}
+            )
+
+    assert not state_manager.db.in_transaction
+    run = await state_manager.create_run(
+        repo_path="/test/repo",
+        branch="main",
+        doc_path="/test/doc.md",
+        config={}
+    )
+    assert [r.run_id for r in await state_manager.list_runs()] == [run.run_id]
+
+
+@pytest.mark.asyncio
+async def test_bulk_writes_wait_for_write_lock(state_manager):
+    """Test bulk inserts queue behind the write lock instead of committing."""
+    run = await state_manager.create_run(
+        repo_path="/test/repo",
+        branch="main",
+        doc_path="/test/doc.md",
+        config={}
+    )
+    phase = await state_manager.create_phase(
+        run_id=run.run_id,
+        phase_number=1,
+        title="Phase",
+        intent="Intent",
+        plan={},
+        max_retries=3
+    )
+    execution = await state_manager.create_execution(
+        phase_id=phase.phase_id,
+        pass_number=1,
+        copilot_input_path="/tmp/input.md",
+        execution_mode="direct"
+    )
+
+    async with state_manager._write_lock:
+        write = asyncio.create_task(state_manager.add_findings_bulk(execution.execution_id, [
+            {"severity": "minor", "category": "lint", "title": "Issue",
+             "description": "D", "evidence": "E"}
+        ]))
+        await asyncio.sleep(0.05)
+        assert not write.done()
+    await write
+
+    assert len(await state_manager.get_findings_for_execution(execution.execution_id)) == 1
+
+
+@pytest.mark.asyncio
+async def test_read_pool_sees_committed_writes(state_manager):
+    """Test pooled read-only connections serve concurrent reads of fresh data."""
+    assert len(state_manager._read_connections) == StateManager.READ_POOL_SIZE
+
+    runs = [
+        await state_manager.create_run(
+            repo_path=f"/test/repo{i}",
+            branch="main",
+            doc_path="/test/doc.md",
+            config={}
+        )
+        for i in range(3)
+    ]
+    for run in runs:
+        await state_manager.create_phase(
+            run_id=run.run_id,
+            phase_number=1,
+            title="Phase 1",
+            intent="Intent",
+            plan={},
+            max_retries=3
+        )
+
+    results = await asyncio.gather(*(
+        state_manager.get_phases_for_run(run.run_id) for run in runs
+    ))
+    assert [len(phases) for phases in results] == [1, 1, 1]
+    assert len(await state_manager.list_runs()) == 3
+
+    async with state_manager._acquire_read() as db:
+        with pytest.raises(aiosqlite.OperationalError):
+            await db.execute("DELETE FROM runs")
+
+
+@pytest.mark.asyncio
+async def test_phase_reads_skip_uncommitted_writes(state_manager):
+    """Test phase-level getters read from the pool, not the open write transaction."""
+    run = await state_manager.create_run(
+        repo_path="/test/repo",
+        branch="main",
+        doc_path="/test/doc.md",
+        config={}
+    )
+    phase = await state_manager.create_phase(
+        run_id=run.run_id,
+        phase_number=1,
+        title="Phase 1",
+        intent="Intent",
+        plan={},
+        max_retries=3
+    )
+    execution = await state_manager.create_execution(
+        phase_id=phase.phase_id,
+        pass_number=1,
+        copilot_input_path="/test/spec.md",
+        execution_mode="direct"
+    )
+
+    async with state_manager._transaction() as db:
+        await db.execute(
+            "INSERT INTO artifacts (artifact_id, run_id, phase_id, artifact_type, file_path, created_at)"
+            " VALUES ('a-1', ?, ?, 'spec', 'spec.md', '2024-01-01 00:00:00')",
+            (run.run_id, phase.phase_id)
+        )
+        await db.execute(
+            "INSERT INTO findings (finding_id, execution_id, severity, category, title,"
+            " description, evidence, created_at)"
+            " VALUES ('f-1', ?, 'major', 'build', 'T', 'D', 'E', '2024-01-01 00:00:00')",
+            (execution.execution_id,)
+        )
+        await db.execute(
+            "INSERT INTO manual_interventions (intervention_id, phase_id, created_at, reason)"
+            " VALUES ('i-1', ?, '2024-01-01 00:00:00', 'user_requested')",
+            (phase.phase_id,)
+        )
+
+        assert await state_manager.get_artifacts_for_phase(phase.phase_id) == []
+        assert await state_manager.get_findings_for_phase(phase.phase_id) == []
+        assert await state_manager.get_unresolved_findings(execution.execution_id, ["major"]) == []
+        assert await state_manager.get_pending_interventions(run.run_id) == []
+
+    assert len(await state_manager.get_artifacts_for_phase(phase.phase_id)) == 1
+    assert len(await state_manager.get_findings_for_phase(phase.phase_id)) == 1
+    assert len(await state_manager.get_unresolved_findings(execution.execution_id, ["major"])) == 1
+    assert len(await state_manager.get_pending_interventions(run.run_id)) == 1
+
+
+@pytest.mark.asyncio
+async def test_export_run_to_json_nests_executions_and_findings(state_manager, tmp_path):
+    """Test the bulk-query export groups executions and findings correctly."""
+    run = await state_manager.create_run(
+        repo_path="/test/repo",
+        branch="main",
+        doc_path="/test/doc.md",
+        config={}
+    )
+    phases = [
+        await state_manager.create_phase(
+            run_id=run.run_id,
+            phase_number=n,
+            title=f"Phase {n}",
+            intent="Intent",
+            plan={},
+            max_retries=3
+        )
+        for n in (1, 2)
+    ]
+    for pass_number in (1, 2):
+        execution = await state_manager.create_execution(
+            phase_id=phases[0].phase_id,
+            pass_number=pass_number,
+            copilot_input_path="/test/spec.md",
+            execution_mode="direct"
+        )
+        await state_manager.add_finding(
+            execution_id=execution.execution_id,
+            severity="minor",
+            category="lint",
+            title=f"Finding {pass_number}",
+            description="Description",
+            evidence="Evidence"
+        )
+
+    output_path = tmp_path / "export" / "run.json"
+    await state_manager.export_run_to_json(run.run_id, str(output_path))
+    text = output_path.read_text()
+    export = json.loads(text)
+    assert text == json.dumps(export, indent=2)
+
+    assert export['run']['run_id'] == run.run_id
+    first, second = export['phases']
+    assert [e['execution']['pass_number'] for e in first['executions']] == [1, 2]
+    assert [
+        [f['title'] for f in e['findings']] for e in first['executions']
+    ] == [["Finding 1"], ["Finding 2"]]
+    assert second['executions'] == []
+
+
+@pytest.mark.asyncio
+async def test_hot_lookups_avoid_temp_sort(state_manager):
+    """Test the composite indexes let hot lookups skip the ORDER BY sort."""
+    queries = [
+        ("SELECT * FROM phases WHERE run_id = ? ORDER BY phase_number", ("r",)),
+        ("SELECT * FROM executions WHERE phase_id = ? ORDER BY pass_number", ("p",)),
+        ("SELECT * FROM artifacts WHERE run_id = ? ORDER BY created_at", ("r",)),
+        (
+            "SELECT * FROM artifacts WHERE run_id = ? AND artifact_type = ? ORDER BY created_at",
+            ("r", "spec"),
+        ),
+        ("SELECT * FROM runs WHERE status = ? ORDER BY created_at DESC LIMIT ?", ("running", 10)),
+        ("SELECT * FROM artifacts WHERE phase_id = ? ORDER BY created_at", ("p",)),
+    ]
+    for query, params in queries:
+        async with state_manager.db.execute(f"EXPLAIN QUERY PLAN {query}", params) as cursor:
+            plan = " ".join(row[-1] for row in await cursor.fetchall())
+        assert "USING INDEX" in plan, query
+        assert "TEMP B-TREE" not in plan, query
+
+
+@pytest.mark.asyncio
+async def test_run_findings_rollup_uses_indexes(state_manager):
+    """Test the per-run severity rollup seeks every table instead of scanning."""
+    query = """SELECT f.severity, COUNT(*) FROM findings f
+               JOIN executions e ON f.execution_id = e.execution_id
+               JOIN phases p ON e.phase_id = p.phase_id
+               WHERE p.run_id = ?
+               GROUP BY f.severity"""
+    async with state_manager.db.execute(f"EXPLAIN QUERY PLAN {query}", ("r",)) as cursor:
+        details = [row[-1] for row in await cursor.fetchall()]
+    searches = [detail for detail in details if detail.startswith("SEARCH")]
+    assert len(searches) == 3
+    assert not any(detail.startswith("SCAN") for detail in details)
+    assert any("COVERING INDEX idx_findings_exec_sev_resolved" in d for d in searches)
+
+
+@pytest.mark.asyncio
+async def test_increment_phase_retry(state_manager):
+    """Test retry increments return the new count in one statement."""
+    run = await state_manager.create_run(
+        repo_path="/test/repo",
+        branch="main",
+        doc_path="/test/doc.md",
+        config={}
+    )
+    phase = await state_manager.create_phase(
+        run_id=run.run_id,
+        phase_number=1,
+        title="Phase 1",
+        intent="Intent",
+        plan={},
+        max_retries=3
+    )
+
+    assert await state_manager.increment_phase_retry(phase.phase_id) == 1
+    assert await state_manager.increment_phase_retry(phase.phase_id) == 2
+    assert (await state_manager.get_phase(phase.phase_id)).retry_count == 2
+    assert await state_manager.increment_phase_retry("missing") == 0
+    assert not state_manager.db.in_transaction
+
+
+@pytest.mark.asyncio
+async def test_set_phase_branch(state_manager):
+    """Test the phase branch is written through the locked transaction."""
+    run = await state_manager.create_run(
+        repo_path="/test/repo",
+        branch="main",
+        doc_path="/test/doc.md",
+        config={}
+    )
+    phase = await state_manager.create_phase(
+        run_id=run.run_id,
+        phase_number=1,
+        title="Phase 1",
+        intent="Intent",
+        plan={},
+        max_retries=3
+    )
+
+    async with state_manager._write_lock:
+        write = asyncio.create_task(
+            state_manager.set_phase_branch(phase.phase_id, "orchestrator/phase-1")
+        )
+        await asyncio.sleep(0.05)
+        assert not write.done()
+    await write
+
+    assert (await state_manager.get_phase(phase.phase_id)).branch_name == "orchestrator/phase-1"
+    assert not state_manager.db.in_transaction
+
+
+def test_models_from_rows():
+    """Test models build from sqlite3 rows without going through dict(row)."""
+    import sqlite3
+
+    conn = sqlite3.connect(":memory:")
+    conn.row_factory = sqlite3.Row
+    rows = conn.execute(
+        "SELECT 'f1' AS finding_id, 'e1' AS execution_id, 'minor' AS severity, "
+        "'lint' AS category, 'T' AS title, 'D' AS description, 'E' AS evidence, "
+        "NULL AS suggested_fix, 0 AS resolved, '2024-01-01T00:00:00' AS created_at"
+    ).fetchall()
+    conn.close()
+
+    (finding,) = Finding.from_rows(rows)
+    assert finding == Finding.from_row(rows[0])
+    assert finding.resolved is False
+    assert finding.created_at == datetime(2024, 1, 1)
+    assert Finding.from_rows([]) == []
+
+
+@pytest.mark.asyncio
+async def test_json_columns_accept_preserialized_values(state_manager):
+    """Test JSON columns are stored compactly and strings pass through."""
+    config = {"max_retries": 3, "models": ["a", "b"]}
+    encoded = json.dumps(config)
+
+    run = await state_manager.create_run(
+        repo_path="/test/repo",
+        branch="main",
+        doc_path="/test/doc.md",
+        config=config
+    )
+    assert run.config_snapshot == '{"max_retries":3,"models":["a","b"]}'
+
+    run = await state_manager.create_run(
+        repo_path="/test/repo",
+        branch="main",
+        doc_path="/test/doc.md",
+        config=encoded
+    )
+    assert (await state_manager.get_run(run.run_id)).config_snapshot == encoded
+
+    phase = await state_manager.create_phase(
+        run_id=run.run_id,
+        phase_number=1,
+        title="Phase 1",
+        intent="Intent",
+        plan='{"files":["a.py"]}',
+        max_retries=3
+    )
+    assert phase.get_plan().files == ["a.py"]
+
+
+@pytest.mark.asyncio
+async def test_timestamps_stored_in_adapter_format(state_manager):
+    """Test pre-adapted timestamps keep the sqlite3 adapter's text format."""
+    run = await state_manager.create_run(
+        repo_path="/test/repo",
+        branch="main",
+        doc_path="/test/doc.md",
+        config={}
+    )
+    async with state_manager.db.execute(
+        "SELECT created_at FROM runs WHERE run_id = ?", (run.run_id,)
+    ) as cursor:
+        (stored,) = await cursor.fetchone()
+
+    assert stored == run.created_at.isoformat(" ")
+    assert (await state_manager.get_run(run.run_id)).created_at == run.created_at
+
+
+@pytest.mark.asyncio
+async def test_generated_ids_are_hex(state_manager):
+    """Test new records get 32-character hex ids."""
+    run = await state_manager.create_run(
+        repo_path="/test/repo",
+        branch="main",
+        doc_path="/test/doc.md",
+        config={}
+    )
+    assert len(run.run_id) == 32
+    int(run.run_id, 16)
+
+
+@pytest.mark.asyncio
+async def test_add_findings_bulk(state_manager):
+    """Test findings are added in one transaction and rolled back together."""
+    run = await state_manager.create_run(
+        repo_path="/test/repo",
+        branch="main",
+        doc_path="/test/doc.md",
+        config={}
+    )
+    phase = await state_manager.create_phase(
+        run_id=run.run_id,
+        phase_number=1,
+        title="Phase 1",
+        intent="Intent",
+        plan={},
+        max_retries=3
+    )
+    execution = await state_manager.create_execution(
+        phase_id=phase.phase_id,
+        pass_number=1,
+        copilot_input_path="/test/spec.md",
+        execution_mode="direct"
+    )
+    finding = {
+        "severity": "minor",
+        "category": "lint",
+        "title": "Finding",
+        "description": "Description",
+        "evidence": "Evidence",
+    }
+
+    added = await state_manager.add_findings_bulk(
+        execution.execution_id,
+        [finding, {**finding, "severity": "major", "suggested_fix": "Fix it"}]
+    )
+    assert [f.severity for f in added] == ["minor", "major"]
+    assert added[1].suggested_fix == "Fix it"
+    assert len(await state_manager.get_findings_for_execution(execution.execution_id)) == 2
+
+    with pytest.raises(DatabaseError):
+        await state_manager.add_findings_bulk(
+            execution.execution_id, [finding, {**finding, "severity": "bogus"}]
+        )
+    assert len(await state_manager.get_findings_for_execution(execution.execution_id)) == 2
+    assert await state_manager.add_findings_bulk(execution.execution_id, []) == []
+
+
+@pytest.mark.asyncio
+async def test_export_run_summary_aggregates_counts(state_manager):
+    """Test run summary counts come from run-wide aggregate queries."""
+    run = await state_manager.create_run(
+        repo_path="/test/repo",
+        branch="main",
+        doc_path="/test/doc.md",
+        config={}
+    )
+    for n in (1, 2):
+        phase = await state_manager.create_phase(
+            run_id=run.run_id,
+            phase_number=n,
+            title=f"Phase {n}",
+            intent="Intent",
+            plan={},
+            max_retries=3
+        )
+        execution = await state_manager.create_execution(
+            phase_id=phase.phase_id,
+            pass_number=1,
+            copilot_input_path="/test/spec.md",
+            execution_mode="direct"
+        )
+        await state_manager.add_findings_bulk(execution.execution_id, [
+            {"severity": "major", "category": "build", "title": "T",
+             "description": "D", "evidence": "E"},
+            {"severity": "minor", "category": "lint", "title": "T",
+             "description": "D", "evidence": "E"},
+        ])
+    await state_manager.register_artifact(
+        run_id=run.run_id, artifact_type="spec", file_path="/test/spec.md"
+    )
+
+    assert await state_manager.get_findings_summary_for_run(run.run_id) == {"major": 2, "minor": 2}
+
+    summary = await state_manager.export_run_summary(run.run_id)
+    assert summary.execution_count == 2
+    assert summary.findings_summary == {"major": 2, "medium": 0, "minor": 2}
+    assert summary.artifacts_count == 1
+
+
+@pytest.mark.asyncio
+async def test_checkpoint_truncates_wal(state_manager):
+    """Test finishing a run checkpoints and truncates the WAL file."""
+    async with state_manager.db.execute("PRAGMA wal_autocheckpoint") as cursor:
+        assert (await cursor.fetchone())[0] == StateManager.WAL_AUTOCHECKPOINT
+
+    run = await state_manager.create_run(
+        repo_path="/test/repo",
+        branch="main",
+        doc_path="/test/doc.md",
+        config={}
+    )
+    wal_path = Path(f"{state_manager.db_path}-wal")
+    assert wal_path.stat().st_size > 0
+
+    await state_manager.update_run_status(run.run_id, "completed")
+    assert wal_path.stat().st_size == 0
+
+
+@pytest.mark.asyncio
+async def test_vacuum_database_on_worker_connection(state_manager):
+    """Test vacuum checkpoints the WAL and leaves the database usable."""
+    runs = [
+        await state_manager.create_run(
+            repo_path="/test/repo",
+            branch="main",
+            doc_path="/test/doc.md",
+            config={"padding": "x" * 4096}
+        )
+        for _ in range(5)
+    ]
+    await state_manager.db.execute("DELETE FROM runs WHERE run_id <> ?", (runs[0].run_id,))
+    await state_manager.db.commit()
+
+    await state_manager.vacuum_database()
+
+    assert Path(f"{state_manager.db_path}-wal").stat().st_size == 0
+    assert await state_manager.get_run(runs[0].run_id) == runs[0]
+    assert len(await state_manager.list_runs()) == 1
+    await state_manager.update_run_status(runs[0].run_id, "executing")
+
+
+@pytest.mark.asyncio
+async def test_iter_findings_for_phase_batches(state_manager, tmp_path, monkeypatch):
+    """Test phase findings stream across fetch batches and feed the export."""
+    monkeypatch.setattr(StateManager, "FETCH_BATCH_SIZE", 2)
+    run = await state_manager.create_run(
+        repo_path="/test/repo",
+        branch="main",
+        doc_path="/test/doc.md",
+        config={}
+    )
+    phase = await state_manager.create_phase(
+        run_id=run.run_id,
+        phase_number=1,
+        title="Phase 1",
+        intent="Intent",
+        plan={},
+        max_retries=3
+    )
+    for pass_number in (1, 2):
+        execution = await state_manager.create_execution(
+            phase_id=phase.phase_id,
+            pass_number=pass_number,
+            copilot_input_path="/test/spec.md",
+            execution_mode="direct"
+        )
+        await state_manager.add_findings_bulk(execution.execution_id, [
+            {"severity": severity, "category": "lint", "title": f"{pass_number}-{severity}",
+             "description": "D", "evidence": "E"}
+            for severity in ("minor", "major", "medium")
+        ])
+
+    streamed = [f async for f in state_manager.iter_findings_for_phase(phase.phase_id)]
+    assert streamed == await state_manager.get_findings_for_phase(phase.phase_id)
+    assert len(streamed) == 6
+
+    output_path = tmp_path / "phase.json"
+    await state_manager.export_phase_to_json(phase.phase_id, str(output_path))
+    export = json.loads(output_path.read_text())
+    assert [len(e['findings']) for e in export['executions']] == [3, 3]
+    assert [f['title'] for f in export['executions'][0]['findings']] == [
+        "1-major", "1-medium", "1-minor"
+    ]
+
+
+@pytest.mark.asyncio
+async def test_phase_status_triggers_update_run_progress(state_manager):
+    """Test schema triggers keep run progress in step with phase status."""
+    run = await state_manager.create_run(
+        repo_path="/test/repo",
+        branch="main",
+        doc_path="/test/doc.md",
+        config={}
+    )
+    phase = await state_manager.create_phase(
+        run_id=run.run_id,
+        phase_number=1,
+        title="Phase 1",
+        intent="Intent",
+        plan={},
+        max_retries=3
+    )
+
+    await state_manager.update_phase_status(phase.phase_id, "in_progress")
+    assert (await state_manager.get_run(run.run_id)).current_phase_id == phase.phase_id
+
+    await state_manager.update_phase_status(phase.phase_id, "completed")
+    await state_manager.update_phase_status(phase.phase_id, "completed")
+    assert (await state_manager.get_run(run.run_id)).completed_phases == 1
+
+
+@pytest.mark.asyncio
+async def test_get_statistics(state_manager):
+    """Test database-wide statistics."""
+    run = await state_manager.create_run(
+        repo_path="/test/repo",
+        branch="main",
+        doc_path="/test/doc.md",
+        config={}
+    )
+    phase = await state_manager.create_phase(
+        run_id=run.run_id,
+        phase_number=1,
+        title="Phase 1",
+        intent="Intent",
+        plan={},
+        max_retries=3
+    )
+    execution = await state_manager.create_execution(
+        phase_id=phase.phase_id,
+        pass_number=1,
+        copilot_input_path="/test/spec.md",
+        execution_mode="direct"
+    )
+    await state_manager.add_finding(
+        execution_id=execution.execution_id,
+        severity="medium",
+        category="test",
+        title="Flaky test",
+        description="D",
+        evidence="E"
+    )
+
+    assert await state_manager.get_statistics() == {
+        'total_runs': 1,
+        'total_phases': 1,
+        'findings_by_severity': {'medium': 1},
+    }
+
+
+@pytest.mark.asyncio
+async def test_get_recoverable_runs(state_manager):
+    """Test executing and paused runs are listed by one status query."""
+    for status in ("executing", "paused", "completed"):
+        run = await state_manager.create_run(
+            repo_path="/test/repo",
+            branch="main",
+            doc_path="/test/doc.md",
+            config={}
+        )
+        await state_manager.update_run_status(run.run_id, status)
+
+    recoverable = await state_manager.get_recoverable_runs()
+    assert sorted(r.status for r in recoverable) == ["executing", "paused"]
+    assert len(await state_manager.list_runs(statuses=["completed"])) == 1
+
+
+@pytest.mark.asyncio
+async def test_export_run_markdown(state_manager, tmp_path):
+    """Test the markdown report lists executions and findings per phase."""
+    from orchestrator.state_utils import export_run_markdown
+
+    run = await state_manager.create_run(
+        repo_path="/test/repo",
+        branch="main",
+        doc_path="/test/doc.md",
+        config={}
+    )
+    for n in (1, 2):
+        phase = await state_manager.create_phase(
+            run_id=run.run_id,
+            phase_number=n,
+            title=f"Phase {n}",
+            intent="Intent",
+            plan={},
+            max_retries=3
+        )
+        if n == 1:
+            execution = await state_manager.create_execution(
+                phase_id=phase.phase_id,
+                pass_number=1,
+                copilot_input_path="/test/spec.md",
+                execution_mode="direct"
+            )
+            await state_manager.complete_execution(
+                execution.execution_id, "/test/out.md", "Did the work"
+            )
+            await state_manager.add_finding(
+                execution_id=execution.execution_id,
+                severity="major",
+                category="build",
+                title="Build failed",
+                description="D",
+                evidence="E"
+            )
+
+    (run_execution,) = await state_manager.get_executions_for_run(run.run_id)
+    assert run_execution.execution_id == execution.execution_id
+    (run_finding,) = await state_manager.get_findings_for_run(run.run_id)
+    assert run_finding.title == "Build failed"
+
+    output_path = tmp_path / "report.md"
+    with patch.object(state_manager, "get_executions_for_phase") as per_phase:
+        await export_run_markdown(run.run_id, state_manager, str(output_path))
+    per_phase.assert_not_called()
+    report = output_path.read_text()
+
+    assert "## Execution Details" in report
+    assert "### Phase 1 Executions" in report
+    assert "### Phase 2 Executions" not in report
+    assert "**Pass 1** (completed)" in report
+    assert "- Summary: Did the work" in report
+    assert "- Findings: 1\n  - [major] Build failed\n" in report
+
+
+@pytest.mark.asyncio
+async def test_cleanup_old_artifacts_deletes_only_old_runs(state_manager, tmp_path):
+    """Test old runs' artifacts are selected in SQL and their files deleted."""
+    from orchestrator.state_utils import cleanup_old_artifacts
+
+    paths = {}
+    for label in ("old", "new"):
+        run = await state_manager.create_run(
+            repo_path="/test/repo",
+            branch="main",
+            doc_path="/test/doc.md",
+            config={}
+        )
+        file_path = tmp_path / f"{label}.md"
+        file_path.write_text(label)
+        paths[label] = file_path
+        await state_manager.register_artifact(
+            run_id=run.run_id, artifact_type="spec", file_path=file_path.name
+        )
+        if label == "old":
+            async with state_manager._transaction() as db:
+                await db.execute(
+                    "UPDATE runs SET created_at = '2000-01-01 00:00:00' WHERE run_id = ?",
+                    (run.run_id,)
+                )
+
+    await cleanup_old_artifacts(state_manager, 30, base_path=str(tmp_path), compress=False)
+
+    assert not paths["old"].exists()
+    assert paths["new"].exists()
+
+
+@pytest.mark.asyncio
+async def test_save_artifact_keeps_same_second_saves(state_manager, tmp_path):
+    """Test back-to-back saves get distinct files and are registered."""
+    from orchestrator.state_utils import load_artifact, save_artifact
+
+    run = await state_manager.create_run(
+        repo_path="/test/repo",
+        branch="main",
+        doc_path="/test/doc.md",
+        config={}
+    )
+    saved = [
+        await save_artifact(f"content {i}", "spec", run.run_id, state_manager,
+                            base_path=str(tmp_path))
+        for i in range(3)
+    ]
+
+    assert len(set(saved)) == 3
+    assert [Path(p).read_text() for p in saved] == ["content 0", "content 1", "content 2"]
+    artifacts = await state_manager.get_artifacts_for_run(run.run_id)
+    assert len(artifacts) == 3
+    assert await load_artifact(
+        artifacts[0].artifact_id, state_manager, base_path=str(tmp_path)
+    ) == "content 0"
+
+
+@pytest.mark.asyncio
+async def test_save_artifact_with_relative_base_path(state_manager, tmp_path, monkeypatch):
+    """Test artifacts under a relative base path are stored relative to it."""
+    from orchestrator.state_utils import load_artifact, save_artifact
+
+    monkeypatch.chdir(tmp_path)
+    base_path = "relative_artifacts"
+    run = await state_manager.create_run(
+        repo_path="/test/repo",
+        branch="main",
+        doc_path="/test/doc.md",
+        config={}
+    )
+    saved = await save_artifact("content", "spec", run.run_id, state_manager,
+                                base_path=base_path)
+
+    assert Path(saved).is_absolute()
+    (artifact,) = await state_manager.get_artifacts_for_run(run.run_id)
+    assert artifact.file_path.startswith(f"{run.run_id}{os.sep}spec_")
+    assert (tmp_path / base_path / artifact.file_path).read_text() == "content"
+    assert await load_artifact(artifact.artifact_id, state_manager, base_path=base_path) == "content"
+
+
+def test_create_artifact_directory_caches_created_dirs(tmp_path):
+    """Test repeat calls skip mkdir/.gitkeep but recover deleted dirs."""
+    import shutil
+    from orchestrator.state_utils import create_artifact_directory
+
+    first = create_artifact_directory("run-1", "phase-1", base_path=str(tmp_path))
+    gitkeep = Path(first) / ".gitkeep"
+    assert gitkeep.exists()
+
+    gitkeep.unlink()
+    assert create_artifact_directory("run-1", "phase-1", base_path=str(tmp_path)) == first
+    assert not gitkeep.exists()
+
+    shutil.rmtree(tmp_path / "run-1")
+    assert create_artifact_directory("run-1", "phase-1", base_path=str(tmp_path)) == first
+    assert gitkeep.exists()
+
+
+@pytest.mark.asyncio
+async def test_cleanup_old_artifacts_compresses(state_manager, tmp_path):
+    """Test compression gzips old files and repoints their artifacts."""
+    from orchestrator.state_utils import cleanup_old_artifacts, load_artifact
+
+    run = await state_manager.create_run(
+        repo_path="/test/repo",
+        branch="main",
+        doc_path="/test/doc.md",
+        config={}
+    )
+    (tmp_path / "old.md").write_text("old content")
+    artifact = await state_manager.register_artifact(
+        run_id=run.run_id, artifact_type="spec", file_path="old.md"
+    )
+    await state_manager.register_artifact(
+        run_id=run.run_id, artifact_type="spec", file_path="missing.md"
+    )
+    async with state_manager._transaction() as db:
+        await db.execute(
+            "UPDATE runs SET created_at = '2000-01-01 00:00:00' WHERE run_id = ?",
+            (run.run_id,)
+        )
+
+    await cleanup_old_artifacts(state_manager, 30, base_path=str(tmp_path), compress=True)
+
+    assert not (tmp_path / "old.md").exists()
+    assert (await state_manager.get_artifact(artifact.artifact_id)).file_path == "old.md.gz"
+    assert await load_artifact(
+        artifact.artifact_id, state_manager, base_path=str(tmp_path)
+    ) == "old content"
+
+
+@pytest.mark.asyncio
+async def test_cleanup_old_artifacts_compress_failure_keeps_original(state_manager, tmp_path):
+    """Test a file that fails to compress keeps its original and stored path."""
+    import shutil
+    from orchestrator.state_utils import cleanup_old_artifacts
+
+    run = await state_manager.create_run(
+        repo_path="/test/repo",
+        branch="main",
+        doc_path="/test/doc.md",
+        config={}
+    )
+    artifacts = {}
+    for name in ("a.md", "b.md", "c.md"):
+        (tmp_path / name).write_text(f"{name} content")
+        artifacts[name] = await state_manager.register_artifact(
+            run_id=run.run_id, artifact_type="spec", file_path=name
+        )
+    async with state_manager._transaction() as db:
+        await db.execute(
+            "UPDATE runs SET created_at = '2000-01-01 00:00:00' WHERE run_id = ?",
+            (run.run_id,)
+        )
+
+    copy = shutil.copyfileobj
+
+    def failing_copy(src, dst):
+        if src.name.endswith("b.md"):
+            dst.write(b"partial")
+            raise PermissionError("denied")
+        copy(src, dst)
+
+    with patch("orchestrator.state_utils.shutil.copyfileobj", side_effect=failing_copy):
+        await cleanup_old_artifacts(state_manager, 30, base_path=str(tmp_path), compress=True)
+
+    assert (tmp_path / "b.md").read_text() == "b.md content"
+    assert not (tmp_path / "b.md.gz").exists()
+    paths = {
+        name: (await state_manager.get_artifact(a.artifact_id)).file_path
+        for name, a in artifacts.items()
+    }
+    assert paths == {"a.md": "a.md.gz", "b.md": "b.md", "c.md": "c.md.gz"}
+    assert not (tmp_path / "a.md").exists() and not (tmp_path / "c.md").exists()
+
+
+def test_artifact_filename_label_matches_strftime():
+    """Test the hand-built filename timestamp matches the strftime format."""
+    from orchestrator.state_utils import _second_label
+
+    for epoch_seconds in (0, 1234567890, 1700000000):
+        assert _second_label(epoch_seconds) == datetime.fromtimestamp(
+            epoch_seconds
+        ).strftime("%Y%m%d_%H%M%S")
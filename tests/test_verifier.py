@@ -2,13 +2,16 @@
 Tests for the verification system.
 """
 
+import asyncio
 import pytest
 from unittest.mock import Mock, AsyncMock, patch, MagicMock
 from pathlib import Path
 from datetime import datetime
 
 from orchestrator.verifier import PhaseVerifier, VerificationConfig
-from orchestrator.verification_models import VerificationResult, ChecklistItem, SpecComplianceResult
+from orchestrator.verification_models import (
+    VerificationResult, ChecklistItem, SpecComplianceResult, summarize_findings
+)
 from orchestrator.models import Finding
 
 
@@ -40,6 +43,7 @@ def mock_state_manager():
     """Create mock state manager."""
     manager = Mock()
     manager.add_finding = Mock()
+    manager.add_findings_bulk = AsyncMock(return_value=[])
     manager.get_findings_for_phase = AsyncMock(return_value=[])
     return manager
 
@@ -126,6 +130,60 @@ class TestPhaseVerifier:
         assert findings[0].severity == "medium"
         assert findings[0].category == "test"
     
+    @pytest.mark.asyncio
+    async def test_run_security_scan_collects_matching_lines(self, verifier):
+        """Test every vulnerability line is counted and quoted as evidence."""
+        verifier.config.security_command = (
+            "printf 'scanning\\nCVE-2024-1 in libfoo (HIGH)\\nok\\npkg is vulnerable\\n'"
+        )
+        findings = await verifier._run_security_scan("exec_001")
+        assert len(findings) == 1
+        assert findings[0].severity == "major"
+        assert findings[0].description == "Found 2 potential security issue(s)"
+        assert findings[0].evidence.endswith(
+            "Vulnerabilities:\nCVE-2024-1 in libfoo (HIGH)\npkg is vulnerable"
+        )
+    
+    @pytest.mark.asyncio
+    async def test_run_command_bounds_captured_output(self, verifier, tmp_path):
+        """Test only OUTPUT_LIMIT bytes of each stream are kept."""
+        verifier.OUTPUT_LIMIT = 1000
+        command = "seq 1 20000; seq 1 20000 >&2"
+        
+        result = await verifier._run_command(command, 10, tmp_path)
+        assert result["exit_code"] == 0
+        assert len(result["stdout"]) == 1000
+        assert result["stdout"].endswith("19999\n20000\n")
+        assert len(result["stderr"]) == 1000
+        
+        result = await verifier._run_command(command, 10, tmp_path, keep_head=True)
+        assert len(result["stdout"]) == 1000
+        assert result["stdout"].startswith("1\n2\n3\n")
+    
+    @pytest.mark.asyncio
+    async def test_validate_spec_compliance_caches_by_prompt(self, verifier, mock_llm_client, tmp_path):
+        """Test an unchanged prompt reuses the parsed LLM response."""
+        mock_llm_client.generate.return_value = (
+            '{"checklist_results": [{"item": "Do it", "completed": false}], '
+            '"spec_compliance": {"compliant": true}, "overall_assessment": "Almost"}'
+        )
+        spec_path = tmp_path / "spec.md"
+        spec_path.write_text("- [ ] Do it\n")
+        diff = AsyncMock(return_value="diff --git a/x b/x")
+        
+        with patch.object(verifier, "_get_git_diff", diff):
+            first = await verifier._validate_spec_compliance("exec_001", spec_path, {})
+            second = await verifier._validate_spec_compliance("exec_002", spec_path, {})
+            assert mock_llm_client.generate.await_count == 1
+            
+            diff.return_value = "diff --git a/y b/y"
+            await verifier._validate_spec_compliance("exec_003", spec_path, {})
+            assert mock_llm_client.generate.await_count == 2
+        
+        assert first[1] == second[1] == ["Do it"]
+        assert first[2] == second[2]
+        assert [f.execution_id for f in second[0]] == ["exec_002"]
+    
     @pytest.mark.asyncio
     async def test_extract_checklist_from_spec(self, verifier):
         """Test checklist extraction."""
@@ -179,6 +237,48 @@ class TestPhaseVerifier:
         # Findings are not persisted immediately by _create_finding
         # They are persisted in batch by verify_phase_execution
         mock_state_manager.add_finding.assert_not_called()
+    
+    @pytest.mark.asyncio
+    async def test_verify_phase_execution_runs_checks_concurrently(self, verifier, tmp_path):
+        """Test enabled checks overlap and report results in check order."""
+        running = 0
+        peak = 0
+        
+        async def slow_check(execution_id):
+            nonlocal running, peak
+            running += 1
+            peak = max(peak, running)
+            await asyncio.sleep(0.01)
+            running -= 1
+            return []
+        
+        async def broken_check(execution_id):
+            await asyncio.sleep(0.01)
+            raise RuntimeError("tests exploded")
+        
+        spec_path = tmp_path / "spec.md"
+        spec_path.write_text("- [ ] Do it\n")
+        verifier.config.lint_enabled = True
+        with patch.object(verifier, "_run_build_check", side_effect=slow_check), \
+             patch.object(verifier, "_run_test_check", side_effect=broken_check), \
+             patch.object(verifier, "_run_lint_check", side_effect=slow_check), \
+             patch.object(verifier, "_get_git_diff", AsyncMock(return_value="")):
+            result = await verifier.verify_phase_execution(
+                "exec_001", "phase_001", spec_path, {}
+            )
+        
+        assert peak == 2
+        assert result.checks_run == ["build", "test", "lint", "spec_validation"]
+        (finding,) = result.findings
+        assert finding.category == "test"
+        assert finding.title == "Test Check Failed"
+        assert finding.description == "Test check execution failed: tests exploded"
+        assert result.spec_compliance.overall_assessment == "All good"
+        verifier.state_manager.add_findings_bulk.assert_awaited_once()
+        execution_id, persisted = verifier.state_manager.add_findings_bulk.await_args.args
+        assert execution_id == "exec_001"
+        assert [f["title"] for f in persisted] == ["Test Check Failed"]
+        verifier.state_manager.add_finding.assert_not_called()
 
 
 class TestVerificationResult:
@@ -197,6 +297,9 @@ class TestVerificationResult:
         assert result.passed is True
         assert result.execution_time == 1.5
         assert "build" in result.checks_run
+        assert not hasattr(result, "__dict__")
+        with pytest.raises(AttributeError):
+            result.passed = False
     
     def test_verification_result_with_findings(self):
         """Test verification result with findings."""
@@ -222,6 +325,24 @@ class TestVerificationResult:
         assert result.passed is False
         assert len(result.findings) == 1
         assert result.findings_summary["medium"] == 1
+    
+    def test_summarize_findings(self):
+        """Test severities are counted in one pass with zeros filled in."""
+        findings = [
+            Finding(
+                finding_id=f"f{i}",
+                execution_id="exec_001",
+                severity=severity,
+                category="lint",
+                title="Lint",
+                description="Lint issue",
+                evidence="line 1",
+                created_at=datetime.now()
+            )
+            for i, severity in enumerate(["minor", "major", "minor"])
+        ]
+        assert summarize_findings(findings) == {"major": 1, "medium": 0, "minor": 2}
+        assert summarize_findings([]) == {"major": 0, "medium": 0, "minor": 0}
 
 
 class TestFeedbackSpecGeneration: